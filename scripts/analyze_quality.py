@@ -4,15 +4,64 @@ Quality Analyzer - Deep quality analysis for components.
 
 Analyzes against quality criteria and provides detailed scoring.
 Used by the constructor-reviewer agent.
+
+Per-criterion results are cached in learned/quality-cache/, keyed by the
+main file's content, the component's scripts/, references/ and README.md,
+and the criteria version (a hash of the analyzer source), so re-analyzing
+an unchanged component costs a file read and a few stats.
+
+Every CLI analysis is appended to the score history (score_history.py)
+with the current git commit, unless --no-history.
+
+Criteria live in a registry (@criterion) and declare the inputs they read
+(frontmatter, body, filesystem); the engine loads each input once, runs the
+criteria grouped by input and times both. A JSON config (--config FILE, or
+quality-criteria.json in the plugin root) can change the active set:
+
+  {
+    "enabled": ["trigger_specificity", ...],   # only these (default: all)
+    "disabled": ["documentation"],
+    "weights": {"examples_quality": 20},
+    "modules": ["my_criteria.py"],             # Python files using @criterion
+    "custom": [{"key": "license", "name": "License", "weight": 5,
+                "input": "body", "patterns": ["license"], "min_matches": 1,   # or "frontmatter": the description
+                "suggestion": "Add a License section"}]
+  }
+
+Usage:
+  python analyze_quality.py <component_path> [--no-cache] [--no-history] [--config FILE]
+  python analyze_quality.py --recursive [root] [--jobs N] [--no-cache] [--no-history] [--config FILE]   - Every component under root, JSONL
+  python analyze_quality.py --list-criteria [--config FILE]   - Active criteria, weights and inputs
 """
 
+import functools
+import hashlib
+import importlib.util
 import json
+import os
 import re
+import sqlite3
 import sys
-import yaml
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
-from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
+from dataclasses import asdict, dataclass, replace
+
+sys.path.insert(0, str(Path(__file__).parent))
+from component_document import ComponentDocument
+from score_history import ScoreHistory, current_commit
+from storage import atomic_write_json, read_json
+
+# Directories never searched for components
+SKIP_DIRS = {".git", "learned", "node_modules", "__pycache__"}
+
+
+# Component parts besides the main file that can affect the score
+REFERENCED_PATHS = ("scripts", "references", "README.md")
+
+# Inputs a criterion can declare, in the order the engine loads them
+CRITERION_INPUTS = ("frontmatter", "body", "filesystem")
 
 
 @dataclass
@@ -25,39 +74,256 @@ class QualityCriterion:
     suggestions: List[str]
 
 
+@dataclass(frozen=True)
+class CriterionSpec:
+    """A registered criterion: run(analyzer) returns its QualityCriterion."""
+    key: str
+    weight: int
+    inputs: Tuple[str, ...]
+    run: Callable[..., QualityCriterion]
+    source: str = "builtin"
+
+
+# Registered criteria in registration order
+CRITERIA: Dict[str, CriterionSpec] = {}
+
+
+def criterion(key: str, weight: int, inputs: Tuple[str, ...]):
+    """Register a criterion function taking the analyzer (built-ins are QualityAnalyzer methods)."""
+    unknown = set(inputs) - set(CRITERION_INPUTS)
+    if unknown:
+        raise ValueError(f"Unknown criterion inputs for {key}: {sorted(unknown)}")
+
+    def register(func):
+        source = "builtin" if func.__module__ == __name__ else func.__module__
+        CRITERIA[key] = CriterionSpec(key, weight, tuple(inputs), func, source)
+        return func
+    return register
+
+
+def _keyword_criterion(spec: Dict[str, Any]) -> CriterionSpec:
+    """A config-defined criterion: full weight when its patterns match often enough, else 0.
+
+    Input "body" searches the text after the frontmatter; "frontmatter"
+    searches the description, the frontmatter field Claude matches on.
+    """
+    key = spec["key"]
+    name = spec.get("name", key.replace("_", " ").title())
+    field = spec.get("input", "body")
+    if field not in ("frontmatter", "body"):
+        raise ValueError(f"Custom criterion {key}: input must be frontmatter or body")
+    patterns = [re.compile(p, re.IGNORECASE) for p in spec.get("patterns", [])]
+    min_matches = spec.get("min_matches", 1)
+
+    def run(analyzer: "QualityAnalyzer") -> QualityCriterion:
+        weight = analyzer.weights[key]
+        text = analyzer.document.description if field == "frontmatter" else analyzer.document.body
+        matches = sum(len(p.findall(text)) for p in patterns)
+        if matches >= min_matches:
+            return QualityCriterion(name, weight, weight, weight, [f"{matches} matches"], [])
+        return QualityCriterion(name, weight, 0, weight, [f"Missing: {matches} of {min_matches} matches"],
+                                [spec.get("suggestion", f"Add content matching: {', '.join(spec.get('patterns', []))}")])
+
+    return CriterionSpec(key, spec.get("weight", 5), (field,), run, "config")
+
+
+def get_config_file() -> Path:
+    """Default criteria config: quality-criteria.json in the plugin root."""
+    return Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent)) / "quality-criteria.json"
+
+
+def load_config(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """The criteria config at path, else the default file if it exists, else None."""
+    config_file = Path(path) if path else get_config_file()
+    if path is None and not config_file.exists():
+        return None
+    return json.loads(config_file.read_text(encoding="utf-8"))
+
+
+_ACTIVE_CRITERIA: Dict[str, Tuple[List[CriterionSpec], str]] = {}
+
+
+def active_criteria(config: Optional[Dict[str, Any]] = None) -> Tuple[List[CriterionSpec], str]:
+    """Enabled criteria with configured weights, in registration order, and a version of the set.
+
+    The version hashes the criteria source, the config and any criterion
+    modules, so cached scores are dropped when any of them change.
+    """
+    config = config or {}
+    memo_key = json.dumps(config, sort_keys=True)
+    if memo_key in _ACTIVE_CRITERIA:
+        return _ACTIVE_CRITERIA[memo_key]
+
+    version = hashlib.sha256((criteria_version() + memo_key).encode("utf-8"))
+    builtins = dict(CRITERIA)
+    # Run as a script this module is __main__; without the alias a module's
+    # "from analyze_quality import criterion" would register into a second copy
+    sys.modules.setdefault("analyze_quality", sys.modules[__name__])
+    try:
+        for module_path in config.get("modules", []):
+            source = Path(module_path).read_bytes()
+            version.update(source)
+            spec = importlib.util.spec_from_file_location(
+                f"quality_criteria_{hashlib.sha1(source).hexdigest()[:8]}", module_path
+            )
+            module = importlib.util.module_from_spec(spec)
+            before = dict(CRITERIA)
+            spec.loader.exec_module(module)
+            if CRITERIA == before:
+                raise ValueError(f"Criterion module {module_path} registered no criteria")
+        registry = dict(CRITERIA)
+    finally:
+        # Module criteria belong to this config only
+        CRITERIA.clear()
+        CRITERIA.update(builtins)
+    for custom in config.get("custom", []):
+        registry[custom["key"]] = _keyword_criterion(custom)
+    unknown = set(config.get("enabled", [])) | set(config.get("disabled", [])) | set(config.get("weights", {}))
+    unknown -= set(registry)
+    if unknown:
+        raise ValueError(f"Unknown criteria in config: {sorted(unknown)}")
+
+    enabled = config.get("enabled") or list(registry)
+    weights = config.get("weights", {})
+    specs = [
+        replace(registry[key], weight=weights.get(key, registry[key].weight))
+        for key in registry
+        if key in enabled and key not in config.get("disabled", [])
+    ]
+    result = (specs, version.hexdigest()[:16])
+    _ACTIVE_CRITERIA[memo_key] = result
+    return result
+
+
+def _at_lines(lines, limit: int = 5) -> str:
+    """' (lines 3, 8, 12)' suffix for a finding; at most `limit` lines are listed."""
+    lines = sorted(lines)
+    if not lines:
+        return ""
+    shown = ", ".join(map(str, lines[:limit])) + (", ..." if len(lines) > limit else "")
+    return f" (line{'s' if len(lines) > 1 else ''} {shown})"
+
+
+def get_cache_dir() -> Path:
+    """Default score cache directory: learned/quality-cache under the plugin root."""
+    return Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent)) / "learned" / "quality-cache"
+
+
+_CRITERIA_VERSION: Optional[str] = None
+
+
+def criteria_version() -> str:
+    """Hash of the analyzer and document model sources: any criterion change yields a new version."""
+    global _CRITERIA_VERSION
+    if _CRITERIA_VERSION is None:
+        digest = hashlib.sha256()
+        for module in (__file__, Path(__file__).parent / "component_document.py",
+                       Path(__file__).parent / "markdown_index.py"):
+            digest.update(Path(module).read_bytes())
+        _CRITERIA_VERSION = digest.hexdigest()[:16]
+    return _CRITERIA_VERSION
+
+
+def _tree_fingerprint(path: Path) -> Optional[List[Any]]:
+    """(relative path, size, mtime_ns) of a file or every file under a directory; None if missing."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    if not path.is_dir():
+        return [[path.name, stat.st_size, stat.st_mtime_ns]]
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        for name in sorted(filenames):
+            file = os.path.join(dirpath, name)
+            try:
+                stat = os.stat(file)
+            except FileNotFoundError:
+                continue
+            entries.append([os.path.relpath(file, path), stat.st_size, stat.st_mtime_ns])
+    return entries
+
+
+class QualityCache:
+    """Per-component cache of QualityCriterion results.
+
+    One JSON file per component path (sha1 of the absolute path) holding the
+    key it was computed for; a different key is a miss and is overwritten.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir()
+
+    def _entry(self, component: Path) -> Path:
+        name = hashlib.sha1(str(component.resolve()).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{name}.json"
+
+    def get(self, component: Path, key: str) -> Optional[Tuple[Dict[str, QualityCriterion], Dict[str, Any]]]:
+        """Criteria and the timings of the run that computed them, if cached under key."""
+        try:
+            entry = read_json(self._entry(component))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        try:
+            criteria = {name: QualityCriterion(**c) for name, c in entry["criteria"].items()}
+        except (AttributeError, KeyError, TypeError):
+            return None  # Malformed entry: recompute and overwrite it
+        timings = entry.get("timings")
+        return criteria, timings if isinstance(timings, dict) else {}
+
+    def put(self, component: Path, key: str, criteria: Dict[str, QualityCriterion],
+            timings: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write_json(self._entry(component), {
+                "component": str(component),
+                "key": key,
+                "criteria": {name: asdict(c) for name, c in criteria.items()},
+                "timings": timings or {}
+            }, indent=None)
+        except OSError:
+            pass  # An unwritable learned/ still analyzes, it just recomputes next time
+
+
 class QualityAnalyzer:
-    """Analyze component quality against criteria."""
-
-    CRITERIA_WEIGHTS = {
-        "trigger_specificity": 20,
-        "progressive_disclosure": 15,
-        "boundaries_clarity": 15,
-        "antipattern_awareness": 15,
-        "resource_organization": 10,
-        "writing_style": 10,
-        "examples_quality": 10,
-        "documentation": 5
-    }
-
-    def __init__(self, component_path: str):
+    """Analyze component quality against the active registered criteria."""
+
+    def __init__(self, component_path: str, document: Optional[ComponentDocument] = None,
+                 cache: Optional[QualityCache] = None, config: Optional[Dict[str, Any]] = None):
         self.path = Path(component_path)
         self.criteria: Dict[str, QualityCriterion] = {}
-        self.content = ""
-        self.frontmatter = {}
+        self.document = document
+        self.cache = cache
+        self.cached = False
+        self.specs, self.criteria_set_version = active_criteria(config)
+        self.weights = {spec.key: spec.weight for spec in self.specs}
+        self.timings: Dict[str, Any] = {}
+
+    @property
+    def content(self) -> str:
+        return self.document.text if self.document else ""
+
+    @property
+    def frontmatter(self) -> Dict[str, Any]:
+        return self.document.frontmatter if self.document else {}
 
     def analyze(self) -> Dict[str, Any]:
-        """Run full quality analysis."""
+        """Run full quality analysis (criteria come from the cache when unchanged)."""
         self._load_content()
 
-        # Analyze each criterion
-        self._analyze_trigger_specificity()
-        self._analyze_progressive_disclosure()
-        self._analyze_boundaries()
-        self._analyze_antipatterns()
-        self._analyze_organization()
-        self._analyze_writing_style()
-        self._analyze_examples()
-        self._analyze_documentation()
+        start = time.perf_counter()
+        key = self.cache_key() if self.cache is not None else None
+        cached = self.cache.get(self.path, key) if key else None
+        if cached is not None:
+            self.criteria, self.timings = cached
+            self.cached = True
+        else:
+            self._run_criteria()
+            if key:
+                self.cache.put(self.path, key, self.criteria, self.timings)
 
         # Calculate totals
         total_score = sum(c.score for c in self.criteria.values())
@@ -66,6 +332,7 @@ class QualityAnalyzer:
         return {
             "analysis_complete": True,
             "component": str(self.path),
+            "content_hash": self.document.content_hash,
             "total_score": total_score,
             "max_possible": max_possible,
             "percentage": round((total_score / max_possible) * 100) if max_possible > 0 else 0,
@@ -81,39 +348,61 @@ class QualityAnalyzer:
             },
             "strengths": self._get_strengths(),
             "improvements": self._get_improvements(),
-            "recommendation": self._get_recommendation(total_score)
+            "recommendation": self._get_recommendation(total_score, max_possible),
+            "timings": {
+                **self.timings,
+                "cached": self.cached,
+                "total_ms": round((time.perf_counter() - start) * 1000, 3)
+            }
         }
 
-    def _load_content(self) -> None:
-        """Load component content."""
-        main_file = self._find_main_file()
-        if not main_file:
-            return
-
-        self.content = main_file.read_text(encoding='utf-8')
-
-        try:
-            parts = self.content.split('---', 2)
-            self.frontmatter = yaml.safe_load(parts[1]) or {}
-        except:
-            self.frontmatter = {}
+    def _run_criteria(self) -> None:
+        """Run the active criteria, loading each declared input once before its first use."""
+        loaders = {
+            "frontmatter": lambda: self.document.description,
+            "body": lambda: (self.document.lower, self.document.body, self.document.index),
+            "filesystem": lambda: self.path.is_file()
+        }
+        inputs_ms: Dict[str, float] = {}
+        criteria_ms: Dict[str, float] = {}
+        # Stable sort: criteria sharing an input run back to back, in registration order
+        schedule = sorted(self.specs, key=lambda c: min(map(CRITERION_INPUTS.index, c.inputs), default=len(CRITERION_INPUTS)))
+        for spec in schedule:
+            for name in spec.inputs:
+                if name not in inputs_ms:
+                    start = time.perf_counter()
+                    loaders[name]()
+                    inputs_ms[name] = round((time.perf_counter() - start) * 1000, 3)
+            start = time.perf_counter()
+            self.criteria[spec.key] = spec.run(self)
+            criteria_ms[spec.key] = round((time.perf_counter() - start) * 1000, 3)
+        self.criteria = {spec.key: self.criteria[spec.key] for spec in self.specs}
+        self.timings = {"inputs_ms": inputs_ms, "criteria_ms": criteria_ms}
 
-    def _find_main_file(self) -> Path:
-        """Find main content file."""
-        if self.path.is_file():
-            return self.path
-        if (self.path / "SKILL.md").exists():
-            return self.path / "SKILL.md"
-        md_files = list(self.path.glob("*.md"))
-        return md_files[0] if md_files else None
+    def _load_content(self) -> None:
+        """Load component content (once, unless a parsed document was given; parsed lazily)."""
+        if self.document is None:
+            self.document = ComponentDocument.load(self.path) or ComponentDocument("")
+
+    def cache_key(self) -> str:
+        """Hash of everything the criteria read: main file, referenced paths, criteria version."""
+        is_dir = self.path.is_dir()
+        identity = [
+            self.criteria_set_version,
+            self.document.content_hash,
+            self.path.is_file(),
+            {name: _tree_fingerprint(self.path / name) for name in REFERENCED_PATHS} if is_dir else None
+        ]
+        return hashlib.sha256(json.dumps(identity).encode("utf-8")).hexdigest()[:32]
 
-    def _analyze_trigger_specificity(self) -> None:
+    @criterion("trigger_specificity", 20, ("frontmatter",))
+    def _analyze_trigger_specificity(self) -> QualityCriterion:
         """Analyze trigger phrase quality."""
-        weight = self.CRITERIA_WEIGHTS["trigger_specificity"]
+        weight = self.weights["trigger_specificity"]
         findings = []
         suggestions = []
 
-        desc = self.frontmatter.get('description', '')
+        desc_lower = self.document.description.lower()
 
         # Count trigger indicators
         trigger_patterns = [
@@ -125,7 +414,7 @@ class QualityAnalyzer:
 
         trigger_count = 0
         for pattern in trigger_patterns:
-            matches = re.findall(pattern, desc.lower())
+            matches = re.findall(pattern, desc_lower)
             trigger_count += len(matches)
 
         # Score based on trigger count
@@ -145,17 +434,18 @@ class QualityAnalyzer:
             findings.append("No trigger phrases found")
             suggestions.append("Add trigger phrases: 'Use when user mentions \"phrase1\", \"phrase2\"'")
 
-        self.criteria["trigger_specificity"] = QualityCriterion(
+        return QualityCriterion(
             "Trigger Specificity", weight, score, weight, findings, suggestions
         )
 
-    def _analyze_progressive_disclosure(self) -> None:
+    @criterion("progressive_disclosure", 15, ("body",))
+    def _analyze_progressive_disclosure(self) -> QualityCriterion:
         """Analyze content layering."""
-        weight = self.CRITERIA_WEIGHTS["progressive_disclosure"]
+        weight = self.weights["progressive_disclosure"]
         findings = []
         suggestions = []
 
-        lines = len(self.content.split('\n'))
+        lines = len(self.document.lines)
         has_references = 'references/' in self.content or '/references/' in self.content
 
         if lines <= 300:
@@ -178,81 +468,87 @@ class QualityAnalyzer:
                 findings.append(f"Too long: {lines} lines without references")
                 suggestions.append("Split detailed content into references/ directory")
 
-        self.criteria["progressive_disclosure"] = QualityCriterion(
+        return QualityCriterion(
             "Progressive Disclosure", weight, score, weight, findings, suggestions
         )
 
-    def _analyze_boundaries(self) -> None:
+    @criterion("boundaries_clarity", 15, ("frontmatter", "body"))
+    def _analyze_boundaries(self) -> QualityCriterion:
         """Analyze boundary clarity."""
-        weight = self.CRITERIA_WEIGHTS["boundaries_clarity"]
+        weight = self.weights["boundaries_clarity"]
         findings = []
         suggestions = []
 
-        content_lower = self.content.lower()
-        desc_lower = self.frontmatter.get('description', '').lower()
+        desc_lower = self.document.description.lower()
+        found = self.document.find_phrases(('not for', "don't", 'do not', 'avoid'))
+        section = next(
+            (h for h in self.document.sections if h.level >= 2 and h.title.lower().startswith(('when not', "don't"))),
+            None
+        )
 
-        has_not_for = 'not for' in desc_lower or 'not for' in content_lower
-        has_dont = "don't" in content_lower or "do not" in content_lower
-        has_avoid = 'avoid' in content_lower
-        has_section = '## when not' in content_lower or "## don't" in content_lower
+        has_not_for = 'not for' in desc_lower or 'not for' in found
+        has_dont = "don't" in found or "do not" in found
+        has_avoid = 'avoid' in found
+        has_section = section is not None
 
         boundary_count = sum([has_not_for, has_dont, has_avoid, has_section])
 
         if has_section and has_not_for:
             score = weight
-            findings.append("Excellent: Clear boundary section and description")
+            findings.append(f"Excellent: Clear boundary section (line {section.line}) and description")
         elif boundary_count >= 2:
             score = int(weight * 0.7)
-            findings.append("Good: Multiple boundary indicators")
+            findings.append(f"Good: Multiple boundary indicators{_at_lines(found.values())}")
             if not has_section:
                 suggestions.append("Add dedicated '## When NOT to Use' section")
         elif boundary_count >= 1:
             score = int(weight * 0.5)
-            findings.append("Fair: Some boundary indication")
+            findings.append(f"Fair: Some boundary indication{_at_lines(found.values())}")
             suggestions.append("Add clear DO/DON'T sections")
         else:
             score = 0
             findings.append("Missing: No boundary guidance found")
             suggestions.append("Add 'NOT for:' in description and '## When NOT to Use' section")
 
-        self.criteria["boundaries_clarity"] = QualityCriterion(
+        return QualityCriterion(
             "Boundaries Clarity", weight, score, weight, findings, suggestions
         )
 
-    def _analyze_antipatterns(self) -> None:
+    @criterion("antipattern_awareness", 15, ("body",))
+    def _analyze_antipatterns(self) -> QualityCriterion:
         """Analyze antipattern documentation."""
-        weight = self.CRITERIA_WEIGHTS["antipattern_awareness"]
+        weight = self.weights["antipattern_awareness"]
         findings = []
         suggestions = []
 
-        content_lower = self.content.lower()
-
-        antipattern_indicators = [
+        antipattern_indicators = (
             'anti-pattern', 'antipattern', 'common mistake',
             'wrong', 'incorrect', 'deprecated', '❌'
-        ]
+        )
 
-        found = [i for i in antipattern_indicators if i in content_lower]
+        lines = self.document.find_phrases(antipattern_indicators)
+        found = [i for i in antipattern_indicators if i in lines]
 
         if len(found) >= 3:
             score = weight
-            findings.append(f"Excellent: {len(found)} antipattern indicators")
+            findings.append(f"Excellent: {len(found)} antipattern indicators{_at_lines(lines.values())}")
         elif len(found) >= 1:
             score = int(weight * 0.6)
-            findings.append(f"Fair: Some antipattern guidance ({', '.join(found)})")
+            findings.append(f"Fair: Some antipattern guidance ({', '.join(f'{i} line {lines[i]}' for i in found)})")
             suggestions.append("Add dedicated '## Common Mistakes' section")
         else:
             score = 0
             findings.append("Missing: No antipattern documentation")
             suggestions.append("Document common mistakes and what to avoid")
 
-        self.criteria["antipattern_awareness"] = QualityCriterion(
+        return QualityCriterion(
             "Antipattern Awareness", weight, score, weight, findings, suggestions
         )
 
-    def _analyze_organization(self) -> None:
+    @criterion("resource_organization", 10, ("filesystem",))
+    def _analyze_organization(self) -> QualityCriterion:
         """Analyze resource organization."""
-        weight = self.CRITERIA_WEIGHTS["resource_organization"]
+        weight = self.weights["resource_organization"]
         findings = []
         suggestions = []
 
@@ -276,25 +572,24 @@ class QualityAnalyzer:
                 findings.append("Basic: Flat structure")
                 suggestions.append("Add scripts/ and/or references/ directories")
 
-        self.criteria["resource_organization"] = QualityCriterion(
+        return QualityCriterion(
             "Resource Organization", weight, score, weight, findings, suggestions
         )
 
-    def _analyze_writing_style(self) -> None:
+    @criterion("writing_style", 10, ("frontmatter", "body"))
+    def _analyze_writing_style(self) -> QualityCriterion:
         """Analyze writing style."""
-        weight = self.CRITERIA_WEIGHTS["writing_style"]
+        weight = self.weights["writing_style"]
         findings = []
         suggestions = []
 
-        desc = self.frontmatter.get('description', '')
-
         # Check for first/second person in description
-        first_second = re.findall(r'\b(i|you|your|my|we|our)\b', desc.lower())
+        first_second = re.findall(r'\b(i|you|your|my|we|our)\b', self.document.description.lower())
 
         # Check for imperative voice in body
-        body = self.content.split('---', 2)[-1] if '---' in self.content else self.content
+        opening = self.document.body[:500].lower()
         imperative_indicators = ['create', 'run', 'check', 'use', 'add', 'configure']
-        has_imperative = any(i in body.lower()[:500] for i in imperative_indicators)
+        has_imperative = any(i in opening for i in imperative_indicators)
 
         if not first_second and has_imperative:
             score = weight
@@ -312,60 +607,64 @@ class QualityAnalyzer:
             findings.append("Needs work: Style issues")
             suggestions.append("Use third person, imperative style")
 
-        self.criteria["writing_style"] = QualityCriterion(
+        return QualityCriterion(
             "Writing Style", weight, score, weight, findings, suggestions
         )
 
-    def _analyze_examples(self) -> None:
+    @criterion("examples_quality", 10, ("body",))
+    def _analyze_examples(self) -> QualityCriterion:
         """Analyze example quality."""
-        weight = self.CRITERIA_WEIGHTS["examples_quality"]
+        weight = self.weights["examples_quality"]
         findings = []
         suggestions = []
 
-        code_blocks = self.content.count('```')
-        example_count = code_blocks // 2  # Each example has opening and closing
+        code_blocks = self.document.code_blocks
+        example_count = len(code_blocks)
+        at_lines = _at_lines(b.start_line for b in code_blocks)
 
         if example_count >= 3:
             score = weight
-            findings.append(f"Excellent: {example_count} code examples")
+            findings.append(f"Excellent: {example_count} code examples{at_lines}")
         elif example_count >= 2:
             score = int(weight * 0.7)
-            findings.append(f"Good: {example_count} examples")
+            findings.append(f"Good: {example_count} examples{at_lines}")
             suggestions.append("Consider adding 1 more example")
         elif example_count >= 1:
             score = int(weight * 0.5)
-            findings.append("Fair: 1 example found")
+            findings.append(f"Fair: 1 example found{at_lines}")
             suggestions.append("Add 2 more working examples")
         else:
             score = 0
             findings.append("Missing: No code examples")
             suggestions.append("Add working examples in code blocks")
 
-        self.criteria["examples_quality"] = QualityCriterion(
+        return QualityCriterion(
             "Examples Quality", weight, score, weight, findings, suggestions
         )
 
-    def _analyze_documentation(self) -> None:
+    @criterion("documentation", 5, ("body", "filesystem"))
+    def _analyze_documentation(self) -> QualityCriterion:
         """Analyze documentation presence."""
-        weight = self.CRITERIA_WEIGHTS["documentation"]
+        weight = self.weights["documentation"]
         findings = []
         suggestions = []
 
         has_readme = (self.path / "README.md").exists() if self.path.is_dir() else False
-        has_headers = self.content.count('## ') >= 3
+        headers = sum(1 for h in self.document.sections if h.level >= 2)
+        has_headers = headers >= 3
 
         if has_readme and has_headers:
             score = weight
-            findings.append("Excellent: README and structured content")
+            findings.append(f"Excellent: README and structured content ({headers} sections)")
         elif has_headers:
             score = int(weight * 0.7)
-            findings.append("Good: Structured sections")
+            findings.append(f"Good: Structured sections ({headers})")
         else:
             score = int(weight * 0.4)
             findings.append("Basic: Minimal structure")
             suggestions.append("Add more section headers for organization")
 
-        self.criteria["documentation"] = QualityCriterion(
+        return QualityCriterion(
             "Documentation", weight, score, weight, findings, suggestions
         )
 
@@ -393,9 +692,9 @@ class QualityAnalyzer:
                 })
         return sorted(improvements, key=lambda x: -x["expected_gain"])
 
-    def _get_recommendation(self, score: int) -> str:
+    def _get_recommendation(self, score: int, max_possible: int = 100) -> str:
         """Get recommendation based on score."""
-        percentage = (score / 100) * 100
+        percentage = (score / max_possible) * 100 if max_possible > 0 else 0
         if percentage >= 80:
             return "approve"
         elif percentage >= 60:
@@ -404,16 +703,150 @@ class QualityAnalyzer:
             return "redesign"
 
 
+def discover_components(root: Path) -> List[Tuple[str, str]]:
+    """(kind, path) of every component under root, sorted by path.
+
+    Skills are directories with a SKILL.md; agents and commands are the .md
+    files directly inside agents/ and commands/ directories.
+    """
+    components = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        directory = Path(dirpath)
+        if "SKILL.md" in filenames:
+            components.append(("skill", str(directory)))
+        if directory.name in ("agents", "commands"):
+            kind = directory.name[:-1]
+            components.extend((kind, str(directory / f)) for f in filenames if f.endswith(".md"))
+    return sorted(components, key=lambda c: c[1])
+
+
+def _analyze_component(component: Tuple[str, str], cache_dir: Optional[str] = None,
+                       config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Worker: analysis of one component with its kind, wall time and cache hit."""
+    kind, path = component
+    start = time.perf_counter()
+    analyzer = QualityAnalyzer(path, cache=QualityCache(cache_dir) if cache_dir else None, config=config)
+    try:
+        result = analyzer.analyze()
+    except Exception as e:
+        result = {"analysis_complete": False, "component": path, "error": str(e)}
+    result["kind"] = kind
+    result["cached"] = analyzer.cached
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def analyze_many(components: List[Tuple[str, str]], jobs: int = 1, cache_dir: Optional[str] = None,
+                 config: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Analyze components across `jobs` processes, yielding results in component order."""
+    worker = functools.partial(_analyze_component, cache_dir=cache_dir, config=config)
+    if jobs > 1 and len(components) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            yield from pool.map(worker, components, chunksize=max(1, len(components) // (jobs * 4)))
+    else:
+        yield from map(worker, components)
+
+
+def format_table(results: List[Dict[str, Any]], wall_s: float, jobs: int) -> str:
+    """Aggregate table: score and time per component, then totals."""
+    width = max([len(r["component"]) for r in results] + [len("component")])
+    lines = [f"{'component':<{width}}  {'kind':<7}  {'score':>5}  {'recommendation':<14}  {'ms':>8}"]
+    for r in results:
+        score = f"{r['percentage']}%" if r.get("analysis_complete") else "error"
+        lines.append(
+            f"{r['component']:<{width}}  {r['kind']:<7}  {score:>5}  "
+            f"{r.get('recommendation', '-'):<14}  {r['elapsed_ms']:>8.2f}"
+        )
+    scored = [r["percentage"] for r in results if r.get("analysis_complete")]
+    cpu_ms = sum(r["elapsed_ms"] for r in results)
+    lines.append("")
+    lines.append(f"Components: {len(results)} ({len(results) - len(scored)} errors, "
+                 f"{sum(1 for r in results if r.get('cached'))} cached), "
+                 f"mean score {round(sum(scored) / len(scored)) if scored else 0}%")
+    lines.append(f"Wall time: {wall_s * 1000:.1f} ms with {jobs} jobs; "
+                 f"sum of component times: {cpu_ms:.1f} ms")
+    criteria_ms: Dict[str, float] = {}
+    for r in results:
+        for name, ms in r.get("timings", {}).get("criteria_ms", {}).items():
+            criteria_ms[name] = criteria_ms.get(name, 0.0) + ms
+    if criteria_ms:
+        slowest = sorted(criteria_ms.items(), key=lambda item: -item[1])[:3]
+        lines.append("Slowest criteria (summed, as computed): " +
+                     ", ".join(f"{name} {ms:.1f} ms" for name, ms in slowest))
+    return "\n".join(lines)
+
+
+def record_history(results: List[Dict[str, Any]], path: str) -> None:
+    """Append results to the score history under the commit checked out at path.
+
+    Best-effort: a history that can't be opened or written is reported on
+    stderr and never keeps the analysis from being printed.
+    """
+    try:
+        with ScoreHistory() as history:
+            history.record_many(results, commit=current_commit(path))
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: score history not recorded: {e}", file=sys.stderr)
+
+
+def main_recursive(args: List[str], cache_dir: Optional[str], config: Optional[Dict[str, Any]],
+                   history: bool = True) -> None:
+    jobs = os.cpu_count() or 1
+    if "--jobs" in args[:-1]:
+        i = args.index("--jobs")
+        jobs = int(args[i + 1])
+        args = args[:i] + args[i + 2:]
+    root = Path(args[0]) if args else Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent))
+
+    start = time.perf_counter()
+    results = []
+    for result in analyze_many(discover_components(root), jobs, cache_dir, config):
+        print(json.dumps(result), flush=True)
+        results.append(result)
+    print(format_table(results, time.perf_counter() - start, jobs), file=sys.stderr)
+    if history:
+        record_history(results, str(root))
+    if any(not r.get("analysis_complete") for r in results):
+        sys.exit(1)
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python analyze_quality.py <component_path>")
+    args = [a for a in sys.argv[1:] if a not in ("--no-cache", "--no-history")]
+    cache_dir = None if "--no-cache" in sys.argv else str(get_cache_dir())
+    history = "--no-history" not in sys.argv
+    config_path = None
+    if "--config" in args[:-1]:
+        i = args.index("--config")
+        config_path = args[i + 1]
+        args = args[:i] + args[i + 2:]
+    config = load_config(config_path)
+    if not args:
+        print("Usage: python analyze_quality.py <component_path> [--no-cache] [--no-history] [--config FILE]")
+        print("       python analyze_quality.py --recursive [root] [--jobs N] [--no-cache] [--no-history] [--config FILE]")
+        print("       python analyze_quality.py --list-criteria [--config FILE]")
         sys.exit(1)
 
-    component_path = sys.argv[1]
-    analyzer = QualityAnalyzer(component_path)
+    if args[0] == "--list-criteria":
+        specs, version = active_criteria(config)
+        print(json.dumps({
+            "version": version,
+            "criteria": [
+                {"key": c.key, "weight": c.weight, "inputs": list(c.inputs), "source": c.source} for c in specs
+            ]
+        }, indent=2))
+        return
+
+    if args[0] == "--recursive":
+        main_recursive(args[1:], cache_dir, config, history)
+        return
+
+    component_path = args[0]
+    analyzer = QualityAnalyzer(component_path, cache=QualityCache(cache_dir) if cache_dir else None, config=config)
     results = analyzer.analyze()
-
     print(json.dumps(results, indent=2))
+    if history:
+        record_history([results], component_path)
 
     # Summary
     print(f"\nScore: {results['percentage']}%", file=sys.stderr)
@@ -2,7 +2,7 @@
 """
 Apply learned patterns to improve components.
 
-Reads patterns from learned/patterns.json and applies high-confidence
+Reads patterns from the learned pattern store and applies high-confidence
 improvements automatically or in preview mode.
 
 Usage:
@@ -16,7 +16,11 @@ import json
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from pattern_store import open_store
+from storage import atomic_write_json, locked_json, read_json
 
 MIN_CONFIDENCE_AUTO = 0.9
 MIN_CONFIDENCE_MANUAL = 0.7
@@ -26,46 +30,26 @@ def get_plugin_root() -> Path:
     """Get plugin root directory."""
     return Path(__file__).parent.parent
 
-def load_patterns() -> Dict:
-    """Load learned patterns."""
-    patterns_file = get_plugin_root() / "learned" / "patterns.json"
-    if patterns_file.exists():
-        with open(patterns_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"patterns": [], "learning_stats": {"total_sessions": 0}}
-
 def load_applied() -> Dict:
     """Load applied improvements log."""
-    applied_file = get_plugin_root() / "learned" / "applied-improvements.json"
-    if applied_file.exists():
-        with open(applied_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+    return read_json(get_plugin_root() / "learned" / "applied-improvements.json", empty_applied)
+
+def empty_applied() -> Dict:
+    """Empty applied-improvements.json contents."""
     return {"applied": [], "last_review": None}
 
 def save_applied(data: Dict):
-    """Save applied improvements log."""
-    applied_file = get_plugin_root() / "learned" / "applied-improvements.json"
-    applied_file.parent.mkdir(exist_ok=True)
-    with open(applied_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-def get_applicable_patterns(patterns: List[Dict], min_confidence: float) -> List[Dict]:
-    """Filter patterns by confidence."""
-    return [
-        p for p in patterns
-        if p.get("confidence", 0) >= min_confidence
-        and not p.get("applied", False)
-    ]
+    """Save applied improvements log (atomic replace)."""
+    atomic_write_json(get_plugin_root() / "learned" / "applied-improvements.json", data)
 
 def get_status() -> Dict:
     """Get status of learned patterns."""
-    data = load_patterns()
     applied = load_applied()
-    patterns = data.get("patterns", [])
-    stats = data.get("learning_stats", {})
-
-    high_conf = get_applicable_patterns(patterns, MIN_CONFIDENCE_AUTO)
-    medium_conf = get_applicable_patterns(patterns, MIN_CONFIDENCE_MANUAL)
+    with open_store(get_plugin_root() / "learned") as store:
+        stats = store.get_meta("learning_stats", {})
+        total = store.count()
+        high_conf = store.query(min_confidence=MIN_CONFIDENCE_AUTO, applied=False)
+        medium_conf = store.count(min_confidence=MIN_CONFIDENCE_MANUAL, applied=False)
 
     sessions_since_review = stats.get("total_sessions", 0)
     if applied.get("last_review"):
@@ -73,10 +57,10 @@ def get_status() -> Dict:
         pass
 
     return {
-        "total_patterns": len(patterns),
+        "total_patterns": total,
         "high_confidence": len(high_conf),
-        "medium_confidence": len(medium_conf) - len(high_conf),
-        "low_confidence": len(patterns) - len(medium_conf),
+        "medium_confidence": medium_conf - len(high_conf),
+        "low_confidence": total - medium_conf,
         "already_applied": len(applied.get("applied", [])),
         "sessions_since_review": sessions_since_review,
         "review_recommended": sessions_since_review >= SESSIONS_BETWEEN_REVIEWS,
@@ -92,8 +76,8 @@ def get_status() -> Dict:
 
 def preview_improvements(component_path: str) -> Dict:
     """Preview what improvements would be applied."""
-    data = load_patterns()
-    patterns = get_applicable_patterns(data.get("patterns", []), MIN_CONFIDENCE_MANUAL)
+    with open_store(get_plugin_root() / "learned") as store:
+        patterns = store.query(min_confidence=MIN_CONFIDENCE_MANUAL, applied=False)
 
     improvements = []
     for pattern in patterns:
@@ -124,50 +108,51 @@ def preview_improvements(component_path: str) -> Dict:
     }
 
 def apply_improvements(component_path: str, auto: bool = False) -> Dict:
-    """Apply improvements to component."""
-    data = load_patterns()
-    applied_log = load_applied()
-
-    min_conf = MIN_CONFIDENCE_AUTO if auto else MIN_CONFIDENCE_MANUAL
-    patterns = get_applicable_patterns(data.get("patterns", []), min_conf)
-
-    applied_count = 0
-    skipped_count = 0
-    failed_count = 0
-    modified_files = []
-
-    for pattern in patterns:
-        try:
-            # In real implementation, this would:
-            # 1. Find matching content in component
-            # 2. Apply the improvement
-            # 3. Validate the change
-
-            # For now, just log it
-            applied_log["applied"].append({
-                "pattern_id": pattern.get("id", f"p-{len(applied_log['applied'])}"),
-                "type": pattern.get("type"),
-                "description": pattern.get("description"),
-                "applied_at": datetime.now().isoformat(),
-                "component": component_path,
-                "success": True
-            })
-
-            # Mark pattern as applied
-            pattern["applied"] = True
-            applied_count += 1
-
-        except Exception as e:
-            failed_count += 1
-
-    # Update last review time
-    applied_log["last_review"] = datetime.now().isoformat()
-    save_applied(applied_log)
-
-    # Save updated patterns
-    patterns_file = get_plugin_root() / "learned" / "patterns.json"
-    with open(patterns_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    """Apply improvements to component.
+
+    The pattern store and the applied log are locked (in that order) for the
+    whole run, so concurrent extractions are not overwritten.
+    """
+    learned_dir = get_plugin_root() / "learned"
+    with open_store(learned_dir) as store, store.transaction(), \
+            locked_json(learned_dir / "applied-improvements.json", empty_applied) as applied_log:
+        min_conf = MIN_CONFIDENCE_AUTO if auto else MIN_CONFIDENCE_MANUAL
+        patterns = store.query(min_confidence=min_conf, applied=False)
+
+        applied_count = 0
+        skipped_count = 0
+        failed_count = 0
+        modified_files = []
+
+        for pattern in patterns:
+            try:
+                # In real implementation, this would:
+                # 1. Find matching content in component
+                # 2. Apply the improvement
+                # 3. Validate the change
+
+                # For now, just log it
+                applied_log["applied"].append({
+                    "pattern_id": pattern.get("id", f"p-{len(applied_log['applied'])}"),
+                    "type": pattern.get("type"),
+                    "description": pattern.get("description"),
+                    "applied_at": datetime.now().isoformat(),
+                    "component": component_path,
+                    "success": True
+                })
+
+                # Mark pattern as applied
+                pattern["applied"] = True
+                applied_count += 1
+
+            except Exception as e:
+                failed_count += 1
+
+        # Update last review time
+        applied_log["last_review"] = datetime.now().isoformat()
+
+        # Save updated patterns
+        store.upsert(p for p in patterns if p.get("applied"))
 
     return {
         "application_complete": True,
@@ -181,23 +166,22 @@ def apply_improvements(component_path: str, auto: bool = False) -> Dict:
 
 def check_should_review() -> Dict:
     """Check if automatic review is recommended."""
-    data = load_patterns()
-    stats = data.get("learning_stats", {})
-    applied = load_applied()
+    with open_store(get_plugin_root() / "learned") as store:
+        stats = store.get_meta("learning_stats", {})
+        high_conf = store.count(min_confidence=MIN_CONFIDENCE_AUTO, applied=False)
 
     sessions = stats.get("total_sessions", 0)
-    high_conf = get_applicable_patterns(data.get("patterns", []), MIN_CONFIDENCE_AUTO)
 
     should_review = (
         sessions >= SESSIONS_BETWEEN_REVIEWS or
-        len(high_conf) >= 3
+        high_conf >= 3
     )
 
     return {
         "should_review": should_review,
-        "reason": "High confidence patterns available" if len(high_conf) >= 3
+        "reason": "High confidence patterns available" if high_conf >= 3
                   else f"Sessions threshold ({sessions}/{SESSIONS_BETWEEN_REVIEWS})",
-        "high_confidence_patterns": len(high_conf)
+        "high_confidence_patterns": high_conf
     }
 
 def main():
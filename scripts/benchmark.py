@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Benchmarks - Measure hook and script latency.
+
+Runs in a temporary plugin root so learned/ data is never touched.
+
+Usage:
+  python benchmark.py tracker [events] [prefill]   - Per-event hook latency: in-process vs daemon
+  python benchmark.py storage [writers] [updates]  - Concurrent pattern store writers (lost updates, contention)
+  python benchmark.py patterns [stored] [ops]      - Hook-style pattern store operations: json vs sqlite
+  python benchmark.py suggest [stored] [queries]   - Pattern suggestions: linear trigger scan vs trigger index
+  python benchmark.py extract [turns]              - Transcript pattern extraction: per-detector regexes vs feature engine
+  python benchmark.py workflows [calls]            - Repeated-workflow mining time as the tool stream grows
+  python benchmark.py history [runs] [components]  - Score history append and query latency
+  python benchmark.py schemas [validations]        - Schema validator load (compile / persisted / in-process) and validation
+"""
+
+import json
+import multiprocessing
+import io
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+SCRIPTS_DIR = Path(__file__).parent
+
+
+def _latency_summary(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (seconds) in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "events": len(samples),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2)
+    }
+
+
+def _run_events(script: str, events: int, env: Dict[str, str]) -> List[float]:
+    """Invoke a tracker script once per event, the way the PostToolUse hook does."""
+    samples = []
+    result_text = "x" * 2000
+    for i in range(events):
+        cmd = [
+            sys.executable, str(SCRIPTS_DIR / script), "track",
+            "Bash" if i % 3 else "Read", result_text, "true" if i % 5 else "false",
+            f"Context: command {i}"
+        ]
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_tracker(events: int = 200, prefill: int = 0) -> Dict:
+    """Compare per-event latency of in-process tracking and the tracker daemon."""
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["CLAUDE_PLUGIN_ROOT"] = tmp
+        env["UC_TRACKER_SOCKET"] = str(Path(tmp) / "tracker.sock")
+
+        sys.path.insert(0, str(SCRIPTS_DIR))
+        os.environ.update({k: env[k] for k in ("CLAUDE_PLUGIN_ROOT", "UC_TRACKER_SOCKET")})
+
+        for mode, script in (("in_process", "context_tracker.py"), ("daemon", "tracker_client.py")):
+            env["CLAUDE_SESSION_ID"] = f"bench-{mode}"
+            os.environ["CLAUDE_SESSION_ID"] = env["CLAUDE_SESSION_ID"]
+
+            if prefill:
+                import context_tracker
+                for i in range(prefill):
+                    context_tracker.track_action("Read", "y" * 200, True, f"prefill {i}")
+
+            if mode == "daemon":
+                subprocess.run(
+                    [sys.executable, str(SCRIPTS_DIR / "tracker_client.py"), "start"],
+                    env=env, stdout=subprocess.DEVNULL, check=True
+                )
+            try:
+                results[mode] = _latency_summary(_run_events(script, events, env))
+            finally:
+                if mode == "daemon":
+                    subprocess.run(
+                        [sys.executable, str(SCRIPTS_DIR / "tracker_client.py"), "stop"],
+                        env=env, stdout=subprocess.DEVNULL
+                    )
+
+    results["speedup"] = round(results["in_process"]["mean_ms"] / results["daemon"]["mean_ms"], 2)
+    results["prefilled_actions"] = prefill
+    return results
+
+
+def _storage_writer(args: tuple) -> Dict:
+    """Stress worker: append `updates` patterns through the locked read-modify-write."""
+    plugin_root, writer, updates = args
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import storage
+    from self_improve import SelfImprover
+
+    with SelfImprover(plugin_root) as improver:
+        for i in range(updates):
+            improver.add_patterns([{"name": f"w{writer}-p{i}", "confidence": 80, "triggers": [f"t{i}"]}])
+            improver.update_component_stats("skill", 80, first_pass=bool(i % 2))
+    return storage.lock_stats()
+
+
+def bench_storage(writers: int = 8, updates: int = 25) -> Dict:
+    """Stress test: many processes updating the pattern store and stats.json at once.
+
+    Every update must survive; the file must stay valid JSON throughout.
+    """
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from pattern_store import open_store
+    from storage import read_json
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        with multiprocessing.Pool(writers) as pool:
+            per_writer = pool.map(_storage_writer, [(tmp, w, updates) for w in range(writers)])
+        elapsed = time.perf_counter() - start
+
+        with open_store(Path(tmp) / "learned") as store:
+            patterns = store.query()
+            backend = store.backend
+        stats = read_json(Path(tmp) / "learned" / "stats.json")
+
+    expected = writers * updates
+    acquired = sum(w["acquired"] for w in per_writer)
+    return {
+        "backend": backend,
+        "writers": writers,
+        "updates_per_writer": updates,
+        "expected_patterns": expected,
+        "stored_patterns": len(patterns),
+        "expected_components": expected,
+        "stored_components": stats.get("total_components", 0),
+        "lost_updates": (expected - len(patterns)) + (expected - stats.get("total_components", 0)),
+        "elapsed_s": round(elapsed, 3),
+        "locked_writes_per_s": round(acquired / elapsed, 1),
+        "lock_acquisitions": acquired,
+        "contended_acquisitions": sum(w["contended"] for w in per_writer),
+        "contention_rate": round(sum(w["contended"] for w in per_writer) / acquired, 3) if acquired else 0,
+        "retries": sum(w["retries"] for w in per_writer),
+        "timeouts": sum(w["timeouts"] for w in per_writer),
+        "wait_ms_mean": round(sum(w["wait_s_total"] for w in per_writer) / acquired * 1000, 3) if acquired else 0,
+        "wait_ms_max": round(max(w["wait_s_max"] for w in per_writer) * 1000, 3)
+    }
+
+
+def bench_pattern_store(stored: int = 5000, ops: int = 50) -> Dict:
+    """Per-hook cost of the pattern store backends with `stored` patterns on disk.
+
+    Each op opens the store (as a hook process would), adds one pattern with a
+    stats update, and runs the apply_learned check query.
+    """
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from pattern_store import open_store
+
+    # Recent timestamps: measures steady-state writes, not a retention backlog
+    now = datetime.now()
+    doc = {
+        "patterns": [
+            {
+                "id": f"p-{i}", "type": "context_learned", "tool": f"Tool{i % 20}",
+                "confidence": (i % 100) / 100, "applied": i % 3 == 0,
+                "description": "x" * 200, "learned_at": (now - timedelta(seconds=i)).isoformat()
+            }
+            for i in range(stored)
+        ],
+        "learning_stats": {"total_sessions": 0}
+    }
+    results = {"stored_patterns": stored, "ops": ops}
+
+    for backend in ("json", "sqlite"):
+        with tempfile.TemporaryDirectory() as tmp:
+            learned_dir = Path(tmp) / "learned"
+            with open_store(learned_dir, backend) as store:
+                store.import_document(doc)
+
+            samples = []
+            for i in range(ops):
+                start = time.perf_counter()
+                with open_store(learned_dir, backend) as store:
+                    with store.transaction():
+                        store.upsert([{"id": f"new-{i}", "type": "context_learned", "confidence": 0.8}])
+                        stats = store.get_meta("learning_stats", {})
+                        stats["total_sessions"] = stats.get("total_sessions", 0) + 1
+                        store.set_meta("learning_stats", stats)
+                    store.count(min_confidence=0.9, applied=False)
+                samples.append(time.perf_counter() - start)
+            results[backend] = _latency_summary(samples)
+
+    results["speedup"] = round(results["json"]["mean_ms"] / results["sqlite"]["mean_ms"], 2)
+    return results
+
+
+def bench_suggest(stored: int = 10000, queries: int = 200, top_k: int = 10) -> Dict:
+    """Latency of get_pattern_suggestions: per-pattern substring scan vs trigger index."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from pattern_store import open_store
+    from trigger_index import get_matcher, suggest
+
+    vocabulary = [f"term{i}" for i in range(stored // 4 or 1)]
+    doc = {
+        "patterns": [
+            {
+                "id": f"p-{i}", "type": "context_learned", "confidence": (i * 37 % 100) / 100,
+                "triggers": [vocabulary[i % len(vocabulary)], f"{vocabulary[i * 7 % len(vocabulary)]} call"]
+            }
+            for i in range(stored)
+        ]
+    }
+    contexts = [
+        " ".join(f"{vocabulary[(q * 13 + j) % len(vocabulary)]} call" for j in range(20)) + " " + "x" * 400
+        for q in range(queries)
+    ]
+
+    def linear(store, context: str) -> List[Dict]:
+        context_lower = context.lower()
+        relevant = [p for p in store.query() if any(t.lower() in context_lower for t in p.get("triggers", []))]
+        return sorted(relevant, key=lambda p: -p.get("confidence", 0))[:top_k]
+
+    results = {"stored_patterns": stored, "queries": queries, "top_k": top_k}
+    with tempfile.TemporaryDirectory() as tmp:
+        with open_store(Path(tmp) / "learned", "sqlite") as store:
+            store.import_document(doc)
+
+            start = time.perf_counter()
+            get_matcher(store)
+            results["index_build_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+            for name, fn in (("linear", linear), ("indexed", lambda s, c: suggest(s, c, top_k))):
+                samples = []
+                for context in contexts:
+                    start = time.perf_counter()
+                    fn(store, context)
+                    samples.append(time.perf_counter() - start)
+                results[name] = _latency_summary(samples)
+
+            results["same_results"] = all(
+                [p["id"] for p in linear(store, c)] == [p["id"] for p in suggest(store, c, top_k)]
+                for c in contexts[:20]
+            )
+
+    results["speedup"] = round(results["linear"]["mean_ms"] / results["indexed"]["mean_ms"], 2)
+    return results
+
+
+def _synthetic_transcript(turns: int, seed: int = 0) -> str:
+    """Transcript of alternating user/assistant turns with tool calls, errors and corrections."""
+    rng = random.Random(seed)
+    filler = ("the component reads its configuration and updates the generated files "
+              "before running the validation step on each changed module ").split()
+    user_lines = [
+        "Please add a section about configuration", "no, actually use the other approach",
+        "That's not right, the hook should be async", "it works: thanks", "the description is too vague",
+        "missing examples in the skill", "I'd prefer if it validated the schema first"
+    ]
+    assistant_lines = [
+        "Read(scripts/validate.py) then Edit(scripts/validate.py)", "Bash(npm test) Grep(TODO)",
+        "Error: module not found while importing the validator", "Fixed: the import path was wrong",
+        "Glob(**/*.md) Read(README.md)", "The schema should include a version field", "Write(agents/helper.md)"
+    ]
+    parts = []
+    for i in range(turns):
+        role, lines = ("Human", user_lines) if i % 2 == 0 else ("Assistant", assistant_lines)
+        body = [rng.choice(lines)] + [
+            " ".join(rng.choice(filler) for _ in range(rng.randint(8, 20))) for _ in range(rng.randint(2, 12))
+        ]
+        parts.append(f"{role}: " + "\n".join(body))
+    return "\n".join(parts) + "\n"
+
+
+class _PerDetectorScan:
+    """The pre-engine scan: each detector lowercases the turn and re.searches its own patterns."""
+
+    def __init__(self, detectors):
+        self.detectors = detectors
+        self.bits: Dict[str, int] = {}
+        for detector in detectors:
+            for feature, _ in detector.rules:
+                self.bits.setdefault(feature, 1 << len(self.bits))
+
+    def mask(self, *features: str) -> int:
+        return sum(self.bits[f] for f in set(features))
+
+    def scan(self, content: str) -> int:
+        found = 0
+        for detector in self.detectors:
+            text = content.lower()
+            for feature, pattern in detector.rules:
+                if not found & self.bits[feature] and re.search(pattern, text):
+                    found |= self.bits[feature]
+        return found
+
+
+def bench_extract(turns: int = 20000) -> Dict:
+    """Transcript extraction throughput: per-detector regex scans vs the compiled feature engine."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import extract_patterns
+    from extract_patterns import DETECTORS, PatternExtractor, get_engine, iter_lines, iter_turns
+
+    transcript = _synthetic_transcript(turns)
+    results = {"turns": turns, "transcript_mb": round(len(transcript.encode()) / 1e6, 2)}
+
+    contents = [turn["content"] for turn in iter_turns(iter_lines(io.StringIO(transcript)))]
+    outputs = {}
+    for name, engine in (("per_detector", _PerDetectorScan(DETECTORS)), ("feature_engine", get_engine())):
+        start = time.perf_counter()
+        for content in contents:
+            engine.scan(content)
+        scan_s = time.perf_counter() - start
+
+        extract_patterns._ENGINE = engine
+        try:
+            start = time.perf_counter()
+            patterns = PatternExtractor().extract_from_stream(io.StringIO(transcript))
+            elapsed = time.perf_counter() - start
+        finally:
+            extract_patterns._ENGINE = None
+        outputs[name] = [(p.type, p.name, p.source_turns) for p in patterns]
+        results[name] = {
+            "elapsed_s": round(elapsed, 3),
+            "turns_per_s": round(turns / elapsed),
+            "mb_per_s": round(results["transcript_mb"] / elapsed, 2),
+            "scan_s": round(scan_s, 3),
+            "patterns": len(patterns)
+        }
+
+    results["same_patterns"] = outputs["per_detector"] == outputs["feature_engine"]
+    results["speedup"] = round(results["per_detector"]["elapsed_s"] / results["feature_engine"]["elapsed_s"], 2)
+    results["scan_speedup"] = round(results["per_detector"]["scan_s"] / results["feature_engine"]["scan_s"], 2)
+    return results
+
+
+def bench_workflows(calls: int = 1000000) -> Dict:
+    """mine_repeats time on tool streams of growing length (recurring motifs plus noise)."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import math
+    from extract_patterns import WORKFLOW_MIN_FREQUENCY, WORKFLOW_MIN_SUPPORT, mine_repeats
+
+    rng = random.Random(0)
+    motifs = [[rng.randrange(12) for _ in range(rng.randint(2, 5))] for _ in range(30)]
+    stream: List[int] = []
+    while len(stream) < calls:
+        stream.extend(rng.choice(motifs) if rng.random() < 0.7 else [rng.randrange(12)])
+
+    results = {"runs": []}
+    size = 1000
+    while size <= calls:
+        min_support = max(WORKFLOW_MIN_SUPPORT, math.ceil(size * WORKFLOW_MIN_FREQUENCY))
+        start = time.perf_counter()
+        repeats = mine_repeats(stream[:size], min_support)
+        elapsed = time.perf_counter() - start
+        results["runs"].append({
+            "tool_calls": size,
+            "min_support": min_support,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "us_per_call": round(elapsed * 1e6 / size, 2),
+            "workflows": len(repeats)
+        })
+        size *= 10
+    return results
+
+
+def bench_history(runs: int = 50000, components: int = 500, queries: int = 50) -> Dict:
+    """Score history: bulk append of analysis results, then trend / regressions / worst latency."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from score_history import ScoreHistory
+
+    rng = random.Random(0)
+    criteria = ["trigger_specificity", "progressive_disclosure", "boundaries_clarity", "antipattern_awareness",
+                "resource_organization", "writing_style", "examples_quality", "documentation"]
+    paths = [f"/bench/skills/skill-{i}" for i in range(components)]
+    commits = [f"{i:040x}" for i in range(max(1, runs // components))]
+
+    def result(path: str) -> Dict:
+        scores = {name: {"score": rng.randrange(0, 16), "max": 15} for name in criteria}
+        total = sum(c["score"] for c in scores.values())
+        return {"analysis_complete": True, "component": path, "kind": "skill", "total_score": total,
+                "max_possible": 120, "percentage": round(total * 100 / 120), "criteria": scores,
+                "content_hash": f"{rng.getrandbits(64):016x}"}
+
+    results = {"runs": runs, "components": components, "commits": len(commits)}
+    with tempfile.TemporaryDirectory() as tmp:
+        with ScoreHistory(Path(tmp) / "history.db") as history:
+            start = time.perf_counter()
+            for i, commit in enumerate(commits):
+                history.record_many([result(p) for p in paths], commit=commit, ts=1_700_000_000 + i * 3600)
+            elapsed = time.perf_counter() - start
+            results["append_us_per_run"] = round(elapsed * 1e6 / (len(commits) * components), 2)
+            results["db_bytes"] = history.stats()["bytes"]
+
+            for name, query in (
+                ("trend", lambda q: history.trend(paths[q % components])),
+                ("regressions", lambda q: history.regressions(commits[q % len(commits)], commits[-1])),
+                ("worst", lambda q: history.worst(10))
+            ):
+                samples = []
+                for q in range(queries):
+                    start = time.perf_counter()
+                    query(q)
+                    samples.append(time.perf_counter() - start)
+                results[name] = _latency_summary(samples)
+    return results
+
+
+def bench_schemas(validations: int = 2000) -> Dict:
+    """Schema validators: cold compile vs persisted load vs in-process cache, and per-document validation."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import schema_validator
+    import yaml
+
+    plugin_root = SCRIPTS_DIR.parent
+    samples = {
+        "agent-frontmatter": list((plugin_root / "agents").glob("*.md")),
+        "skill-frontmatter": [p / "SKILL.md" for p in (plugin_root / "skills").iterdir() if (p / "SKILL.md").exists()],
+        "hooks-config": [plugin_root / "hooks" / "hooks.json"],
+        "plugin-manifest": [plugin_root / ".claude-plugin" / "plugin.json"],
+    }
+    documents = {}
+    for name, paths in samples.items():
+        documents[name] = []
+        for path in paths:
+            text = path.read_text(encoding="utf-8")
+            documents[name].append(json.loads(text) if path.suffix == ".json" else yaml.safe_load(text.split("---", 2)[1]))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in schema_validator.schema_names():
+            row = {}
+            for phase in ("compiled", "disk", "memory"):
+                if phase != "memory":
+                    schema_validator._VALIDATORS.clear()
+                start = time.perf_counter()
+                validator = schema_validator.get_validator(name, compiled_dir=Path(tmp))
+                row[f"{phase}_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            if documents.get(name):
+                start = time.perf_counter()
+                for i in range(validations):
+                    validator.validate(documents[name][i % len(documents[name])])
+                row["validate_us"] = round((time.perf_counter() - start) * 1e6 / validations, 2)
+            results[name] = row
+    return results
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark.py <benchmark> [args]")
+        print("\nBenchmarks:")
+        print("  tracker [events] [prefill]  - Hook latency: in-process vs daemon")
+        print("  storage [writers] [updates] - Concurrent writer stress test")
+        print("  patterns [stored] [ops]     - Pattern store op latency: json vs sqlite")
+        print("  suggest [stored] [queries]  - Suggestion latency: linear scan vs trigger index")
+        print("  extract [turns]             - Extraction throughput: per-detector regexes vs feature engine")
+        print("  workflows [calls]           - Workflow mining time vs tool stream length")
+        print("  history [runs] [components] - Score history append and query latency")
+        print("  schemas [validations]       - Schema validator load and validation latency")
+        sys.exit(1)
+
+    name = sys.argv[1]
+
+    if name == 'tracker':
+        events = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+        prefill = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+        result = bench_tracker(events, prefill)
+    elif name == 'storage':
+        writers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+        updates = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+        result = bench_storage(writers, updates)
+    elif name == 'patterns':
+        stored = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+        ops = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+        result = bench_pattern_store(stored, ops)
+    elif name == 'suggest':
+        stored = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+        queries = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+        result = bench_suggest(stored, queries)
+    elif name == 'extract':
+        turns = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+        result = bench_extract(turns)
+    elif name == 'workflows':
+        calls = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+        result = bench_workflows(calls)
+    elif name == 'history':
+        runs = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+        components = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+        result = bench_history(runs, components)
+    elif name == 'schemas':
+        validations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+        result = bench_schemas(validations)
+    else:
+        print(f"Unknown benchmark: {name}")
+        sys.exit(1)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
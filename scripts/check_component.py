@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Component Check - Quality analysis, validation and self-tests with one parse.
+
+Reads the component's main file once into a ComponentDocument and hands it
+to QualityAnalyzer, ComponentValidator and SelfTestRunner. The quality
+result is appended to the score history, as by analyze_quality.py.
+
+Usage:
+  python check_component.py <component_path> [--no-history]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).parent))
+from analyze_quality import QualityAnalyzer, load_config, record_history
+from component_document import ComponentDocument
+from run_self_tests import SelfTestRunner
+from validate_component import ComponentValidator, Severity
+
+
+def check(component_path: str) -> Dict[str, Any]:
+    """Run all three tools on a component over a single parsed document."""
+    timings = {}
+
+    start = time.perf_counter()
+    document = ComponentDocument.load(component_path)
+    timings["parse_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    quality = QualityAnalyzer(component_path, document, config=load_config()).analyze()
+    timings["quality_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    validator = ComponentValidator(component_path, document)
+    score, issues = validator.validate()
+    timings["validation_ms"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    self_test = SelfTestRunner(component_path, document).run_all_tests()
+    timings["self_test_ms"] = (time.perf_counter() - start) * 1000
+
+    errors = sum(1 for i in issues if i.severity == Severity.ERROR)
+    return {
+        "component": component_path,
+        "main_file": str(document.path) if document else None,
+        "passed": errors == 0 and self_test["score"] >= 80,
+        "quality": quality,
+        "validation": {
+            "type": validator.component_type,
+            "score": score,
+            "errors": errors,
+            "issues": [
+                {
+                    "severity": i.severity.value,
+                    "code": i.code,
+                    "message": i.message,
+                    "file": i.file,
+                    "line": i.line,
+                    "suggestion": i.suggestion
+                }
+                for i in issues
+            ]
+        },
+        "self_test": self_test,
+        "timings": {k: round(v, 2) for k, v in timings.items()}
+    }
+
+
+def main():
+    args = [a for a in sys.argv[1:] if a != "--no-history"]
+    if not args:
+        print("Usage: python check_component.py <component_path> [--no-history]")
+        sys.exit(1)
+
+    result = check(args[0])
+    print(json.dumps(result, indent=2))
+    if "--no-history" not in sys.argv:
+        record_history([result["quality"]], args[0])
+
+    print(f"\nQuality: {result['quality']['percentage']}% ({result['quality']['recommendation']})", file=sys.stderr)
+    print(f"Validation: {result['validation']['score']}/100, {result['validation']['errors']} errors", file=sys.stderr)
+    print(f"Self-tests: {result['self_test']['passed']} passed, {result['self_test']['failed']} failed", file=sys.stderr)
+
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == '__main__':
+    main()
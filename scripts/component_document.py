@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Component Document - One parsed view of a component's main file.
+
+QualityAnalyzer, ComponentValidator and SelfTestRunner all read the same
+Markdown file, split off its YAML frontmatter and scan the text. A
+ComponentDocument reads the file once; every derived field (frontmatter,
+body, lowercase text, lines, the Markdown block index, link targets) is
+computed on first use and then shared by all three tools.
+
+Usage:
+  python component_document.py <component_path>   - Print the parsed fields
+"""
+
+import bisect
+import hashlib
+import json
+import re
+import sys
+import yaml
+from dataclasses import asdict
+from functools import cached_property
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from markdown_index import CodeBlock, Heading, MarkdownIndex, index_markdown
+
+_LINK = re.compile(r"\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+
+
+def find_main_file(path: Path) -> Optional[Path]:
+    """Main content file of a component: the file itself, SKILL.md, or the first .md file."""
+    if path.is_file():
+        return path
+    if (path / "SKILL.md").exists():
+        return path / "SKILL.md"
+    md_files = list(path.glob("*.md"))
+    return md_files[0] if md_files else None
+
+
+class ComponentDocument:
+    """A component's main file, read once, with lazily derived fields."""
+
+    def __init__(self, text: str, path: Optional[Path] = None):
+        self.text = text
+        self.path = path
+        self._counts: Dict[str, int] = {}
+
+    @classmethod
+    def load(cls, component_path) -> Optional["ComponentDocument"]:
+        """Document of a component's main file, or None if it has none."""
+        main_file = find_main_file(Path(component_path))
+        if main_file is None or not main_file.is_file():
+            return None
+        return cls(main_file.read_text(encoding="utf-8"), main_file)
+
+    def count(self, substring: str) -> int:
+        """Occurrences of substring in the text (memoized)."""
+        if substring not in self._counts:
+            self._counts[substring] = self.text.count(substring)
+        return self._counts[substring]
+
+    @cached_property
+    def content_hash(self) -> str:
+        """sha256 of the text."""
+        return hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def lines(self) -> List[str]:
+        return self.text.split("\n")
+
+    @cached_property
+    def line_starts(self) -> List[int]:
+        """Offset of the first character of every line."""
+        return list(accumulate((len(line) + 1 for line in self.lines[:-1]), initial=0))
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number of a character offset."""
+        return bisect.bisect_right(self.line_starts, offset)
+
+    @cached_property
+    def has_frontmatter(self) -> bool:
+        return self.text.startswith("---")
+
+    @cached_property
+    def parts(self) -> List[str]:
+        """text.split('---', 2): prefix, frontmatter, body when well formed."""
+        return self.text.split("---", 2)
+
+    @cached_property
+    def _frontmatter_result(self) -> Tuple[Any, Optional[Exception]]:
+        try:
+            return yaml.safe_load(self.parts[1]), None
+        except Exception as e:
+            return None, e
+
+    @property
+    def frontmatter_data(self) -> Any:
+        """The parsed frontmatter as YAML produced it (None if missing or invalid)."""
+        return self._frontmatter_result[0]
+
+    @property
+    def frontmatter_error(self) -> Optional[Exception]:
+        """Why the frontmatter did not parse, if it did not."""
+        return self._frontmatter_result[1]
+
+    @cached_property
+    def frontmatter(self) -> Dict[str, Any]:
+        """The frontmatter mapping ({} if missing, invalid or not a mapping)."""
+        data = self.frontmatter_data
+        return data if isinstance(data, dict) else {}
+
+    @cached_property
+    def description(self) -> str:
+        desc = self.frontmatter.get("description", "")
+        return desc if isinstance(desc, str) else str(desc)
+
+    @cached_property
+    def body(self) -> str:
+        """Text after the frontmatter (the whole text without any '---')."""
+        return self.parts[-1] if "---" in self.text else self.text
+
+    @cached_property
+    def body_start_line(self) -> int:
+        """First line after a well-formed frontmatter block (1 without one)."""
+        if not self.has_frontmatter or len(self.parts) < 3:
+            return 1
+        return self.text.count("\n", 0, len(self.parts[0]) + len(self.parts[1]) + 6) + 2
+
+    @cached_property
+    def index(self) -> MarkdownIndex:
+        """Headings, code blocks, lists and tables of the body, from one scan."""
+        return index_markdown(self.lines, self.body_start_line)
+
+    @property
+    def sections(self) -> List[Heading]:
+        """Headings outside code blocks, with their section's line range."""
+        return self.index.headings
+
+    @cached_property
+    def code_blocks(self) -> List[CodeBlock]:
+        """Closed fenced code blocks: language, start_line, end_line, content."""
+        return [block for block in self.index.code_blocks if block.closed]
+
+    @cached_property
+    def _lower_line_starts(self) -> List[int]:
+        # lower() can change the length of a few non-ASCII characters
+        if len(self.lower) == len(self.text):
+            return self.line_starts
+        return list(accumulate((len(line) + 1 for line in self.lower.split("\n")[:-1]), initial=0))
+
+    def find_phrases(self, phrases: Tuple[str, ...], prose_only: bool = True) -> Dict[str, int]:
+        """First line of each phrase found in the lowercase text.
+
+        With prose_only, fenced code blocks are skipped as a whole, so each
+        phrase costs one str.find per code block it occurs in.
+        """
+        starts = self._lower_line_starts
+        found: Dict[str, int] = {}
+        for phrase in phrases:
+            offset = self.lower.find(phrase)
+            while offset != -1:
+                line = bisect.bisect_right(starts, offset)
+                block = self.index.code_block_at(line) if prose_only else None
+                if block is None:
+                    found[phrase] = line
+                    break
+                if block.end_line >= len(starts):
+                    break
+                offset = self.lower.find(phrase, starts[block.end_line])
+        return found
+
+    @cached_property
+    def link_targets(self) -> List[str]:
+        """Targets of Markdown links, in order."""
+        return _LINK.findall(self.text)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python component_document.py <component_path>")
+        sys.exit(1)
+
+    document = ComponentDocument.load(sys.argv[1])
+    if document is None:
+        print(json.dumps({"error": f"No main file found: {sys.argv[1]}"}))
+        sys.exit(1)
+
+    print(json.dumps({
+        "path": str(document.path),
+        "lines": len(document.lines),
+        "frontmatter": document.frontmatter,
+        "frontmatter_error": str(document.frontmatter_error) if document.frontmatter_error else None,
+        "sections": [asdict(h) for h in document.sections],
+        "code_blocks": [{k: v for k, v in asdict(b).items() if k != "content"} for b in document.code_blocks],
+        "lists": [asdict(b) for b in document.index.lists],
+        "tables": [asdict(t) for t in document.index.tables],
+        "link_targets": document.link_targets
+    }, indent=2, default=str))
+
+
+if __name__ == '__main__':
+    main()
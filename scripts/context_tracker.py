@@ -8,8 +8,15 @@ as "what not to do" (antipatterns).
 
 Includes review/accept flow for quality control.
 
+Session events are appended to learned/sessions/session-<id>.jsonl, one
+record per line. Analysis commands read running per-tool aggregates
+(session-<id>.jsonl.agg) that fold in only the records appended since the
+last snapshot. Legacy session-<id>.json files are migrated on first use (or via `migrate`).
+
 Usage:
   python context_tracker.py track <tool> <result> <success>
+  python context_tracker.py track --stdin [success]  # Hook event JSON on stdin
+  python context_tracker.py track-batch [file|-] [--session <id>]  # NDJSON events
   python context_tracker.py confirm <positive/negative/correction> [details]
   python context_tracker.py goal <description>
   python context_tracker.py analyze
@@ -18,6 +25,7 @@ Usage:
   python context_tracker.py extract             # Extract without review (auto)
   python context_tracker.py extract --review    # Extract with review/accept
   python context_tracker.py clear
+  python context_tracker.py migrate             # Convert legacy session-*.json files
 """
 
 import json
@@ -27,26 +35,184 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 import hashlib
+import time
+
+sys.path.insert(0, str(Path(__file__).parent))
+from pattern_dedup import merge_new_patterns
+from pattern_store import new_pattern_id, open_store
+from storage import atomic_write_json, atomic_write_text, file_lock
+
+# Session journal: one fixed-schema JSON record per line, opened in append mode.
+# Every record carries the running counters so a writer only needs the last line.
+JOURNAL_VERSION = 1
+JOURNAL_FIELDS = (
+    "v", "kind", "ts", "session_id", "id", "tool", "success", "context",
+    "result_summary", "result_hash", "confirmation", "details", "goal",
+    "actions", "successes", "last_success"
+)
+TAIL_BLOCK = 4096
+
+# track-batch appends at most this many events per journal write
+BATCH_FLUSH_SIZE = 50000
+
+# Per-tool aggregates keep at most this many context samples per outcome
+MAX_CONTEXT_SAMPLES = 10
+
+# Aggregates keep a digest of the journal's first bytes, so a journal
+# recreated under a reused inode is not taken for the one they cover
+AGGREGATES_HEAD_BYTES = 256
+
+# In-process caches: aggregates per journal, and the last analysis per journal state
+_AGGREGATES_CACHE: Dict[Path, Dict] = {}
+_ANALYSIS_CACHE: Dict[Path, tuple] = {}
 
 def get_plugin_root() -> Path:
     """Get plugin root directory."""
     return Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent))
 
-def get_session_file() -> Path:
-    """Get current session tracking file."""
+def get_sessions_dir() -> Path:
+    """Get session tracking directory."""
     learned_dir = get_plugin_root() / "learned" / "sessions"
     learned_dir.mkdir(parents=True, exist_ok=True)
+    return learned_dir
+
+def get_session_id() -> str:
+    """Use session ID from environment or create one."""
+    return os.environ.get("CLAUDE_SESSION_ID", datetime.now().strftime("%Y%m%d"))
+
+def get_session_file(session_id: Optional[str] = None) -> Path:
+    """Get a session journal file (the current session by default)."""
+    return get_sessions_dir() / f"session-{session_id or get_session_id()}.jsonl"
+
+def get_legacy_session_file(session_id: Optional[str] = None) -> Path:
+    """Get the pre-journal session file (session-<id>.json)."""
+    return get_sessions_dir() / f"session-{session_id or get_session_id()}.json"
+
+def make_record(kind: str, **fields) -> Dict:
+    """Build a journal record with every schema field present."""
+    record = dict.fromkeys(JOURNAL_FIELDS)
+    record.update(fields)
+    record["v"] = JOURNAL_VERSION
+    record["kind"] = kind
+    record["ts"] = record["ts"] or datetime.now().isoformat()
+    return record
+
+def _read_tail(journal_file: Path) -> tuple:
+    """Return (last parseable complete record, whether the file ends with a newline,
+    number of corrupt complete lines after that record).
+
+    Corrupt lines are skipped by walking further back, so a damaged last line
+    never restarts the running counters from zero.
+    """
+    with open(journal_file, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        if pos == 0:
+            return None, True, 0
+
+        data = b""
+        ends_with_newline = None
+        tried = 0
+        skipped = 0
+        while pos > 0:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+            if ends_with_newline is None:
+                ends_with_newline = data.endswith(b"\n")
+            end = data.rfind(b"\n")
+            if end < 0:
+                continue
+            # Complete lines only; the first one may be cut off unless at the file start
+            lines = data[:end].split(b"\n")
+            if pos > 0:
+                lines = lines[1:]
+            for line in reversed(lines[:len(lines) - tried]):
+                if not line.strip():
+                    continue
+                try:
+                    return json.loads(line), ends_with_newline, skipped
+                except json.JSONDecodeError:
+                    skipped += 1
+            tried = len(lines)
+    return None, ends_with_newline, skipped
+
+def _state_from_record(record: Optional[Dict]) -> Dict:
+    """Running counters as of a journal record."""
+    if not record:
+        return {"actions": 0, "successes": 0, "last_success": None}
+    return {
+        "actions": record.get("actions") or 0,
+        "successes": record.get("successes") or 0,
+        "last_success": record.get("last_success")
+    }
 
-    # Use session ID from environment or create one
-    session_id = os.environ.get("CLAUDE_SESSION_ID", datetime.now().strftime("%Y%m%d"))
-    return learned_dir / f"session-{session_id}.json"
+def append_records(entries: List[tuple], session_id: Optional[str] = None) -> List[Dict]:
+    """Append (kind, fields) entries to a session journal in a single write.
 
-def load_session() -> Dict:
-    """Load current session data."""
-    session_file = get_session_file()
-    if session_file.exists():
-        with open(session_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+    The running counters are taken from the journal tail, so the cost of an
+    append does not depend on the session length. Action ids are assigned
+    here, and positive confirmations target the last success.
+    """
+    ensure_migrated(session_id)
+    journal_file = get_session_file(session_id)
+
+    # Locked so concurrent hooks can't read the same tail and reuse action ids
+    with file_lock(journal_file):
+        prefix = ""
+        records = []
+        if journal_file.exists():
+            last, ends_with_newline, corrupt = _read_tail(journal_file)
+            state = _state_from_record(last)
+            # A corrupt line may have been an action: never reuse its id
+            state["actions"] += corrupt
+            if not ends_with_newline:
+                prefix = "\n"  # Isolate a torn write from a crashed writer
+        else:
+            state = _state_from_record(None)
+            records.append(make_record(
+                "start", session_id=session_id or os.environ.get("CLAUDE_SESSION_ID", "unknown"), **state
+            ))
+
+        appended = []
+        for kind, fields in entries:
+            fields = dict(fields)
+            if kind == "action":
+                state["actions"] += 1
+                fields["id"] = f"act-{state['actions']}"
+                if fields.get("success"):
+                    state["successes"] += 1
+                    state["last_success"] = fields["id"]
+            elif kind == "confirm" and fields.get("confirmation") == "positive":
+                fields["id"] = state["last_success"]
+
+            record = make_record(kind, **fields, **state)
+            records.append(record)
+            appended.append(record)
+
+        with open(journal_file, "a", encoding="utf-8") as f:
+            f.write(prefix + "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+
+    return appended
+
+def append_record(kind: str, **fields) -> Dict:
+    """Append one record to the current session journal and return it."""
+    return append_records([(kind, fields)])[-1]
+
+def iter_journal(journal_file: Path):
+    """Stream records from a session journal, skipping torn lines."""
+    with open(journal_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+def new_session() -> Dict:
+    """Empty session view."""
     return {
         "session_id": os.environ.get("CLAUDE_SESSION_ID", "unknown"),
         "started": datetime.now().isoformat(),
@@ -58,103 +224,452 @@ def load_session() -> Dict:
         "user_confirmations": []
     }
 
-def save_session(data: Dict):
-    """Save session data."""
-    session_file = get_session_file()
-    data["last_updated"] = datetime.now().isoformat()
-    with open(session_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-def track_action(tool: str, result: str, success: bool, context: str = "") -> Dict:
-    """Track a tool action and its result."""
-    session = load_session()
-
-    action = {
-        "id": f"act-{len(session['actions'])+1}",
-        "timestamp": datetime.now().isoformat(),
-        "tool": tool,
-        "result_summary": result[:500],  # Truncate long results
-        "success": success,
-        "context": context,
-        "result_hash": hashlib.md5(result.encode()).hexdigest()[:8]
-    }
+def apply_record(session: Dict, record: Dict) -> None:
+    """Apply one journal record to a session view."""
+    kind = record.get("kind")
+
+    if kind == "start":
+        session["session_id"] = record.get("session_id") or session["session_id"]
+        session["started"] = record["ts"]
+
+    elif kind == "action":
+        action = {
+            "id": record["id"],
+            "timestamp": record["ts"],
+            "tool": record["tool"],
+            "result_summary": record["result_summary"],
+            "success": record["success"],
+            "context": record["context"],
+            "result_hash": record["result_hash"]
+        }
+        session["actions"].append(action)
+        if action["success"]:
+            session["successes"].append(action["id"])
+        else:
+            session["failures"].append(action["id"])
+
+    elif kind == "confirm":
+        session["user_confirmations"].append({
+            "timestamp": record["ts"],
+            "type": record["confirmation"],
+            "details": record["details"],
+            "related_actions": [dict(a) for a in session["actions"][-3:]]  # Last 3 actions
+        })
+        if record.get("id"):
+            # Actions are numbered act-1..act-N in journal order
+            index = int(record["id"].split("-")[1]) - 1
+            if 0 <= index < len(session["actions"]):
+                session["actions"][index]["user_confirmed"] = True
 
-    session["actions"].append(action)
+    elif kind == "goal":
+        session["goal"] = record["goal"]
+        session["goal_set_at"] = record["ts"]
 
-    if success:
-        session["successes"].append(action["id"])
-    else:
-        session["failures"].append(action["id"])
+    session["last_updated"] = record["ts"]
 
-    save_session(session)
+def load_session() -> Dict:
+    """Rebuild the current session view by streaming its journal."""
+    ensure_migrated()
+    session = new_session()
+    journal_file = get_session_file()
+    if journal_file.exists():
+        for record in iter_journal(journal_file):
+            apply_record(session, record)
+    return session
+
+def records_from_session(data: Dict, later_records: Optional[List[Dict]] = None) -> List[Dict]:
+    """Convert a legacy session-<id>.json document into journal records.
+
+    later_records (from a journal written after the legacy file) are appended
+    with their action ids and counters renumbered to follow the legacy history.
+    """
+    state = _state_from_record(None)
+    records = [make_record(
+        "start",
+        ts=data.get("started"),
+        session_id=data.get("session_id", "unknown"),
+        **state
+    )]
+
+    events = [("action", a.get("timestamp") or "", a) for a in data.get("actions", [])]
+    events += [("confirm", c.get("timestamp") or "", c) for c in data.get("user_confirmations", [])]
+    if data.get("goal"):
+        events.append(("goal", data.get("goal_set_at") or "", data))
+    events.sort(key=lambda e: e[1])  # Stable: ties keep actions before confirmations
+
+    for kind, ts, item in events:
+        if kind == "action":
+            state["actions"] += 1
+            action_id = f"act-{state['actions']}"
+            if item.get("success"):
+                state["successes"] += 1
+                state["last_success"] = action_id
+            records.append(make_record(
+                "action", ts=ts or None, id=action_id, tool=item.get("tool"),
+                success=bool(item.get("success")), context=item.get("context", ""),
+                result_summary=item.get("result_summary", ""),
+                result_hash=item.get("result_hash"), **state
+            ))
+        elif kind == "confirm":
+            confirmed = state["last_success"] if item.get("type") == "positive" else None
+            records.append(make_record(
+                "confirm", ts=ts or None, id=confirmed, confirmation=item.get("type"),
+                details=item.get("details", ""), **state
+            ))
+        else:
+            records.append(make_record("goal", ts=ts or None, goal=item["goal"], **state))
+
+    renumbered = {}
+    for record in later_records or []:
+        if record.get("kind") == "start":
+            continue
+        record = dict(record)
+        if record["kind"] == "action":
+            state["actions"] += 1
+            renumbered[record["id"]] = record["id"] = f"act-{state['actions']}"
+            if record.get("success"):
+                state["successes"] += 1
+                state["last_success"] = record["id"]
+        elif record.get("id"):
+            record["id"] = renumbered.get(record["id"])
+        record.update(state)
+        records.append(record)
+
+    return records
+
+def migrate_session_file(legacy_file: Path) -> Dict:
+    """Convert one legacy session-<id>.json file to a .jsonl journal."""
+    journal_file = legacy_file.with_suffix(".jsonl")
+    with file_lock(journal_file):
+        if not legacy_file.exists():
+            return {"migrated": None, "journal": str(journal_file), "records": 0}
+        with open(legacy_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        later_records = list(iter_journal(journal_file)) if journal_file.exists() else []
+        records = records_from_session(data, later_records)
+
+        atomic_write_text(journal_file, "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        legacy_file.unlink()
+
+    snapshot_file = get_aggregates_file(journal_file)
+    if snapshot_file.exists():
+        snapshot_file.unlink()
+
+    return {"migrated": str(legacy_file), "journal": str(journal_file), "records": len(records)}
+
+def ensure_migrated(session_id: Optional[str] = None) -> None:
+    """Migrate a session's legacy JSON file, if one exists."""
+    legacy_file = get_legacy_session_file(session_id)
+    if legacy_file.exists():
+        migrate_session_file(legacy_file)
+
+def migrate_all_sessions() -> Dict:
+    """Migrate every legacy session-*.json file to the journal format."""
+    migrated = [migrate_session_file(f) for f in sorted(get_sessions_dir().glob("session-*.json"))]
+    return {"migration_complete": True, "sessions_migrated": len(migrated), "sessions": migrated}
+
+def track_action(
+    tool: str,
+    result: str,
+    success: bool,
+    context: str = "",
+    result_hash: Optional[str] = None
+) -> Dict:
+    """Track a tool action and its result.
+
+    Pass result_hash when the full result was hashed elsewhere (e.g. while
+    streaming hook input); result is then only the summary prefix.
+    """
+    record = append_record(
+        "action",
+        tool=tool,
+        result_summary=result[:500],  # Truncate long results
+        success=success,
+        context=context,
+        result_hash=result_hash or hashlib.md5(result.encode()).hexdigest()[:8]
+    )
 
     return {
         "tracked": True,
-        "action_id": action["id"],
+        "action_id": record["id"],
         "success": success,
-        "total_actions": len(session["actions"]),
-        "success_rate": len(session["successes"]) / len(session["actions"]) if session["actions"] else 0
+        "total_actions": record["actions"],
+        "success_rate": record["successes"] / record["actions"] if record["actions"] else 0
     }
 
 def track_user_confirmation(confirmation_type: str, details: str = "") -> Dict:
     """Track when user confirms something worked."""
-    session = load_session()
-
-    confirmation = {
-        "timestamp": datetime.now().isoformat(),
-        "type": confirmation_type,  # "positive", "negative", "correction"
-        "details": details,
-        "related_actions": session["actions"][-3:] if session["actions"] else []  # Last 3 actions
-    }
-
-    session["user_confirmations"].append(confirmation)
-
-    # If positive confirmation, boost confidence of recent successes
-    if confirmation_type == "positive" and session["successes"]:
-        # Mark last success as confirmed
-        last_success_id = session["successes"][-1]
-        for action in session["actions"]:
-            if action["id"] == last_success_id:
-                action["user_confirmed"] = True
-                break
-
-    save_session(session)
+    # If positive confirmation, boost confidence of the last success
+    record = append_record("confirm", confirmation=confirmation_type, details=details)
+    confirmed = record["id"]
 
     return {
         "confirmation_recorded": True,
         "type": confirmation_type,
-        "boosted_actions": session["successes"][-1:] if confirmation_type == "positive" else []
+        "boosted_actions": [confirmed] if confirmed else []
     }
 
 def set_goal(goal: str) -> Dict:
     """Set the current goal/objective for context."""
-    session = load_session()
-    session["goal"] = goal
-    session["goal_set_at"] = datetime.now().isoformat()
-    save_session(session)
+    append_record("goal", goal=goal)
 
     return {"goal_set": True, "goal": goal}
 
-def analyze_session() -> Dict:
-    """Analyze session to identify learnable patterns."""
-    session = load_session()
+def event_to_entry(event: Dict) -> tuple:
+    """Normalize one batch event into (session_id, kind, fields).
 
-    # Group actions by tool
-    by_tool = {}
-    for action in session["actions"]:
-        tool = action["tool"]
-        if tool not in by_tool:
-            by_tool[tool] = {"successes": [], "failures": []}
+    Accepts tracker events ({"action": "track"|"confirm"|"goal", ...}) and
+    raw PostToolUse hook events ({"tool_name", "tool_input", "tool_response"}).
+    """
+    from hook_input import CONTEXT_LIMIT, response_hash, response_succeeded
+
+    session_id = event.get("session_id")
+    ts = event.get("timestamp") or event.get("ts")
+
+    if "tool_name" in event:
+        response = event.get("tool_response")
+        result = response if isinstance(response, str) else json.dumps(response, ensure_ascii=False)
+        success = event["success"] if "success" in event else response_succeeded(response)
+        tool_input = event.get("tool_input")
+        context = "Context: " + (tool_input if isinstance(tool_input, str)
+                                 else json.dumps(tool_input, ensure_ascii=False))[:CONTEXT_LIMIT]
+        return session_id, "action", {
+            "ts": ts, "tool": event["tool_name"], "result_summary": result[:500],
+            "success": bool(success), "context": context,
+            "result_hash": response_hash(response)
+        }
 
-        if action["success"]:
-            by_tool[tool]["successes"].append(action)
+    action = event.get("action", "track")
+    if action == "track":
+        result = str(event.get("result", ""))
+        success = event.get("success", True)
+        if isinstance(success, str):
+            success = parse_success(success)
+        return session_id, "action", {
+            "ts": ts, "tool": event["tool"], "result_summary": result[:500],
+            "success": bool(success), "context": event.get("context", ""),
+            "result_hash": event.get("result_hash") or hashlib.md5(result.encode()).hexdigest()[:8]
+        }
+    if action == "confirm":
+        return session_id, "confirm", {
+            "ts": ts, "confirmation": event.get("type", "positive"), "details": event.get("details", "")
+        }
+    if action == "goal":
+        return session_id, "goal", {"ts": ts, "goal": event["goal"]}
+
+    raise ValueError(f"Unknown batch action: {action}")
+
+def track_batch(lines, default_session: Optional[str] = None) -> Dict:
+    """Apply newline-delimited events in one pass.
+
+    Events are grouped by session; each journal gets one append (per
+    BATCH_FLUSH_SIZE events) and its aggregates snapshot is saved once.
+    """
+    start = time.perf_counter()
+    pending: Dict[Optional[str], List[tuple]] = {}
+    counts: Dict[Optional[str], int] = {}
+    events = 0
+    skipped = 0
+
+    def flush(session_id: Optional[str]) -> None:
+        append_records(pending.pop(session_id), session_id)
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            session_id, kind, fields = event_to_entry(json.loads(line))
+        except (ValueError, KeyError, TypeError):
+            skipped += 1
+            continue
+
+        session_id = session_id or default_session
+        pending.setdefault(session_id, []).append((kind, fields))
+        counts[session_id] = counts.get(session_id, 0) + 1
+        events += 1
+        if len(pending[session_id]) >= BATCH_FLUSH_SIZE:
+            flush(session_id)
+
+    for session_id in list(pending):
+        flush(session_id)
+    for session_id in counts:
+        load_aggregates(persist=True, session_id=session_id)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "batch_complete": True,
+        "events": events,
+        "skipped": skipped,
+        "sessions": len(counts),
+        "elapsed_s": round(elapsed, 3),
+        "events_per_s": round(events / elapsed) if elapsed > 0 else events
+    }
+
+def _journal_head(f, offset: int) -> str:
+    """Digest of the journal bytes aggregates covering offset bytes are checked against."""
+    f.seek(0)
+    return hashlib.sha1(f.read(min(offset, AGGREGATES_HEAD_BYTES))).hexdigest()[:16]
+
+def _covers(agg: Optional[Dict], journal_file: Path, stat: os.stat_result) -> bool:
+    """Whether aggregates describe a prefix of this journal (same file, not truncated)."""
+    if not agg or agg.get("v") != JOURNAL_VERSION or agg.get("journal_ino") != stat.st_ino \
+            or agg.get("offset", 0) > stat.st_size:
+        return False
+    if not agg.get("offset"):
+        return True
+    try:
+        with open(journal_file, "rb") as f:
+            return agg.get("head") == _journal_head(f, agg["offset"])
+    except OSError:
+        return False
+
+def get_aggregates_file(journal_file: Path) -> Path:
+    """Get the per-tool aggregates snapshot for a journal."""
+    return journal_file.with_name(journal_file.name + ".agg")
+
+def new_aggregates(journal_ino: Optional[int] = None) -> Dict:
+    """Empty per-tool aggregates covering no journal bytes."""
+    return {
+        "v": JOURNAL_VERSION,
+        "journal_ino": journal_ino,
+        "offset": 0,
+        "head": None,
+        "session_id": os.environ.get("CLAUDE_SESSION_ID", "unknown"),
+        "started": None,
+        "goal": None,
+        "last_updated": None,
+        "actions": 0,
+        "successes": 0,
+        "failures": 0,
+        "confirmations": 0,
+        "last_success": None,
+        "tools": {}
+    }
+
+def apply_to_aggregates(agg: Dict, record: Dict) -> None:
+    """Fold one journal record into the running per-tool aggregates."""
+    kind = record.get("kind")
+
+    if kind == "start":
+        agg["session_id"] = record.get("session_id") or agg["session_id"]
+        agg["started"] = record["ts"]
+
+    elif kind == "action":
+        tool = agg["tools"].setdefault(record["tool"], {
+            "successes": 0, "failures": 0, "confirmed": 0,
+            "success_samples": [], "failure_samples": []
+        })
+        agg["actions"] += 1
+        if record["success"]:
+            agg["successes"] += 1
+            tool["successes"] += 1
+            tool["success_samples"].append({
+                "id": record["id"], "context": record["context"] or "", "user_confirmed": False
+            })
+            del tool["success_samples"][:-MAX_CONTEXT_SAMPLES]
+            agg["last_success"] = {"id": record["id"], "tool": record["tool"], "confirmed": False}
         else:
-            by_tool[tool]["failures"].append(action)
+            agg["failures"] += 1
+            tool["failures"] += 1
+            tool["failure_samples"].append({"context": record["context"] or ""})
+            del tool["failure_samples"][:-MAX_CONTEXT_SAMPLES]
+
+    elif kind == "confirm":
+        agg["confirmations"] += 1
+        last = agg["last_success"]
+        # Confirmations always target the last success; confirming it twice counts once
+        if last and record.get("id") == last["id"] and not last["confirmed"]:
+            last["confirmed"] = True
+            tool = agg["tools"][last["tool"]]
+            tool["confirmed"] += 1
+            for sample in tool["success_samples"]:
+                if sample["id"] == last["id"]:
+                    sample["user_confirmed"] = True
+
+    elif kind == "goal":
+        agg["goal"] = record["goal"]
+
+    agg["last_updated"] = record["ts"]
+
+def load_aggregates(persist: bool = True, session_id: Optional[str] = None) -> Dict:
+    """Get per-tool aggregates for the current session.
+
+    Starts from the in-memory copy or the on-disk snapshot and folds in only
+    the journal records appended since, so the cost is proportional to new
+    events rather than to the session length.
+    """
+    ensure_migrated(session_id)
+    journal_file = get_session_file(session_id)
+    try:
+        stat = journal_file.stat()
+    except FileNotFoundError:
+        _AGGREGATES_CACHE.pop(journal_file, None)
+        return new_aggregates()
+
+    # The in-memory copy gets the same checks as the snapshot: after a clear
+    # the inode may be reused by a new journal
+    agg = _AGGREGATES_CACHE.get(journal_file)
+    if not _covers(agg, journal_file, stat):
+        agg = None
+        snapshot_file = get_aggregates_file(journal_file)
+        if snapshot_file.exists():
+            try:
+                with open(snapshot_file, "r", encoding="utf-8") as f:
+                    agg = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                agg = None
+        if not _covers(agg, journal_file, stat):
+            agg = new_aggregates(stat.st_ino)
+
+    changed = False
+    if agg["offset"] < stat.st_size:
+        with open(journal_file, "rb") as f:
+            f.seek(agg["offset"])
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Record still being written
+                agg["offset"] += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                apply_to_aggregates(agg, record)
+            agg["head"] = _journal_head(f, agg["offset"])
+        changed = True
+
+    _AGGREGATES_CACHE[journal_file] = agg
+    if persist and changed:
+        save_aggregates(journal_file, agg)
+    return agg
+
+def save_aggregates(journal_file: Path, agg: Dict) -> None:
+    """Write an aggregates snapshot (atomic replace)."""
+    atomic_write_json(get_aggregates_file(journal_file), agg, indent=None)
+
+def save_cached_aggregates() -> None:
+    """Persist every in-memory aggregates copy (used by the daemon on shutdown)."""
+    for journal_file, agg in list(_AGGREGATES_CACHE.items()):
+        if journal_file.exists():
+            save_aggregates(journal_file, agg)
+
+def analyze_session() -> Dict:
+    """Analyze session to identify learnable patterns.
+
+    Reads the per-tool aggregates, so the cost is O(#tools). The result is
+    memoized per journal state, so review/accept/extract in one process share it.
+    """
+    agg = load_aggregates()
+    journal_file = get_session_file()
+    signature = (agg["journal_ino"], agg["offset"], agg.get("head"))
+    cached = _ANALYSIS_CACHE.get(journal_file)
+    if cached and cached[0] == signature:
+        return cached[1]
 
     # Find patterns
     patterns = []
 
-    for tool, data in by_tool.items():
+    for tool, data in agg["tools"].items():
         if data["successes"] and data["failures"]:
             # We have both - can learn what works vs doesn't
             pattern = {
@@ -162,16 +677,19 @@ def analyze_session() -> Dict:
                 "tool": tool,
                 "successful_approaches": [
                     {
-                        "context": s.get("context", ""),
-                        "user_confirmed": s.get("user_confirmed", False)
+                        "context": s["context"],
+                        "user_confirmed": s["user_confirmed"]
                     }
-                    for s in data["successes"]
+                    for s in data["success_samples"]
                 ],
                 "failed_approaches": [
-                    {"context": f.get("context", "")}
-                    for f in data["failures"]
+                    {"context": f["context"]}
+                    for f in data["failure_samples"]
                 ],
-                "confidence": calculate_confidence(data["successes"], data["failures"]),
+                "successes": data["successes"],
+                "failures": data["failures"],
+                "confirmed": data["confirmed"],
+                "confidence": calculate_confidence(data["successes"], data["failures"], data["confirmed"]),
                 "learnable": True
             }
             patterns.append(pattern)
@@ -180,92 +698,88 @@ def analyze_session() -> Dict:
             pattern = {
                 "type": "successful_approach",
                 "tool": tool,
-                "approaches": [s.get("context", "") for s in data["successes"]],
+                "approaches": [s["context"] for s in data["success_samples"]],
+                "successes": data["successes"],
                 "confidence": 0.7,  # Lower confidence without failure contrast
-                "learnable": len(data["successes"]) >= 2  # Need at least 2 successes
+                "learnable": data["successes"] >= 2  # Need at least 2 successes
             }
             patterns.append(pattern)
 
     # Check for user confirmations
-    confirmed_patterns = [
-        p for p in patterns
-        if any(s.get("user_confirmed") for s in p.get("successful_approaches", []))
-    ]
-
-    return {
-        "session_id": session.get("session_id"),
-        "goal": session.get("goal"),
-        "total_actions": len(session["actions"]),
-        "successes": len(session["successes"]),
-        "failures": len(session["failures"]),
-        "success_rate": len(session["successes"]) / len(session["actions"]) if session["actions"] else 0,
+    confirmed_patterns = [p for p in patterns if p.get("confirmed")]
+
+    result = {
+        "session_id": agg["session_id"],
+        "goal": agg["goal"],
+        "total_actions": agg["actions"],
+        "successes": agg["successes"],
+        "failures": agg["failures"],
+        "success_rate": agg["successes"] / agg["actions"] if agg["actions"] else 0,
         "patterns_found": len(patterns),
         "learnable_patterns": len([p for p in patterns if p.get("learnable")]),
         "user_confirmed_patterns": len(confirmed_patterns),
         "patterns": patterns
     }
+    _ANALYSIS_CACHE[journal_file] = (signature, result)
+    return result
 
-def calculate_confidence(successes: List, failures: List) -> float:
-    """Calculate confidence based on success/failure ratio and confirmations."""
+def calculate_confidence(successes: int, failures: int, confirmed: int = 0) -> float:
+    """Calculate confidence based on success/failure counts and confirmations."""
     if not successes:
         return 0.0
 
-    base_confidence = len(successes) / (len(successes) + len(failures))
+    base_confidence = successes / (successes + failures)
 
     # Boost for user confirmations
-    confirmed_count = sum(1 for s in successes if s.get("user_confirmed"))
-    confirmation_boost = confirmed_count * 0.1
+    confirmation_boost = confirmed * 0.1
 
     # Boost for multiple successes
-    repetition_boost = min(0.2, (len(successes) - 1) * 0.05)
+    repetition_boost = min(0.2, (successes - 1) * 0.05)
 
     return min(0.99, base_confidence + confirmation_boost + repetition_boost)
 
 def extract_to_patterns() -> Dict:
-    """Extract learned patterns to main patterns.json."""
+    """Extract learned patterns to the pattern store."""
     analysis = analyze_session()
 
-    # Load existing patterns
-    patterns_file = get_plugin_root() / "learned" / "patterns.json"
-    if patterns_file.exists():
-        with open(patterns_file, "r", encoding="utf-8") as f:
-            patterns_data = json.load(f)
-    else:
-        patterns_data = {"patterns": [], "learning_stats": {"total_sessions": 0}}
-
-    # Add learnable patterns
     new_patterns = []
-    for p in analysis.get("patterns", []):
-        if p.get("learnable") and p.get("confidence", 0) >= 0.7:
-            new_pattern = {
-                "id": f"ctx-{datetime.now().strftime('%Y%m%d%H%M%S')}-{len(new_patterns)}",
-                "type": "context_learned",
-                "source": "context_tracker",
-                "tool": p.get("tool"),
-                "description": f"Successful {p.get('tool')} usage pattern",
-                "successful_approaches": p.get("successful_approaches", p.get("approaches", [])),
-                "failed_approaches": p.get("failed_approaches", []),
-                "confidence": p.get("confidence"),
-                "learned_at": datetime.now().isoformat(),
-                "session_goal": analysis.get("goal"),
-                "applied": False
-            }
-            new_patterns.append(new_pattern)
-            patterns_data["patterns"].append(new_pattern)
-
-    # Update stats
-    patterns_data["learning_stats"]["total_sessions"] = patterns_data["learning_stats"].get("total_sessions", 0) + 1
-    patterns_data["learning_stats"]["last_extraction"] = datetime.now().isoformat()
+    with open_store(get_plugin_root() / "learned") as store, store.transaction():
+        # Add learnable patterns
+        for p in analysis.get("patterns", []):
+            if p.get("learnable") and p.get("confidence", 0) >= 0.7:
+                new_pattern = {
+                    "id": new_pattern_id("ctx"),
+                    "type": "context_learned",
+                    "source": "context_tracker",
+                    "tool": p.get("tool"),
+                    "description": f"Successful {p.get('tool')} usage pattern",
+                    "successful_approaches": p.get("successful_approaches", p.get("approaches", [])),
+                    "failed_approaches": p.get("failed_approaches", []),
+                    "successes": p.get("successes", 0),
+                    "failures": p.get("failures", 0),
+                    "confidence": p.get("confidence"),
+                    "learned_at": datetime.now().isoformat(),
+                    "session_goal": analysis.get("goal"),
+                    "applied": False
+                }
+                new_patterns.append(new_pattern)
+        # Near-duplicates of stored patterns only add evidence to them
+        stored_patterns = merge_new_patterns(store, new_patterns)
 
-    # Save
-    with open(patterns_file, "w", encoding="utf-8") as f:
-        json.dump(patterns_data, f, indent=2, ensure_ascii=False)
+        # Update stats
+        stats = store.get_meta("learning_stats", {})
+        stats["total_sessions"] = stats.get("total_sessions", 0) + 1
+        stats["last_extraction"] = datetime.now().isoformat()
+        stats["patterns_merged"] = stats.get("patterns_merged", 0) + len(stored_patterns["merged"])
+        store.set_meta("learning_stats", stats)
+        total_patterns = store.count()
 
     return {
         "extraction_complete": True,
-        "new_patterns_added": len(new_patterns),
-        "total_patterns": len(patterns_data["patterns"]),
-        "patterns": new_patterns
+        "new_patterns_added": len(stored_patterns["added"]),
+        "patterns_merged": len(stored_patterns["merged"]),
+        "total_patterns": total_patterns,
+        "patterns": stored_patterns["added"] + stored_patterns["merged"]
     }
 
 def review_patterns(patterns: List[Dict]) -> Dict:
@@ -281,8 +795,9 @@ def review_patterns(patterns: List[Dict]) -> Dict:
     for p in patterns:
         # Calculate evidence quality score
         evidence_score = 0
-        success_count = len(p.get("successful_approaches", p.get("approaches", [])))
-        has_confirmation = any(
+        # Prefer the aggregate counters; approach lists only hold bounded samples
+        success_count = p.get("successes", len(p.get("successful_approaches", p.get("approaches", []))))
+        has_confirmation = p.get("confirmed", 0) > 0 or any(
             s.get("user_confirmed")
             for s in p.get("successful_approaches", [])
         )
@@ -391,7 +906,7 @@ def extract_with_review() -> Dict:
     1. Analyze session to find patterns
     2. Review each pattern for quality
     3. Accept only high-quality patterns
-    4. Save accepted patterns to patterns.json
+    4. Save accepted patterns to the pattern store
     """
     # Step 1: Analyze
     analysis = analyze_session()
@@ -414,42 +929,41 @@ def extract_with_review() -> Dict:
 
     # Step 4: Save accepted patterns
     if accept_result["accepted_patterns"]:
-        patterns_file = get_plugin_root() / "learned" / "patterns.json"
-        if patterns_file.exists():
-            with open(patterns_file, "r", encoding="utf-8") as f:
-                patterns_data = json.load(f)
-        else:
-            patterns_data = {"patterns": [], "learning_stats": {"total_sessions": 0}}
-
-        # Add accepted patterns with full metadata
-        for p in accept_result["accepted_patterns"]:
-            new_pattern = {
-                "id": f"ctx-{datetime.now().strftime('%Y%m%d%H%M%S')}-{len(patterns_data['patterns'])}",
-                "type": "context_learned",
-                "source": "context_tracker_reviewed",
-                "tool": p.get("tool"),
-                "description": f"Reviewed: {p.get('tool')} usage pattern",
-                "successful_approaches": p.get("successful_approaches", p.get("approaches", [])),
-                "failed_approaches": p.get("failed_approaches", []),
-                "confidence": p.get("confidence"),
-                "reviewed": True,
-                "review_score": p.get("review_score"),
-                "accepted": True,
-                "accepted_at": p.get("accepted_at"),
-                "learned_at": datetime.now().isoformat(),
-                "session_goal": analysis.get("goal"),
-                "applied": False
-            }
-            patterns_data["patterns"].append(new_pattern)
-
-        # Update stats
-        patterns_data["learning_stats"]["total_sessions"] = patterns_data["learning_stats"].get("total_sessions", 0) + 1
-        patterns_data["learning_stats"]["last_reviewed_extraction"] = datetime.now().isoformat()
-        patterns_data["learning_stats"]["patterns_reviewed"] = patterns_data["learning_stats"].get("patterns_reviewed", 0) + review_result["patterns_reviewed"]
-        patterns_data["learning_stats"]["patterns_accepted"] = patterns_data["learning_stats"].get("patterns_accepted", 0) + accept_result["accepted_count"]
-
-        with open(patterns_file, "w", encoding="utf-8") as f:
-            json.dump(patterns_data, f, indent=2, ensure_ascii=False)
+        with open_store(get_plugin_root() / "learned") as store, store.transaction():
+            new_patterns = []
+
+            # Add accepted patterns with full metadata
+            for p in accept_result["accepted_patterns"]:
+                new_pattern = {
+                    "id": new_pattern_id("ctx"),
+                    "type": "context_learned",
+                    "source": "context_tracker_reviewed",
+                    "tool": p.get("tool"),
+                    "description": f"Reviewed: {p.get('tool')} usage pattern",
+                    "successful_approaches": p.get("successful_approaches", p.get("approaches", [])),
+                    "failed_approaches": p.get("failed_approaches", []),
+                    "successes": p.get("successes", 0),
+                    "failures": p.get("failures", 0),
+                    "confidence": p.get("confidence"),
+                    "reviewed": True,
+                    "review_score": p.get("review_score"),
+                    "accepted": True,
+                    "accepted_at": p.get("accepted_at"),
+                    "learned_at": datetime.now().isoformat(),
+                    "session_goal": analysis.get("goal"),
+                    "applied": False
+                }
+                new_patterns.append(new_pattern)
+            stored_patterns = merge_new_patterns(store, new_patterns)
+
+            # Update stats
+            stats = store.get_meta("learning_stats", {})
+            stats["total_sessions"] = stats.get("total_sessions", 0) + 1
+            stats["last_reviewed_extraction"] = datetime.now().isoformat()
+            stats["patterns_reviewed"] = stats.get("patterns_reviewed", 0) + review_result["patterns_reviewed"]
+            stats["patterns_accepted"] = stats.get("patterns_accepted", 0) + accept_result["accepted_count"]
+            stats["patterns_merged"] = stats.get("patterns_merged", 0) + len(stored_patterns["merged"])
+            store.set_meta("learning_stats", stats)
 
     return {
         "extraction_complete": True,
@@ -482,51 +996,72 @@ def extract_with_review() -> Dict:
 
 def clear_session() -> Dict:
     """Clear current session tracking."""
-    session_file = get_session_file()
-    if session_file.exists():
-        session_file.unlink()
+    journal_file = get_session_file()
+    for session_file in (journal_file, get_aggregates_file(journal_file), get_legacy_session_file()):
+        if session_file.exists():
+            session_file.unlink()
+    _AGGREGATES_CACHE.pop(journal_file, None)
+    _ANALYSIS_CACHE.pop(journal_file, None)
 
     return {"cleared": True}
 
-def main():
-    if len(sys.argv) < 2:
-        print(json.dumps({
-            "error": "Action required",
-            "usage": {
-                "track": "track <tool> <result> <success:true/false> [context]",
-                "confirm": "confirm <positive/negative/correction> [details]",
-                "goal": "goal <description>",
-                "analyze": "analyze",
-                "review": "review (analyze and review patterns)",
-                "accept": "accept (accept reviewed patterns)",
-                "extract": "extract [--review] (extract patterns, optionally with review)",
-                "clear": "clear"
-            }
-        }, indent=2))
-        sys.exit(1)
+def parse_success(value: str) -> bool:
+    """Interpret a success flag passed on the command line."""
+    return value.lower() in ("true", "1", "yes", "success")
+
+def run_command(args: List[str]) -> Dict:
+    """Run a tracker subcommand (argv without the script name) and return its result."""
+    action = args[0]
+
+    if action == "track" and len(args) > 1 and args[1] == "--stdin":
+        # Hook event JSON on stdin; only bounded prefixes are kept in memory
+        from hook_input import read_hook_event
+        event = read_hook_event(sys.stdin.buffer)
+        if event["session_id"] and "CLAUDE_SESSION_ID" not in os.environ:
+            os.environ["CLAUDE_SESSION_ID"] = event["session_id"]
+        success = parse_success(args[2]) if len(args) > 2 else event["success"]
+        result = track_action(
+            event["tool"], event["result_summary"], success, event["context"],
+            result_hash=event["result_hash"]
+        )
 
-    action = sys.argv[1]
+    elif action == "track":
+        result_hash = None
+        if "--result-hash" in args:
+            # Forwarded by tracker_client.py after it streamed the hook input
+            index = args.index("--result-hash")
+            result_hash = args[index + 1] if len(args) > index + 1 else None
+            args = args[:index]
 
-    if action == "track":
-        if len(sys.argv) < 5:
+        if len(args) < 4:
             result = {"error": "track requires: tool, result, success"}
         else:
-            tool = sys.argv[2]
-            result_text = sys.argv[3]
-            success = sys.argv[4].lower() in ("true", "1", "yes", "success")
-            context = sys.argv[5] if len(sys.argv) > 5 else ""
-            result = track_action(tool, result_text, success, context)
+            tool = args[1]
+            result_text = args[2]
+            success = parse_success(args[3])
+            context = args[4] if len(args) > 4 else ""
+            result = track_action(tool, result_text, success, context, result_hash=result_hash)
+
+    elif action == "track-batch":
+        # Newline-delimited events from a file or stdin ("-")
+        source = args[1] if len(args) > 1 and not args[1].startswith("--") else "-"
+        session_id = args[args.index("--session") + 1] if "--session" in args[:-1] else None
+        if source == "-":
+            result = track_batch(sys.stdin, session_id)
+        else:
+            with open(source, "r", encoding="utf-8") as f:
+                result = track_batch(f, session_id)
 
     elif action == "confirm":
-        conf_type = sys.argv[2] if len(sys.argv) > 2 else "positive"
-        details = sys.argv[3] if len(sys.argv) > 3 else ""
+        conf_type = args[1] if len(args) > 1 else "positive"
+        details = args[2] if len(args) > 2 else ""
         result = track_user_confirmation(conf_type, details)
 
     elif action == "goal":
-        if len(sys.argv) < 3:
+        if len(args) < 2:
             result = {"error": "goal requires description"}
         else:
-            result = set_goal(" ".join(sys.argv[2:]))
+            result = set_goal(" ".join(args[1:]))
 
     elif action == "analyze":
         result = analyze_session()
@@ -546,14 +1081,14 @@ def main():
         learnable = [p for p in analysis.get("patterns", []) if p.get("learnable")]
         if learnable:
             review_result = review_patterns(learnable)
-            min_score = int(sys.argv[2]) if len(sys.argv) > 2 else 70
+            min_score = int(args[1]) if len(args) > 1 else 70
             result = accept_patterns(review_result["reviewed_patterns"], min_score)
         else:
             result = {"acceptance_complete": True, "accepted_count": 0, "message": "No patterns to accept"}
 
     elif action == "extract":
         # Check for --review flag
-        if len(sys.argv) > 2 and sys.argv[2] == "--review":
+        if len(args) > 1 and args[1] == "--review":
             result = extract_with_review()
         else:
             result = extract_to_patterns()
@@ -561,9 +1096,34 @@ def main():
     elif action == "clear":
         result = clear_session()
 
+    elif action == "migrate":
+        result = migrate_all_sessions()
+
     else:
         result = {"error": f"Unknown action: {action}"}
 
+    return result
+
+def main():
+    if len(sys.argv) < 2:
+        print(json.dumps({
+            "error": "Action required",
+            "usage": {
+                "track": "track <tool> <result> <success:true/false> [context] | track --stdin [success]",
+                "track-batch": "track-batch [file|-] [--session <id>] (newline-delimited events)",
+                "confirm": "confirm <positive/negative/correction> [details]",
+                "goal": "goal <description>",
+                "analyze": "analyze",
+                "review": "review (analyze and review patterns)",
+                "accept": "accept (accept reviewed patterns)",
+                "extract": "extract [--review] (extract patterns, optionally with review)",
+                "clear": "clear",
+                "migrate": "migrate (convert legacy session-*.json files to journals)"
+            }
+        }, indent=2))
+        sys.exit(1)
+
+    result = run_command(sys.argv[1:])
     print(json.dumps(result, indent=2))
 
 if __name__ == "__main__":
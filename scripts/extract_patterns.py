@@ -7,16 +7,64 @@ Analyzes conversation for:
 - User corrections
 - Repeated workflows
 - Quality issues
+
+Many transcripts (directories, globs) are extracted in a process pool and
+their patterns merged across files: instances of the same pattern (type,
+kind and triggers) become one pattern with a stable content-derived id,
+an occurrence count and its source files.
+
+Incremental runs keep a checkpoint per transcript (learned/extraction/):
+the byte offset and index of the last turn reached and the detectors' open
+windows. A re-run reads only from that turn on, and pattern ids are derived
+from content, so re-emitted patterns keep their ids.
+
+Full extractions of a file are cached in learned/extraction-cache/, keyed
+by the transcript's content hash and the ruleset version (a hash of this
+module), so unchanged transcripts return immediately and rule changes
+invalidate the cache.
+
+Reads Human:/Assistant: text transcripts and Claude Code JSONL transcripts
+(detected from the first line). JSONL records are mapped to turns directly:
+tool_use blocks give the tool sequence and tool_result is_error flags mark
+errors, so no tool regex runs and tool output bodies are never scanned.
+
+The transcript is streamed: lines are grouped into turns one at a time, each
+turn is scanned once by the compiled FeatureEngine into a feature bitset, and
+the detectors run on those features. Detector state is bounded (the
+workflow detector keeps the last WORKFLOW_MAX_STREAM tool calls), so memory
+does not grow with transcript size. Only the workflow detector looks at turn
+text again, to find tool calls in text transcripts.
+
+Usage:
+  python extract_patterns.py [transcript]    # Text or .jsonl; reads stdin without a path
+  python extract_patterns.py [--jobs N] <file|dir|glob>...   # Many transcripts, merged
+  python extract_patterns.py --incremental [--state DIR] ...  # Only what earlier runs have not seen
+  python extract_patterns.py --cache-stats | --cache-clear    # Extraction cache (--no-cache bypasses it)
 """
 
+import functools
+import glob
+import hashlib
+import io
+import itertools
 import json
+import math
+import os
 import re
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import (
+    Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Pattern as Pattern_, Tuple
+)
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent))
+from storage import atomic_write_json, locked_json, read_json
+
 
 @dataclass
 class Pattern:
@@ -32,6 +80,721 @@ class Pattern:
     created: str
 
 
+# Error resolution looks this many turns ahead of an error
+RESOLUTION_WINDOW = 4
+
+# JSONL tool_result records longer than this are skimmed, not decoded
+LAZY_RECORD_CHARS = 64 * 1024
+
+# Files picked up when a directory is given
+TRANSCRIPT_SUFFIXES = (".jsonl", ".txt")
+
+# Checkpoints verify that the transcript still starts with the same bytes
+CHECKPOINT_HEAD_BYTES = 4096
+CHECKPOINT_VERSION = 2
+
+# Repeated workflows: tool n-grams of 2..WORKFLOW_MAX_LENGTH calls occurring
+# without overlap at least WORKFLOW_MIN_SUPPORT times, and at least once per
+# 1 / WORKFLOW_MIN_FREQUENCY tool calls in long transcripts. At most
+# WORKFLOW_MAX_PATTERNS are reported per transcript. Only the last
+# WORKFLOW_MAX_STREAM tool calls are mined, which bounds detector memory and
+# checkpoint size
+WORKFLOW_MIN_SUPPORT = 2
+WORKFLOW_MIN_FREQUENCY = 0.001
+WORKFLOW_MAX_LENGTH = 8
+WORKFLOW_MAX_PATTERNS = 20
+WORKFLOW_MAX_STREAM = 5000
+
+# Extraction cache size bound (least recently used entries go first)
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def iter_lines(stream: Iterable[str]) -> Iterator[str]:
+    """Lines of a text stream without newlines, split like str.split('\\n')."""
+    ended = True
+    for line in stream:
+        ended = line.endswith("\n")
+        yield line[:-1] if ended else line
+    if ended:
+        yield ""
+
+
+def iter_turns(lines: Iterable[str], start_index: int = 0,
+               where: Optional[Callable[[], int]] = None) -> Iterator[Dict[str, Any]]:
+    """Group transcript lines into turns, joining each turn's lines once.
+
+    With `where` (byte offset of the line just read), turns carry the offset
+    their first line starts at.
+    """
+    role = None
+    parts = [""]
+    index = start_index
+    offset = where() if where else None
+
+    for line in lines:
+        if line.startswith('Human:') or line.startswith('User:'):
+            next_role = "user"
+        elif line.startswith('Assistant:') or line.startswith('Claude:'):
+            next_role = "assistant"
+        else:
+            parts.append(line)
+            continue
+
+        if len(parts) > 1 or parts[0]:
+            yield {"role": role, "content": "\n".join(parts), "index": index, "offset": offset}
+            index += 1
+        role = next_role
+        parts = [line]
+        offset = where() if where else None
+
+    if len(parts) > 1 or parts[0]:
+        yield {"role": role, "content": "\n".join(parts), "index": index, "offset": offset}
+
+
+def _has_field(line: str, key: str, value: str) -> bool:
+    """Whether a JSON line has "key": value outside any string.
+
+    Quotes inside JSON strings are escaped, so the quoted key cannot match
+    string contents.
+    """
+    return f'"{key}":{value}' in line or f'"{key}": {value}' in line
+
+
+def read_jsonl_record(line: str) -> Optional[Dict[str, Any]]:
+    """Detector input of one Claude Code transcript record, or None if it has none.
+
+    Returns role ("user", "assistant" or "tool" for tool results), message
+    id, text, tool_use names and whether any tool_result is an error. Large
+    tool_result records are skimmed for their is_error flags without decoding
+    the result bodies.
+    """
+    if (len(line) > LAZY_RECORD_CHARS and _has_field(line, "type", '"tool_result"')
+            and _has_field(line, "role", '"user"')):
+        return {"role": "tool", "id": None, "text": "", "tools": [],
+                "is_error": _has_field(line, "is_error", "true")}
+
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or record.get("type") not in ("user", "assistant") or record.get("isMeta"):
+        return None
+    message = record.get("message")
+    if not isinstance(message, dict):
+        return None
+
+    content = message.get("content")
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = [b for b in content or [] if isinstance(b, dict)]
+    results = [b for b in blocks if b.get("type") == "tool_result"]
+    return {
+        "role": "tool" if results else record["type"],
+        "id": message.get("id"),
+        "text": "\n".join(str(b.get("text", "")) for b in blocks if b.get("type") == "text"),
+        "tools": [str(b.get("name", "")) for b in blocks if b.get("type") == "tool_use"],
+        "is_error": any(b.get("is_error") for b in results)
+    }
+
+
+def iter_jsonl_turns(lines: Iterable[str], start_index: int = 0,
+                     where: Optional[Callable[[], int]] = None) -> Iterator[Dict[str, Any]]:
+    """Group Claude Code JSONL transcript records into turns.
+
+    Records of one assistant message (same message id) form one turn with
+    its tool_use names in order; consecutive tool_result records form one
+    "tool" turn whose only content is is_error. Each prompt is a user turn.
+    `where` works as in iter_turns.
+    """
+    turn = None
+    index = start_index
+
+    for line in lines:
+        line = line.strip()
+        record = read_jsonl_record(line) if line else None
+        if record is None:
+            continue
+
+        if turn is not None and turn["role"] == record["role"] and (
+                record["role"] == "tool" or (record["role"] == "assistant" and turn["id"] == record["id"])):
+            if record["text"]:
+                turn["parts"].append(record["text"])
+            turn["tools"].extend(record["tools"])
+            turn["is_error"] = turn["is_error"] or record["is_error"]
+            continue
+
+        if turn is not None:
+            yield _jsonl_turn(turn, index)
+            index += 1
+        turn = dict(record, parts=[record["text"]] if record["text"] else [], offset=where() if where else None)
+
+    if turn is not None:
+        yield _jsonl_turn(turn, index)
+
+
+def _jsonl_turn(turn: Dict[str, Any], index: int) -> Dict[str, Any]:
+    return {"role": turn["role"], "content": "\n".join(turn["parts"]), "index": index,
+            "tools": turn["tools"], "is_error": turn["is_error"], "offset": turn["offset"]}
+
+
+def detect_format(first_line: str) -> str:
+    return "jsonl" if first_line.lstrip().startswith("{") else "text"
+
+
+def iter_stream_turns(stream: Iterable[str], fmt: Optional[str] = None, start_index: int = 0,
+                      where: Optional[Callable[[], int]] = None) -> Iterator[Dict[str, Any]]:
+    """Turns of a transcript stream, Claude Code JSONL or Human:/Assistant: text.
+
+    Without `fmt` the format is detected from the first line.
+    """
+    stream = iter(stream)
+    if fmt is None:
+        first = next(stream, "")
+        fmt = detect_format(first)
+        stream = itertools.chain([first], stream)
+    if fmt == "jsonl":
+        return iter_jsonl_turns(stream, start_index, where)
+    return iter_turns(iter_lines(stream), start_index, where)
+
+
+class ByteLines:
+    """Decoded lines of a binary file, tracking the byte offset of each line.
+
+    `line_start` is the offset of the line last yielded; `offset` is where
+    the next line starts.
+    """
+
+    def __init__(self, f: BinaryIO, offset: int = 0):
+        self.f = f
+        self.offset = offset
+        self.line_start = offset
+
+    def __iter__(self) -> Iterator[str]:
+        for raw in self.f:
+            self.line_start = self.offset
+            self.offset += len(raw)
+            line = raw.decode("utf-8", errors="replace")
+            yield line[:-2] + "\n" if line.endswith("\r\n") else line
+
+
+def required_literals(pattern: str) -> Optional[Tuple[str, ...]]:
+    """Literals one of which must occur in any match of pattern (None if unknown).
+
+    Understands a leading literal run ("missing\\s+", "solved?") and a leading
+    group of literal alternatives ("(?:wrong|incorrect)").
+    """
+    group = re.match(r"\(\?:([\w' ]+(?:\|[\w' ]+)+)\)", pattern)
+    if group and pattern[group.end():group.end() + 1] not in ("?", "*", "{"):
+        return tuple(group.group(1).split("|"))
+    run = re.match(r"[\w' ,:]+", pattern)
+    if not run:
+        return None
+    literal = run.group(0)
+    if pattern[run.end():run.end() + 1] in ("?", "*", "{"):
+        literal = literal[:-1]
+    return (literal,) if literal else None
+
+
+class FeatureEngine:
+    """Compiled detector rules: one scan of a turn yields its feature bitset.
+
+    Rules are (feature, pattern) pairs; several rules may set the same feature.
+    Every pattern is compiled once and guarded by its required literals. A scan
+    lowercases the turn once, tests each distinct literal once, and runs only
+    the regexes whose literals occur, skipping features already found.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, str]]):
+        self.bits: Dict[str, int] = {}
+        self.literals: Dict[str, int] = {}
+        # (feature bit, literal mask or 0 for always, compiled pattern)
+        self.rules: List[Tuple[int, int, Pattern_]] = []
+        for feature, pattern in rules:
+            bit = self.bits.setdefault(feature, 1 << len(self.bits))
+            guard = 0
+            for literal in required_literals(pattern) or ():
+                guard |= self.literals.setdefault(literal, 1 << len(self.literals))
+            self.rules.append((bit, guard, re.compile(pattern)))
+
+    def mask(self, *features: str) -> int:
+        mask = 0
+        for feature in features:
+            mask |= self.bits[feature]
+        return mask
+
+    def scan(self, content: str) -> int:
+        """Feature bitset of a turn's content."""
+        text = content.lower()
+        present = 0
+        for literal, literal_bit in self.literals.items():
+            if literal in text:
+                present |= literal_bit
+        found = 0
+        for bit, guard, regex in self.rules:
+            if found & bit or (guard and not guard & present):
+                continue
+            if regex.search(text):
+                found |= bit
+        return found
+
+
+class ErrorResolutionDetector:
+    """Error → resolution pairs within RESOLUTION_WINDOW turns.
+
+    Only the indices of unresolved errors in the window are kept.
+    """
+
+    rules = [
+        ("error", r'error[:\s]'),
+        ("error", r'failed[:\s]'),
+        ("error", r'exception[:\s]'),
+        ("error", r'not found'),
+        ("error", r'invalid'),
+        ("resolution", r'fix(?:ed)?[:\s]'),
+        ("resolution", r'solved?[:\s]'),
+        ("resolution", r'resolv(?:ed)?[:\s]'),
+        ("resolution", r'work(?:s|ed)?[:\s]'),
+        ("resolution", r'success'),
+    ]
+
+    def __init__(self, engine: FeatureEngine):
+        self.error = engine.mask("error")
+        self.resolution = engine.mask("resolution")
+        self.pending: Deque[int] = deque()
+        self.pairs: List[Tuple[int, int]] = []
+
+    def feed(self, turn: Dict[str, Any], features: int) -> None:
+        j = turn["index"]
+        if self.pending and features & self.resolution:
+            self.pairs.extend((i, j) for i in self.pending)
+            self.pending.clear()
+        while self.pending and j - self.pending[0] >= RESOLUTION_WINDOW:
+            self.pending.popleft()
+        if features & self.error or turn.get("is_error"):
+            self.pending.append(j)
+
+    def state(self) -> Dict[str, Any]:
+        return {"pending": list(self.pending)}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.pending = deque(state.get("pending", []))
+
+    def finish(self, extractor: "PatternExtractor") -> None:
+        for i, j in sorted(self.pairs):
+            extractor._add_pattern(
+                type="fix",
+                name=extractor._generate_name("error-resolution", i),
+                description=f"Error at turn {i} resolved at turn {j}",
+                confidence=75,
+                source_turns=[i, j],
+                triggers=["error", "fix", "resolve"],
+                suggested_component="hook"
+            )
+
+
+class UserCorrectionDetector:
+    """User turns that correct Claude's approach."""
+
+    rules = [
+        ("correction", r'no,?\s+(?:actually|instead|rather)'),
+        ("correction", r"that's not (?:right|correct|what)"),
+        ("correction", r'(?:should|could) (?:be|have been)'),
+        ("correction", r'(?:wrong|incorrect)'),
+        ("correction", r"don't (?:do|use)"),
+        ("correction", r'(?:better|prefer) (?:to|if)'),
+    ]
+
+    def __init__(self, engine: FeatureEngine):
+        self.correction = engine.mask("correction")
+        self.turns: List[int] = []
+
+    def feed(self, turn: Dict[str, Any], features: int) -> None:
+        if turn["role"] == "user" and features & self.correction:
+            self.turns.append(turn["index"])
+
+    def state(self) -> Dict[str, Any]:
+        return {}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        pass
+
+    def finish(self, extractor: "PatternExtractor") -> None:
+        for i in self.turns:
+            extractor._add_pattern(
+                type="antipattern",
+                name=extractor._generate_name("user-correction", i),
+                description=f"User corrected approach at turn {i}",
+                confidence=70,
+                source_turns=[i - 1, i] if i > 0 else [i],
+                triggers=["avoid", "don't", "wrong"],
+                suggested_component="skill"
+            )
+
+
+def _non_overlapping(positions: List[int], length: int) -> List[int]:
+    """Greedy left-to-right occurrences of a length-n gram that do not overlap."""
+    kept = []
+    next_free = -1
+    for position in positions:
+        if position >= next_free:
+            kept.append(position)
+            next_free = position + length
+    return kept
+
+
+def mine_repeats(stream: List[int], min_support: int = WORKFLOW_MIN_SUPPORT,
+                 max_length: int = WORKFLOW_MAX_LENGTH) -> List[Tuple[Tuple[int, ...], List[int]]]:
+    """Closed frequent n-grams of a symbol stream with their occurrence positions.
+
+    Grows n-grams level by level: an n-gram is identified by an integer id
+    and extended to (id, next symbol), a collision-free rolling hash, only at
+    the positions of n-grams whose raw count can still reach min_support.
+    Each level touches at most len(stream) positions, so mining costs
+    O(len(stream) * max_length). Support counts non-overlapping occurrences;
+    an n-gram is dropped when a one-longer n-gram containing it has the same
+    support. Returns (gram, start positions) for grams of length >= 2, most
+    frequent first.
+    """
+    by_symbol: Dict[int, List[int]] = {}
+    for position, symbol in enumerate(stream):
+        by_symbol.setdefault(symbol, []).append(position)
+    # gram id -> gram; level: gram id -> start positions
+    grams: List[Tuple[int, ...]] = [(symbol,) for symbol in by_symbol]
+    level: Dict[int, List[int]] = dict(enumerate(by_symbol.values()))
+
+    frequent: Dict[Tuple[int, ...], List[int]] = {}
+    for length in range(1, max_length):
+        next_level: Dict[Tuple[int, int], List[int]] = {}
+        for key, positions in level.items():
+            if len(positions) < min_support:
+                continue
+            for position in positions:
+                end = position + length
+                if end < len(stream):
+                    next_level.setdefault((key, stream[end]), []).append(position)
+
+        level = {}
+        for key, positions in next_level.items():
+            if len(positions) < min_support:
+                continue
+            gram = grams[key[0]] + (key[1],)
+            kept = _non_overlapping(positions, length + 1)
+            if len(kept) >= min_support:
+                frequent[gram] = kept
+            # Overlapping occurrences can still extend to longer grams
+            level[len(grams)] = positions
+            grams.append(gram)
+        if not level:
+            break
+
+    # Best support of a one-longer gram containing each gram
+    covered: Dict[Tuple[int, ...], int] = {}
+    for gram, kept in frequent.items():
+        for sub in (gram[:-1], gram[1:]):
+            covered[sub] = max(covered.get(sub, 0), len(kept))
+
+    closed = [(gram, kept) for gram, kept in frequent.items() if covered.get(gram, 0) < len(kept)]
+    closed.sort(key=lambda item: (-len(item[1]), -len(item[0]), item[1][0]))
+    return closed
+
+
+class RepeatedWorkflowDetector:
+    """Repeated tool sequences in the flattened tool stream.
+
+    Tool calls of all assistant turns form one stream (so sequences may span
+    turns), of which the last WORKFLOW_MAX_STREAM calls are kept;
+    mine_repeats finds the closed frequent n-grams at finish. JSONL turns
+    carry their tool_use names; in text transcripts tool calls are matched
+    case-sensitively on the original content.
+    """
+
+    rules: List[Tuple[str, str]] = []
+    tool_pattern = re.compile(r'(?:Read|Write|Edit|Bash|Grep|Glob)\s*\(')
+
+    def __init__(self, engine: FeatureEngine):
+        self.tool_ids: Dict[str, int] = {}
+        self.stream: Deque[int] = deque(maxlen=WORKFLOW_MAX_STREAM)
+        self.turns: Deque[int] = deque(maxlen=WORKFLOW_MAX_STREAM)
+        self.tool_turns = 0
+
+    def feed(self, turn: Dict[str, Any], features: int) -> None:
+        if turn["role"] != "assistant":
+            return
+        if "tools" in turn:
+            tools = turn["tools"]
+        else:
+            tools = [t.strip('( ') for t in self.tool_pattern.findall(turn["content"])]
+        if tools:
+            self.tool_turns += 1
+            for tool in tools:
+                self.stream.append(self.tool_ids.setdefault(tool, len(self.tool_ids)))
+                self.turns.append(turn["index"])
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "tools": list(self.tool_ids),
+            "stream": list(self.stream),
+            "turns": list(self.turns),
+            "tool_turns": self.tool_turns
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.tool_ids = {tool: i for i, tool in enumerate(state.get("tools", []))}
+        self.stream = deque(state.get("stream", []), maxlen=WORKFLOW_MAX_STREAM)
+        self.turns = deque(state.get("turns", []), maxlen=WORKFLOW_MAX_STREAM)
+        self.tool_turns = state.get("tool_turns", 0)
+
+    def finish(self, extractor: "PatternExtractor") -> None:
+        if self.tool_turns < 3:
+            return
+        names = list(self.tool_ids)
+        stream, turns = list(self.stream), list(self.turns)
+        min_support = max(WORKFLOW_MIN_SUPPORT, math.ceil(len(stream) * WORKFLOW_MIN_FREQUENCY))
+        for gram, positions in mine_repeats(stream, min_support)[:WORKFLOW_MAX_PATTERNS]:
+            seq = [names[symbol] for symbol in gram]
+            count = len(positions)
+            seq_turns = sorted({turns[p + k] for p in positions for k in range(len(gram))})
+            extractor._add_pattern(
+                type="workflow",
+                name=extractor._generate_name("tool-sequence", turns[positions[0]]),
+                description=f"Tool sequence {' → '.join(seq)} repeated {count} times",
+                confidence=min(100, 60 + (count * 10)),
+                source_turns=seq_turns,
+                triggers=seq,
+                suggested_component="skill"
+            )
+
+
+class QualityIssueDetector:
+    """Quality-related discussion, first matching issue per turn."""
+
+    rules = [
+        ("missing content", r'missing\s+\w+'),
+        ("incomplete", r'should (?:have|include)'),
+        ("content issue", r'too (?:long|short|vague)'),
+        ("clarity issue", r'not clear'),
+    ]
+
+    def __init__(self, engine: FeatureEngine):
+        self.issues = [(engine.mask(issue), issue) for issue in dict.fromkeys(f for f, _ in self.rules)]
+        self.found: List[Tuple[int, str]] = []
+
+    def feed(self, turn: Dict[str, Any], features: int) -> None:
+        for mask, issue_type in self.issues:
+            if features & mask:
+                self.found.append((turn["index"], issue_type))
+                break
+
+    def state(self) -> Dict[str, Any]:
+        return {}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        pass
+
+    def finish(self, extractor: "PatternExtractor") -> None:
+        for i, issue_type in self.found:
+            extractor._add_pattern(
+                type="validation",
+                name=extractor._generate_name(issue_type, i),
+                description=f"Quality issue '{issue_type}' at turn {i}",
+                confidence=65,
+                source_turns=[i],
+                triggers=["validate", "check", "quality"],
+                suggested_component="hook"
+            )
+
+
+# Detectors in output order. Each has rules, feed(turn, features),
+# finish(extractor), and state()/restore(state) for the open windows a
+# checkpoint carries over
+DETECTORS = (ErrorResolutionDetector, UserCorrectionDetector, RepeatedWorkflowDetector, QualityIssueDetector)
+
+_ENGINE: Optional[FeatureEngine] = None
+
+
+def get_engine() -> FeatureEngine:
+    """Feature engine over the rules of all DETECTORS (compiled once per process)."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = FeatureEngine(rule for detector in DETECTORS for rule in detector.rules)
+    return _ENGINE
+
+
+def get_state_dir() -> Path:
+    """Default checkpoint directory: learned/extraction under the plugin root."""
+    return Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent)) / "learned" / "extraction"
+
+
+def get_cache_dir() -> Path:
+    """Default extraction cache directory: learned/extraction-cache under the plugin root."""
+    return Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent)) / "learned" / "extraction-cache"
+
+
+_RULESET_VERSION: Optional[str] = None
+
+
+def ruleset_version() -> str:
+    """Hash of this module's source: any rule or detector change yields a new version."""
+    global _RULESET_VERSION
+    if _RULESET_VERSION is None:
+        _RULESET_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+    return _RULESET_VERSION
+
+
+def pattern_id(transcript_path: Optional[str], type: str, name: str, triggers: List[str]) -> str:
+    """Content-derived pattern id: same transcript, type, name and triggers -> same id."""
+    identity = [transcript_path or "", type, name, triggers]
+    return f"pat_{hashlib.sha1(json.dumps(identity).encode('utf-8')).hexdigest()[:12]}"
+
+
+class ExtractionCache:
+    """On-disk cache of extracted patterns keyed by transcript content and ruleset.
+
+    One JSON file per key (sha256 of the content + ruleset_version()); hits
+    bump the file's mtime and the least recently used files are evicted once
+    the cache exceeds max_bytes. Hit/miss counters live in stats.json.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir()
+        self.max_bytes = max_bytes
+        self.stats_file = self.cache_dir / "stats.json"
+
+    def key(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return f"{digest.hexdigest()[:32]}-{ruleset_version()}"
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _count(self, field: str, n: int = 1) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with locked_json(self.stats_file, default=dict) as stats:
+                stats[field] = stats.get(field, 0) + n
+        except OSError:
+            pass  # Counters are informational
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached pattern dicts for a key, or None (counts a hit or a miss)."""
+        entry = self._entry(key)
+        try:
+            patterns = read_json(entry)
+        except (OSError, ValueError):
+            patterns = None
+        if not isinstance(patterns, list):
+            self._count("misses")
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass  # Only affects the eviction order
+        self._count("hits")
+        return patterns
+
+    def put(self, key: str, patterns: List[Dict[str, Any]]) -> None:
+        """Store the patterns for a key; best-effort, an unwritable cache is skipped."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write_json(self._entry(key), patterns, indent=None)
+            self.evict()
+        except OSError:
+            pass
+
+    def _entries(self) -> List[os.DirEntry]:
+        try:
+            return [e for e in os.scandir(self.cache_dir) if e.name.endswith(".json") and e.name != "stats.json"]
+        except FileNotFoundError:
+            return []
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                evicted += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        if evicted:
+            self._count("evictions", evicted)
+        return evicted
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            os.unlink(entry.path)
+        if self.stats_file.exists():
+            atomic_write_json(self.stats_file, {})
+
+    def stats(self) -> Dict[str, Any]:
+        counters = read_json(self.stats_file, default=dict)
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        entries = self._entries()
+        return {
+            "cache_dir": str(self.cache_dir),
+            "ruleset_version": ruleset_version(),
+            "entries": len(entries),
+            "bytes": sum(e.stat().st_size for e in entries),
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0
+        }
+
+
+class CheckpointStore:
+    """Per-transcript extraction checkpoints, one JSON file per transcript.
+
+    A checkpoint holds the byte offset and index of the last turn reached,
+    the transcript format, a hash of its first bytes and the detector states
+    from just before that turn, so a re-run re-reads only that turn onwards.
+    """
+
+    def __init__(self, state_dir: Optional[Path] = None):
+        self.state_dir = Path(state_dir) if state_dir else get_state_dir()
+
+    def path_for(self, transcript: str) -> Path:
+        key = hashlib.sha1(os.path.abspath(transcript).encode("utf-8")).hexdigest()[:16]
+        return self.state_dir / f"{key}.json"
+
+    def load(self, transcript: str) -> Optional[Dict[str, Any]]:
+        try:
+            checkpoint = read_json(self.path_for(transcript), default=lambda: None)
+        except ValueError:
+            return None
+        if not checkpoint or checkpoint.get("version") != CHECKPOINT_VERSION:
+            return None
+        return checkpoint
+
+    def save(self, transcript: str, checkpoint: Dict[str, Any]) -> None:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.path_for(transcript), dict(checkpoint, version=CHECKPOINT_VERSION), indent=None)
+
+    def clear(self, transcript: str) -> None:
+        self.path_for(transcript).unlink(missing_ok=True)
+
+
+def _head_hash(f: BinaryIO, length: int) -> str:
+    f.seek(0)
+    return hashlib.sha1(f.read(min(length, CHECKPOINT_HEAD_BYTES))).hexdigest()
+
+
 class PatternExtractor:
     """Extract patterns from conversation transcripts."""
 
@@ -42,175 +805,137 @@ class PatternExtractor:
 
     def extract_from_transcript(self, transcript: str) -> List[Pattern]:
         """Extract all patterns from transcript text."""
+        return self.extract_from_stream(io.StringIO(transcript))
+
+    def extract_from_file(self, path: str) -> List[Pattern]:
+        """Extract all patterns from a transcript file, streaming it line by line."""
+        self.transcript_path = path
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return self.extract_from_stream(f)
+
+    def extract_from_stream(self, stream: Iterable[str]) -> List[Pattern]:
+        """Extract all patterns from a transcript stream in constant memory.
+
+        Turns are built one at a time, scanned once into a feature bitset and
+        fed to every detector; detectors keep only sliding windows of turn
+        indices and tool calls, never turn contents.
+        """
         self.patterns = []
+        engine = get_engine()
+        detectors = [detector(engine) for detector in DETECTORS]
 
-        # Split into turns
-        turns = self._parse_turns(transcript)
+        for turn in iter_stream_turns(stream):
+            self._feed(engine, detectors, turn)
 
-        # Detect different pattern types
-        self._detect_error_resolutions(turns)
-        self._detect_user_corrections(turns)
-        self._detect_repeated_workflows(turns)
-        self._detect_quality_issues(turns)
+        for detector in detectors:
+            detector.finish(self)
 
         return self.patterns
 
-    def _parse_turns(self, transcript: str) -> List[Dict[str, Any]]:
-        """Parse transcript into turns."""
-        turns = []
-        current_turn = {"role": None, "content": "", "index": 0}
-
-        for i, line in enumerate(transcript.split('\n')):
-            if line.startswith('Human:') or line.startswith('User:'):
-                if current_turn["content"]:
-                    turns.append(current_turn)
-                current_turn = {"role": "user", "content": line, "index": len(turns)}
-            elif line.startswith('Assistant:') or line.startswith('Claude:'):
-                if current_turn["content"]:
-                    turns.append(current_turn)
-                current_turn = {"role": "assistant", "content": line, "index": len(turns)}
+    def extract_cached(self, path: str, cache: Optional[ExtractionCache] = None) -> List[Pattern]:
+        """extract_from_file through the content-addressed cache.
+
+        Cached patterns are re-keyed to this path's content-derived ids, so
+        identical transcripts at different paths share one entry.
+        """
+        cache = cache or ExtractionCache()
+        self.transcript_path = path
+        key = cache.key(path)
+        cached = cache.get(key)
+        if cached is not None:
+            try:
+                self.patterns = [
+                    Pattern(**dict(p, id=pattern_id(path, p["type"], p["name"], p["triggers"]))) for p in cached
+                ]
+            except (KeyError, TypeError):
+                pass  # Malformed entry: extract again and overwrite it
             else:
-                current_turn["content"] += "\n" + line
-
-        if current_turn["content"]:
-            turns.append(current_turn)
-
-        return turns
-
-    def _detect_error_resolutions(self, turns: List[Dict]) -> None:
-        """Detect error → resolution patterns."""
-        error_patterns = [
-            r'error[:\s]',
-            r'failed[:\s]',
-            r'exception[:\s]',
-            r'not found',
-            r'invalid',
-        ]
-
-        resolution_patterns = [
-            r'fix(?:ed)?[:\s]',
-            r'solved?[:\s]',
-            r'resolv(?:ed)?[:\s]',
-            r'work(?:s|ed)?[:\s]',
-            r'success',
-        ]
-
-        for i, turn in enumerate(turns):
-            content_lower = turn["content"].lower()
-
-            # Check for error
-            has_error = any(re.search(p, content_lower) for p in error_patterns)
-            if not has_error:
-                continue
+                self.pattern_counter = len(self.patterns)
+                return self.patterns
+        patterns = self.extract_from_file(path)
+        cache.put(key, [asdict(p) for p in patterns])
+        return patterns
 
-            # Look for resolution in next few turns
-            for j in range(i + 1, min(i + 5, len(turns))):
-                next_content = turns[j]["content"].lower()
-                has_resolution = any(re.search(p, next_content) for p in resolution_patterns)
-
-                if has_resolution:
-                    self._add_pattern(
-                        type="fix",
-                        name=self._generate_name("error-resolution", i),
-                        description=f"Error at turn {i} resolved at turn {j}",
-                        confidence=75,
-                        source_turns=[i, j],
-                        triggers=["error", "fix", "resolve"],
-                        suggested_component="hook"
-                    )
-                    break
-
-    def _detect_user_corrections(self, turns: List[Dict]) -> None:
-        """Detect when user corrects Claude's approach."""
-        correction_patterns = [
-            r'no,?\s+(?:actually|instead|rather)',
-            r"that's not (?:right|correct|what)",
-            r'(?:should|could) (?:be|have been)',
-            r'(?:wrong|incorrect)',
-            r"don't (?:do|use)",
-            r'(?:better|prefer) (?:to|if)',
-        ]
-
-        for i, turn in enumerate(turns):
-            if turn["role"] != "user":
-                continue
+    def extract_incremental(self, path: str, checkpoints: Optional[CheckpointStore] = None) -> List[Pattern]:
+        """Extract patterns from the part of a transcript not seen by earlier runs.
 
-            content_lower = turn["content"].lower()
-            for pattern in correction_patterns:
-                if re.search(pattern, content_lower):
-                    self._add_pattern(
-                        type="antipattern",
-                        name=self._generate_name("user-correction", i),
-                        description=f"User corrected approach at turn {i}",
-                        confidence=70,
-                        source_turns=[i - 1, i] if i > 0 else [i],
-                        triggers=["avoid", "don't", "wrong"],
-                        suggested_component="skill"
-                    )
-                    break
-
-    def _detect_repeated_workflows(self, turns: List[Dict]) -> None:
-        """Detect repeated tool usage patterns."""
-        tool_sequence = []
-        tool_pattern = r'(?:Read|Write|Edit|Bash|Grep|Glob)\s*\('
-
-        for turn in turns:
-            if turn["role"] != "assistant":
-                continue
+        Resumes at the checkpointed last turn, which may have grown since,
+        with the detector windows saved before it. Patterns of that turn and
+        repeated workflows (whose counts grow) are emitted again under the
+        same content-derived ids (a grown last turn may also replace its
+        patterns); a transcript that did not grow yields nothing. A
+        transcript that shrank or was rewritten is re-read from the start.
+        """
+        checkpoints = checkpoints or CheckpointStore()
+        self.transcript_path = path
+        self.patterns = []
+        engine = get_engine()
+        detectors = [detector(engine) for detector in DETECTORS]
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            checkpoint = checkpoints.load(path)
+            if checkpoint and (size < checkpoint["size"]
+                               or _head_hash(f, checkpoint["size"]) != checkpoint["head_sha1"]):
+                checkpoint = None
+            if checkpoint and size == checkpoint["size"]:
+                return self.patterns
+
+            offset = checkpoint["offset"] if checkpoint else 0
+            if checkpoint:
+                for detector, state in zip(detectors, checkpoint["detectors"]):
+                    detector.restore(state)
+
+            f.seek(offset)
+            lines = ByteLines(f, offset)
+            turns = iter_stream_turns(
+                lines, checkpoint["format"] if checkpoint else None,
+                checkpoint["turn_index"] if checkpoint else 0, lambda: lines.line_start
+            )
+
+            # The last turn may still grow: checkpoint the state from before it
+            last = None
+            for turn in turns:
+                if last is not None:
+                    self._feed(engine, detectors, last)
+                last = turn
+            if last is not None:
+                states = [detector.state() for detector in detectors]
+                self._feed(engine, detectors, last)
+                f.seek(0)
+                fmt = checkpoint["format"] if checkpoint else detect_format(f.readline().decode("utf-8", "replace"))
+                checkpoint = {
+                    "transcript": os.path.abspath(path),
+                    "format": fmt,
+                    "offset": last["offset"],
+                    "turn_index": last["index"],
+                    "detectors": states
+                }
+            elif checkpoint is None:
+                # Nothing complete to resume from yet (e.g. a partial first record)
+                return self.patterns
+            checkpoint.update(size=size, head_sha1=_head_hash(f, size), updated=datetime.now().isoformat())
+
+        for detector in detectors:
+            detector.finish(self)
+        checkpoints.save(path, checkpoint)
+        return self.patterns
 
-            tools = re.findall(tool_pattern, turn["content"])
-            if tools:
-                tool_sequence.append({
-                    "turn": turn["index"],
-                    "tools": [t.strip('( ') for t in tools]
-                })
-
-        # Find repeated sequences
-        if len(tool_sequence) >= 3:
-            # Simple repetition detection
-            sequences = [tuple(s["tools"]) for s in tool_sequence]
-            for seq in set(sequences):
-                count = sequences.count(seq)
-                if count >= 2 and len(seq) >= 2:
-                    self._add_pattern(
-                        type="workflow",
-                        name=self._generate_name("tool-sequence", 0),
-                        description=f"Tool sequence {' → '.join(seq)} repeated {count} times",
-                        confidence=60 + (count * 10),
-                        source_turns=[s["turn"] for s in tool_sequence if tuple(s["tools"]) == seq],
-                        triggers=list(seq),
-                        suggested_component="skill"
-                    )
-
-    def _detect_quality_issues(self, turns: List[Dict]) -> None:
-        """Detect quality-related discussions."""
-        quality_patterns = [
-            (r'missing\s+\w+', "missing content"),
-            (r'should (?:have|include)', "incomplete"),
-            (r'too (?:long|short|vague)', "content issue"),
-            (r'not clear', "clarity issue"),
-        ]
-
-        for i, turn in enumerate(turns):
-            content_lower = turn["content"].lower()
-            for pattern, issue_type in quality_patterns:
-                if re.search(pattern, content_lower):
-                    self._add_pattern(
-                        type="validation",
-                        name=self._generate_name(issue_type, i),
-                        description=f"Quality issue '{issue_type}' at turn {i}",
-                        confidence=65,
-                        source_turns=[i],
-                        triggers=["validate", "check", "quality"],
-                        suggested_component="hook"
-                    )
-                    break
+    @staticmethod
+    def _feed(engine: FeatureEngine, detectors: List[Any], turn: Dict[str, Any]) -> None:
+        features = engine.scan(turn["content"])
+        for detector in detectors:
+            detector.feed(turn, features)
 
     def _add_pattern(self, **kwargs) -> None:
-        """Add a new pattern."""
+        """Add a new pattern.
+
+        Ids are derived from the transcript path, type, name and triggers,
+        so re-extracting the same turns yields the same ids.
+        """
         self.pattern_counter += 1
         pattern = Pattern(
-            id=f"pat_{datetime.now().strftime('%Y%m%d')}_{self.pattern_counter:03d}",
+            id=pattern_id(self.transcript_path, kwargs["type"], kwargs["name"], kwargs["triggers"]),
             created=datetime.now().isoformat(),
             **kwargs
         )
@@ -233,17 +958,187 @@ class PatternExtractor:
         Path(output_path).write_text(self.to_json())
 
 
+def pattern_signature(pattern: Dict[str, Any]) -> Tuple[str, str, Tuple[str, ...]]:
+    """What makes two extracted patterns the same across transcripts.
+
+    The kind is the name without its turn suffix ("error-resolution-12" ->
+    "error-resolution"); triggers tell tool sequences apart.
+    """
+    kind = re.sub(r"-\d+$", "", pattern["name"])
+    return pattern["type"], kind, tuple(pattern["triggers"])
+
+
+def stable_pattern_id(signature: Tuple[str, str, Tuple[str, ...]]) -> str:
+    digest = hashlib.sha1(json.dumps(signature).encode("utf-8")).hexdigest()
+    return f"pat_{digest[:12]}"
+
+
+def collect_transcripts(args: Iterable[str]) -> List[str]:
+    """Transcript paths named by files, directories (recursive) and glob patterns, sorted."""
+    paths = set()
+    for arg in args:
+        if os.path.isdir(arg):
+            paths.update(
+                str(p) for p in Path(arg).rglob("*") if p.suffix in TRANSCRIPT_SUFFIXES and p.is_file()
+            )
+        elif glob.has_magic(arg):
+            paths.update(p for p in glob.glob(arg, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(arg):
+            paths.add(arg)
+    return sorted(paths)
+
+
+def _extract_file(path: str, state_dir: Optional[str] = None, cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Worker: patterns of one transcript as dicts (errors are reported, not raised).
+
+    With a state_dir, only the part after the transcript's checkpoint is read;
+    otherwise a cache_dir serves unchanged transcripts from the cache.
+    """
+    try:
+        size = os.path.getsize(path)
+        extractor = PatternExtractor()
+        if state_dir is not None:
+            patterns = extractor.extract_incremental(path, CheckpointStore(state_dir))
+        elif cache_dir is not None:
+            patterns = extractor.extract_cached(path, ExtractionCache(cache_dir))
+        else:
+            patterns = extractor.extract_from_file(path)
+        patterns = [asdict(p) for p in patterns]
+        return {"file": path, "bytes": size, "patterns": patterns}
+    except OSError as e:
+        return {"file": path, "bytes": 0, "patterns": [], "error": str(e)}
+
+
+def merge_patterns(results: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge per-file patterns by signature, in result order.
+
+    Each merged pattern keeps the first instance's fields, the highest
+    confidence, its occurrence count and the source turns per file.
+    """
+    merged: Dict[Tuple[str, str, Tuple[str, ...]], Dict[str, Any]] = {}
+    for result in results:
+        for pattern in result["patterns"]:
+            signature = pattern_signature(pattern)
+            entry = merged.get(signature)
+            if entry is None:
+                entry = dict(pattern, id=stable_pattern_id(signature), name=signature[1],
+                             occurrences=0, sources=[])
+                entry.pop("source_turns")
+                merged[signature] = entry
+            entry["occurrences"] += 1
+            entry["confidence"] = max(entry["confidence"], pattern["confidence"])
+            if entry["sources"] and entry["sources"][-1]["file"] == result["file"]:
+                entry["sources"][-1]["turns"].append(pattern["source_turns"])
+            else:
+                entry["sources"].append({"file": result["file"], "turns": [pattern["source_turns"]]})
+    return list(merged.values())
+
+
+def extract_many(paths: List[str], jobs: int = 1, progress=None, state_dir: Optional[str] = None,
+                 cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Extract and merge patterns from many transcripts across `jobs` processes.
+
+    Per-file results stream back in path order, so the merged output does not
+    depend on scheduling. `progress(result)` is called for each file. With a
+    state_dir, extraction is incremental per file; with a cache_dir, cached.
+    """
+    worker = functools.partial(_extract_file, state_dir=state_dir, cache_dir=cache_dir)
+    start = time.perf_counter()
+    stats = {"files": 0, "bytes": 0, "patterns_extracted": 0, "errors": []}
+
+    def consume(results: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for result in results:
+            stats["files"] += 1
+            stats["bytes"] += result["bytes"]
+            stats["patterns_extracted"] += len(result["patterns"])
+            if "error" in result:
+                stats["errors"].append({"file": result["file"], "error": result["error"]})
+            if progress:
+                progress(result)
+            yield result
+
+    if jobs > 1 and len(paths) > 1:
+        chunksize = max(1, len(paths) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            patterns = merge_patterns(consume(pool.map(worker, paths, chunksize=chunksize)))
+    else:
+        patterns = merge_patterns(consume(map(worker, paths)))
+
+    elapsed = time.perf_counter() - start
+    stats.update({
+        "jobs": jobs,
+        "patterns": len(patterns),
+        "elapsed_s": round(elapsed, 3),
+        "files_per_s": round(stats["files"] / elapsed, 1) if elapsed else 0,
+        "mb_per_s": round(stats["bytes"] / 1e6 / elapsed, 2) if elapsed else 0
+    })
+    return {"extracted": datetime.now().isoformat(), "stats": stats, "patterns": patterns}
+
+
+def _pop_option(args: List[str], name: str) -> Optional[str]:
+    """Remove `name value` from args and return the value."""
+    if name not in args[:-1]:
+        return None
+    i = args.index(name)
+    value = args[i + 1]
+    del args[i:i + 2]
+    return value
+
+
+def main_many(args: List[str], jobs: int, state_dir: Optional[str], cache_dir: Optional[str]) -> None:
+    """Extract from many transcripts: <file|dir|glob>..."""
+    paths = collect_transcripts(args)
+    if not paths:
+        print("No transcripts found", file=sys.stderr)
+        sys.exit(1)
+
+    def progress(result):
+        print(f"{result['file']}: {len(result['patterns'])} patterns", file=sys.stderr)
+
+    result = extract_many(paths, jobs, progress, state_dir, cache_dir)
+    print(json.dumps(result, indent=2))
+
+    stats = result["stats"]
+    print(f"\n--- Summary ---", file=sys.stderr)
+    print(f"Files: {stats['files']} ({stats['files_per_s']} files/s, {stats['mb_per_s']} MB/s, "
+          f"{stats['jobs']} jobs)", file=sys.stderr)
+    print(f"Patterns: {stats['patterns']} merged from {stats['patterns_extracted']}", file=sys.stderr)
+    if stats["errors"]:
+        print(f"Errors: {len(stats['errors'])}", file=sys.stderr)
+
+
 def main():
     """Main entry point."""
-    if len(sys.argv) < 2:
-        # Read from stdin
-        transcript = sys.stdin.read()
-    else:
-        transcript_path = sys.argv[1]
-        transcript = Path(transcript_path).read_text()
+    args = sys.argv[1:]
+    if args and args[0] in ("--cache-stats", "--cache-clear"):
+        cache = ExtractionCache()
+        if args[0] == "--cache-clear":
+            cache.clear()
+        print(json.dumps(cache.stats(), indent=2))
+        return
+
+    jobs = _pop_option(args, "--jobs")
+    state_dir = _pop_option(args, "--state")
+    if "--incremental" in args:
+        args.remove("--incremental")
+        state_dir = state_dir or str(get_state_dir())
+    cache_dir = None if "--no-cache" in args else str(get_cache_dir())
+    args = [a for a in args if a != "--no-cache"]
+
+    if len(args) > 1 or jobs or (args and (os.path.isdir(args[0]) or glob.has_magic(args[0]))):
+        main_many(args, int(jobs or 1), state_dir, cache_dir)
+        return
 
     extractor = PatternExtractor()
-    patterns = extractor.extract_from_transcript(transcript)
+    if not args:
+        # Read from stdin
+        patterns = extractor.extract_from_stream(sys.stdin)
+    elif state_dir:
+        patterns = extractor.extract_incremental(args[0], CheckpointStore(state_dir))
+    elif cache_dir:
+        patterns = extractor.extract_cached(args[0], ExtractionCache(cache_dir))
+    else:
+        patterns = extractor.extract_from_file(args[0])
 
     print(extractor.to_json())
 
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Hook Input - Stream a hook event JSON object from stdin in bounded memory.
+
+PostToolUse hooks receive the event on stdin:
+  {"session_id": ..., "tool_name": ..., "tool_input": {...}, "tool_response": ...}
+
+tool_response can be megabytes (Read/Bash output). Instead of json.load-ing it,
+the event is scanned in chunks: the md5 result hash is computed over the full
+raw tool_response, and only bounded prefixes are kept for the result summary
+and the tool input context.
+
+Usage:
+  python hook_input.py < event.json    # Print the extracted fields
+"""
+
+import hashlib
+import json
+import re
+import sys
+from typing import Callable, Dict, Optional, Tuple
+
+SUMMARY_LIMIT = 500
+CONTEXT_LIMIT = 2000
+CHUNK_SIZE = 64 * 1024
+
+# Scalar keys captured from the top level of tool_response to derive success
+FLAG_KEYS = ("success", "is_error", "interrupted")
+
+_NON_WS = re.compile(rb"[^ \t\r\n]")
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb"[\s,}\]]")
+
+
+class _Prefix:
+    """Collect at most `limit` bytes."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.data = bytearray()
+
+    def add(self, chunk: bytes) -> None:
+        room = self.limit - len(self.data)
+        if room > 0:
+            self.data += chunk[:room]
+
+
+class _Scanner:
+    """Chunked JSON tokenizer that never holds a whole string value in memory.
+
+    A tap can be attached to receive every raw byte consumed while it is active.
+    """
+
+    def __init__(self, stream, keep: int, chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.keep = keep
+        self.chunk_size = chunk_size
+        self.buf = b""
+        self.pos = 0
+        self.tap: Optional[Callable[[bytes], None]] = None
+        self.tap_from = 0
+
+    def _fill(self) -> bool:
+        """Drop consumed bytes (feeding the tap) and read the next chunk."""
+        if self.tap is not None and self.pos > self.tap_from:
+            self.tap(self.buf[self.tap_from:self.pos])
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        self.tap_from = 0
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buf += chunk
+        return True
+
+    def start_tap(self, tap: Callable[[bytes], None]) -> None:
+        self.skip_ws()
+        self.tap = tap
+        self.tap_from = self.pos
+
+    def stop_tap(self) -> None:
+        if self.tap is not None and self.pos > self.tap_from:
+            self.tap(self.buf[self.tap_from:self.pos])
+        self.tap = None
+
+    def skip_ws(self) -> bool:
+        while True:
+            match = _NON_WS.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return True
+            self.pos = len(self.buf)
+            if not self._fill():
+                return False
+
+    def next_token(self) -> Tuple[str, Optional[bytes]]:
+        """Return (kind, raw) where kind is a structural char, 'str' or 'scalar'."""
+        if not self.skip_ws():
+            raise ValueError("Unexpected end of hook input")
+        char = self.buf[self.pos:self.pos + 1]
+        if char in (b"{", b"}", b"[", b"]", b":", b","):
+            self.pos += 1
+            return char.decode(), None
+        if char == b'"':
+            self.pos += 1
+            return "str", self._read_string()
+        return "scalar", self._read_scalar()
+
+    def _read_string(self) -> bytes:
+        kept = _Prefix(self.keep)
+        while True:
+            match = _STRING_SPECIAL.search(self.buf, self.pos)
+            if not match:
+                kept.add(self.buf[self.pos:])
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("Unterminated string in hook input")
+                continue
+            end = match.start()
+            kept.add(self.buf[self.pos:end])
+            if self.buf[end:end + 1] == b'"':
+                self.pos = end + 1
+                return bytes(kept.data)
+            if end + 1 >= len(self.buf):
+                # Escape split across chunks: keep the backslash for the next pass
+                self.pos = end
+                if not self._fill():
+                    raise ValueError("Unterminated string in hook input")
+                continue
+            kept.add(self.buf[end:end + 2])
+            self.pos = end + 2
+
+    def _read_scalar(self) -> bytes:
+        kept = _Prefix(self.keep)
+        while True:
+            match = _SCALAR_END.search(self.buf, self.pos)
+            if match:
+                kept.add(self.buf[self.pos:match.start()])
+                self.pos = match.start()
+                return bytes(kept.data)
+            kept.add(self.buf[self.pos:])
+            self.pos = len(self.buf)
+            if not self._fill():
+                return bytes(kept.data)
+
+
+def decode_string(raw: bytes) -> str:
+    """Decode the (possibly truncated) body of a JSON string."""
+    for cut in range(0, 7):
+        candidate = raw[:len(raw) - cut] if cut else raw
+        try:
+            return json.loads(b'"' + candidate + b'"')
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+    return raw.decode("utf-8", "ignore")
+
+
+def _parse_scalar(raw: bytes):
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def flags_succeeded(flags: Dict) -> bool:
+    """Derive tool success from the FLAG_KEYS members of a tool_response."""
+    return not (
+        flags.get("success") is False
+        or flags.get("is_error") is True
+        or flags.get("interrupted") is True
+    )
+
+
+def response_succeeded(response) -> bool:
+    """Derive tool success from an already parsed tool_response."""
+    if not isinstance(response, dict):
+        return True
+    return flags_succeeded({k: response[k] for k in FLAG_KEYS if k in response})
+
+
+def response_hash(response) -> str:
+    """result_hash of an already parsed tool_response: md5 of its JSON text.
+
+    read_hook_event hashes the raw tool_response bytes; this is the same hash
+    for events serialized compactly without ASCII escapes, as Claude Code
+    sends them, so both ingestion paths agree.
+    """
+    text = json.dumps(response, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.md5(text.encode("utf-8")).hexdigest()[:8]
+
+
+def _consume_value(scanner: _Scanner, flags: Optional[Dict] = None) -> Tuple[str, Optional[bytes]]:
+    """Consume one value; returns its first token.
+
+    If flags is given and the value is an object, scalar members listed in
+    FLAG_KEYS at its top level are stored into flags.
+    """
+    kind, raw = scanner.next_token()
+    if kind not in ("{", "["):
+        return kind, raw
+
+    stack = [kind]
+    key = None
+    expecting_key = kind == "{"
+    while stack:
+        token, token_raw = scanner.next_token()
+        at_top = len(stack) == 1 and stack[0] == "{"
+        if token in ("{", "["):
+            stack.append(token)
+        elif token in ("}", "]"):
+            stack.pop()
+        elif not at_top:
+            continue
+        elif token == ",":
+            expecting_key = True
+        elif token == ":":
+            expecting_key = False
+        elif expecting_key and token == "str":
+            key = decode_string(token_raw)
+        elif flags is not None and key in FLAG_KEYS:
+            flags[key] = _parse_scalar(token_raw) if token == "scalar" else decode_string(token_raw)
+    return kind, None
+
+
+def read_hook_event(
+    stream,
+    summary_limit: int = SUMMARY_LIMIT,
+    context_limit: int = CONTEXT_LIMIT
+) -> Dict:
+    """Read a hook event from a binary stream in bounded memory.
+
+    Returns tool, success, result_summary, result_hash (md5 of the full raw
+    tool_response, first 8 hex chars), context and session_id.
+    """
+    scanner = _Scanner(stream, keep=max(summary_limit, context_limit, 256))
+    event = {
+        "tool": "unknown",
+        "success": True,
+        "result_summary": "",
+        "result_hash": hashlib.md5(b"").hexdigest()[:8],
+        "context": "",
+        "session_id": None
+    }
+
+    kind, _ = scanner.next_token()
+    if kind != "{":
+        raise ValueError("Hook input must be a JSON object")
+
+    while True:
+        kind, raw = scanner.next_token()
+        if kind == "}":
+            break
+        if kind == ",":
+            continue
+        if kind != "str":
+            raise ValueError("Malformed hook input")
+        key = decode_string(raw)
+        if scanner.next_token()[0] != ":":
+            raise ValueError("Malformed hook input")
+
+        if key == "tool_response":
+            hasher = hashlib.md5()
+            prefix = _Prefix(summary_limit)
+            flags: Dict = {}
+
+            def tap(chunk: bytes) -> None:
+                hasher.update(chunk)
+                prefix.add(chunk)
+
+            scanner.start_tap(tap)
+            first, first_raw = _consume_value(scanner, flags)
+            scanner.stop_tap()
+
+            event["result_hash"] = hasher.hexdigest()[:8]
+            if first == "str":
+                event["result_summary"] = decode_string(first_raw)[:summary_limit]
+            else:
+                event["result_summary"] = prefix.data.decode("utf-8", "ignore")
+            event["success"] = flags_succeeded(flags)
+
+        elif key == "tool_input":
+            prefix = _Prefix(context_limit)
+            scanner.start_tap(prefix.add)
+            _consume_value(scanner)
+            scanner.stop_tap()
+            event["context"] = "Context: " + prefix.data.decode("utf-8", "ignore")
+
+        elif key in ("tool_name", "session_id"):
+            first, first_raw = _consume_value(scanner)
+            if first == "str":
+                event["tool" if key == "tool_name" else "session_id"] = decode_string(first_raw)
+
+        else:
+            _consume_value(scanner)
+
+    return event
+
+
+def main():
+    event = read_hook_event(sys.stdin.buffer)
+    print(json.dumps(event, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Markdown Index - Headings, code blocks, lists and tables in one pass.
+
+Builds a block index of a Markdown document with 1-based line numbers in a
+single linear scan, so component analysis can ask structural questions
+("how many code examples", "is there a 'When NOT to Use' section") without
+counting raw substrings, which also match inside code fences.
+
+Recognized blocks:
+- ATX headings (# .. ######) with the line range of their section
+- fenced code blocks (``` or ~~~) with language and line span
+- bullet and ordered lists with their item count
+- pipe tables (header row + delimiter row) with column and row counts
+
+Usage:
+  python markdown_index.py <file.md>   - Print the index as JSON
+"""
+
+import bisect
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+_HEADING = re.compile(r"^ {0,3}(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$")
+_LIST_ITEM = re.compile(r"^\s*(?:([-*+])|\d{1,9}[.)])(?:[ \t]|$)")
+_TABLE_DELIMITER = re.compile(r"^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+_LIST_STARTS = frozenset("-*+0123456789")
+
+
+@dataclass
+class Heading:
+    level: int
+    title: str
+    line: int
+    end_line: int  # Last line of the section (before the next heading of the same or higher level)
+
+
+@dataclass
+class CodeBlock:
+    language: str
+    start_line: int
+    end_line: int
+    content: str
+    closed: bool = True
+
+
+@dataclass
+class ListBlock:
+    ordered: bool
+    start_line: int
+    end_line: int
+    items: int
+
+
+@dataclass
+class Table:
+    start_line: int
+    end_line: int
+    columns: int
+    rows: int  # Body rows, without header and delimiter
+
+
+@dataclass
+class MarkdownIndex:
+    headings: List[Heading] = field(default_factory=list)
+    code_blocks: List[CodeBlock] = field(default_factory=list)
+    lists: List[ListBlock] = field(default_factory=list)
+    tables: List[Table] = field(default_factory=list)
+
+    def code_block_at(self, line: int) -> Optional[CodeBlock]:
+        """The fenced code block containing a line (fences included), if any."""
+        starts = self.__dict__.get("_code_starts")
+        if starts is None or len(starts) != len(self.code_blocks):
+            starts = self.__dict__["_code_starts"] = [b.start_line for b in self.code_blocks]
+        i = bisect.bisect_right(starts, line) - 1
+        return self.code_blocks[i] if i >= 0 and line <= self.code_blocks[i].end_line else None
+
+    def in_code(self, line: int) -> bool:
+        return self.code_block_at(line) is not None
+
+
+def index_markdown(lines: List[str], start_line: int = 1) -> MarkdownIndex:
+    """Index lines[start_line - 1:] (e.g. to skip frontmatter); line numbers refer to `lines`."""
+    index = MarkdownIndex()
+    sections: List[Heading] = []
+    fence: Optional[CodeBlock] = None
+    marker = ""
+    current_list: Optional[ListBlock] = None
+    list_gap = False
+    table: Optional[Table] = None
+    last_line = len(lines)
+
+    for number in range(start_line, last_line + 1):
+        line = lines[number - 1]
+
+        if fence is not None:
+            stripped = line.lstrip() if marker in line else ""
+            if stripped.startswith(marker) and not stripped.rstrip().strip(marker[0]):
+                fence.end_line = number
+                fence.content = "\n".join(lines[fence.start_line:number - 1])
+                fence.closed = True
+                fence = None
+            continue
+
+        stripped = line.lstrip()
+        if table is not None:
+            if "|" in line and stripped:
+                table.end_line = number
+                table.rows += 1
+                continue
+            table = None
+
+        # Dispatch on the first character; plain text lines never reach a regex
+        first = stripped[:1]
+        indented = line[:1].isspace()
+        item = _LIST_ITEM.match(line) if first in _LIST_STARTS else None
+        if current_list is not None and list_gap and first and not indented and not item:
+            # After a blank line only indented text or another item continues a list
+            current_list = None
+
+        if (first == "`" or first == "~") and stripped.startswith(first * 3):
+            marker = stripped[:len(stripped) - len(stripped.lstrip(first))]
+            fence = CodeBlock(stripped[len(marker):].strip(), number, last_line, "", closed=False)
+            index.code_blocks.append(fence)
+            if current_list is not None and indented:
+                current_list.end_line = number
+            else:
+                current_list = None
+            continue
+
+        match = _HEADING.match(line) if first == "#" else None
+        if match:
+            level = len(match.group(1))
+            while sections and sections[-1].level >= level:
+                sections.pop().end_line = number - 1
+            heading = Heading(level, match.group(2), number, last_line)
+            sections.append(heading)
+            index.headings.append(heading)
+            current_list = None
+            continue
+
+        if "|" in line and _TABLE_DELIMITER.match(line) and number > start_line and "|" in lines[number - 2]:
+            header = lines[number - 2].strip().strip("|")
+            table = Table(number - 1, number, header.count("|") + 1, 0)
+            index.tables.append(table)
+            current_list = None
+            continue
+
+        if item:
+            ordered = item.group(1) is None
+            if current_list is None or (current_list.ordered != ordered and not indented):
+                current_list = ListBlock(ordered, number, number, 0)
+                index.lists.append(current_list)
+            current_list.items += 1
+            current_list.end_line = number
+            list_gap = False
+        elif not first:
+            list_gap = True
+        elif current_list is not None:
+            current_list.end_line = number
+            list_gap = False
+
+    if fence is not None:
+        # Unclosed fences run to the end of the document
+        fence.content = "\n".join(lines[fence.start_line:])
+        fence.end_line = last_line
+    for heading in sections:
+        heading.end_line = last_line
+    return index
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python markdown_index.py <file.md>")
+        sys.exit(1)
+
+    lines = Path(sys.argv[1]).read_text(encoding="utf-8").split("\n")
+    print(json.dumps(asdict(index_markdown(lines)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -9,10 +9,13 @@ import json
 import sys
 import subprocess
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent))
+from component_document import ComponentDocument, find_main_file
+
 
 @dataclass
 class TestResult:
@@ -25,9 +28,10 @@ class TestResult:
 class SelfTestRunner:
     """Run self-tests for components."""
 
-    def __init__(self, component_path: str):
+    def __init__(self, component_path: str, document: Optional[ComponentDocument] = None):
         self.path = Path(component_path)
         self.results: List[TestResult] = []
+        self.document = document
 
     def run_all_tests(self) -> Dict[str, Any]:
         """Run all applicable tests."""
@@ -108,15 +112,13 @@ class SelfTestRunner:
         """Test content validity."""
         start = datetime.now()
 
-        # Find main file
-        main_file = self._find_main_file()
-        if not main_file:
+        document = self._load_document()
+        if document is None:
             return
-
-        content = main_file.read_text(encoding='utf-8')
+        content = document.text
 
         # Test: Has frontmatter
-        has_frontmatter = content.startswith('---')
+        has_frontmatter = document.has_frontmatter
         self._add_result(
             "has_frontmatter",
             has_frontmatter,
@@ -126,13 +128,7 @@ class SelfTestRunner:
 
         # Test: Frontmatter valid
         if has_frontmatter:
-            try:
-                import yaml
-                parts = content.split('---', 2)
-                yaml.safe_load(parts[1])
-                frontmatter_valid = True
-            except:
-                frontmatter_valid = False
+            frontmatter_valid = document.frontmatter_error is None
 
             self._add_result(
                 "frontmatter_valid",
@@ -173,44 +169,41 @@ class SelfTestRunner:
         """Test quality indicators."""
         start = datetime.now()
 
-        main_file = self._find_main_file()
-        if not main_file:
+        document = self._load_document()
+        if document is None:
             return
-
-        content = main_file.read_text(encoding='utf-8')
-        content_lower = content.lower()
-
         # Test: Has triggers
-        trigger_indicators = ['use when', 'use for', 'trigger', 'activate']
-        has_triggers = any(t in content_lower for t in trigger_indicators)
+        triggers = document.find_phrases(('use when', 'use for', 'trigger', 'activate'))
+        has_triggers = bool(triggers)
         self._add_result(
             "has_triggers",
             has_triggers,
-            f"Trigger phrases {'found' if has_triggers else 'missing'}",
+            f"Trigger phrases {f'found (line {min(triggers.values())})' if has_triggers else 'missing'}",
             start
         )
 
         # Test: Has boundaries
-        boundary_indicators = ['not for', "don't use", 'when not to', 'avoid']
-        has_boundaries = any(b in content_lower for b in boundary_indicators)
+        boundaries = document.find_phrases(('not for', "don't use", 'when not to', 'avoid'))
+        has_boundaries = bool(boundaries)
         self._add_result(
             "has_boundaries",
             has_boundaries,
-            f"Boundary section {'found' if has_boundaries else 'missing'}",
+            f"Boundary section {f'found (line {min(boundaries.values())})' if has_boundaries else 'missing'}",
             start
         )
 
         # Test: Has examples
-        has_examples = '```' in content and content.count('```') >= 2
+        code_blocks = document.code_blocks
+        has_examples = bool(code_blocks)
         self._add_result(
             "has_examples",
             has_examples,
-            f"Code examples {'found' if has_examples else 'missing'}",
+            f"Code examples {f'found ({len(code_blocks)}, first at line {code_blocks[0].start_line})' if has_examples else 'missing'}",
             start
         )
 
         # Test: Line count reasonable
-        lines = len(content.split('\n'))
+        lines = len(document.lines)
         reasonable = lines < 500
         self._add_result(
             "reasonable_length",
@@ -222,11 +215,8 @@ class SelfTestRunner:
         # Test: Third person description
         first_person = ['i ', 'i\'m', 'my ', 'we ', 'our ']
         second_person = ['you ', 'your ', "you're"]
-        try:
-            import yaml
-            parts = content.split('---', 2)
-            frontmatter = yaml.safe_load(parts[1])
-            desc = frontmatter.get('description', '').lower()
+        if document.frontmatter_error is None and isinstance(document.frontmatter_data, dict):
+            desc = document.description.lower()
             has_first_second = any(p in desc for p in first_person + second_person)
             self._add_result(
                 "third_person_desc",
@@ -234,20 +224,15 @@ class SelfTestRunner:
                 f"Description {'uses' if has_first_second else 'avoids'} first/second person",
                 start
             )
-        except:
-            pass
-
-    def _find_main_file(self) -> Path:
-        """Find the main content file."""
-        if self.path.is_file():
-            return self.path
-        if (self.path / "SKILL.md").exists():
-            return self.path / "SKILL.md"
-        # Look for any .md file
-        md_files = list(self.path.glob("*.md"))
-        if md_files:
-            return md_files[0]
-        return None
+
+    def _load_document(self) -> Optional[ComponentDocument]:
+        """The main file's document, read on first use (None without a main file)."""
+        if self.document is None:
+            main_file = find_main_file(self.path) if self.path.exists() else None
+            if main_file is None:
+                return None
+            self.document = ComponentDocument(main_file.read_text(encoding='utf-8'), main_file)
+        return self.document
 
     def _add_result(self, name: str, passed: bool, message: str, start: datetime) -> None:
         """Add a test result."""
@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+Schema Validator - Compiled JSON Schema validation for component files.
+
+Validates frontmatter and JSON configs against knowledge-base/schemas/.
+Each schema is compiled once into a Python function per subschema (type
+checks, enums and regexes inlined, $refs turned into calls), so validating
+a component is a few function calls rather than a walk over the schema.
+
+Compiled validators are cached in-process per schema and persisted as
+marshalled code objects in learned/schema-cache/, keyed by the schema
+content, this compiler's source and the interpreter, so a fresh process
+loads them without parsing or compiling the schema.
+
+Supported keywords (a JSON Schema draft-07 subset): type, enum, const,
+pattern, minLength, maxLength, minimum, maximum, exclusiveMinimum,
+exclusiveMaximum, items, minItems, maxItems, uniqueItems, properties,
+required, patternProperties, additionalProperties, minProperties,
+maxProperties, allOf, anyOf, oneOf, not and local $ref. Annotations
+(description, format, default, examples, ...) are ignored; any other
+validation keyword is a compile error rather than silently skipped.
+
+Errors carry the path of the offending value and, through a YAML node
+walk of the source text, the line it is on.
+
+Usage:
+  python schema_validator.py <schema> <file>     - Validate a JSON file or Markdown frontmatter
+  python schema_validator.py --list              - Schemas and compiled-cache state
+  python schema_validator.py --compile [schema ...]   - Compile and persist validators
+  python schema_validator.py --source <schema>   - Print a schema's generated validator
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+import time
+import yaml
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+sys.path.insert(0, str(Path(__file__).parent))
+from storage import atomic_write_bytes
+
+_UNSUPPORTED = frozenset({
+    "dependencies", "propertyNames", "contains", "additionalItems",
+    "if", "then", "else", "multipleOf",
+})
+
+_TYPE_TESTS = {
+    "object": "isinstance(data, dict)",
+    "array": "isinstance(data, list)",
+    "string": "isinstance(data, str)",
+    "integer": "(isinstance(data, int) and not isinstance(data, bool))",
+    "number": "(isinstance(data, (int, float)) and not isinstance(data, bool))",
+    "boolean": "isinstance(data, bool)",
+    "null": "data is None",
+}
+
+# Runtime helpers shared by every generated module
+_PRELUDE = '''\
+import json
+import re
+
+_NAMES = {dict: "object", list: "array", str: "string", bool: "boolean", int: "integer", float: "number"}
+
+
+def _typename(data):
+    return "null" if data is None else _NAMES.get(type(data), type(data).__name__)
+
+
+def _closest(candidates):
+    # Errors of the alternative that failed least and deepest: the one the data was meant to match
+    return min(candidates, key=lambda sub: (len(sub), -max(len(error[0]) for error in sub)))
+'''
+
+PathPart = Union[str, int]
+
+
+def get_schema_dir() -> Path:
+    """Default schema directory: knowledge-base/schemas under the plugin root."""
+    return Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent)) / "knowledge-base" / "schemas"
+
+
+def get_compiled_dir() -> Path:
+    """Default compiled-validator directory: learned/schema-cache under the plugin root."""
+    return Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent)) / "learned" / "schema-cache"
+
+
+_COMPILER_VERSION: Optional[str] = None
+
+
+def compiler_version() -> str:
+    """Hash of this module's source: any code generation change yields a new version."""
+    global _COMPILER_VERSION
+    if _COMPILER_VERSION is None:
+        _COMPILER_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+    return _COMPILER_VERSION
+
+
+@dataclass
+class SchemaError:
+    path: Tuple[PathPart, ...]  # Keys and indexes from the document root to the offending value
+    keyword: str
+    message: str
+    param: Any = None  # The property for required/additionalProperties, the limit for bounds
+    line: Optional[int] = None
+
+    @property
+    def location(self) -> str:
+        """Dotted path such as hooks.PreToolUse[0].matcher ('(root)' for the document)."""
+        text = ""
+        for part in self.path:
+            text += f"[{part}]" if isinstance(part, int) else (f".{part}" if text else str(part))
+        return text or "(root)"
+
+
+class _Compiler:
+    """Generates the Python source of a validator module for one schema."""
+
+    def __init__(self, schema: Any):
+        self.root = schema
+        self.functions: Dict[str, str] = {}  # JSON pointer -> function name
+        self.pending: List[Tuple[str, Any]] = []
+        self.constants: Dict[str, str] = {}  # repr -> constant name
+        self.out: List[str] = []
+
+    def function(self, pointer: str, schema: Any = None) -> str:
+        """Name of the function validating the subschema at pointer (queued on first use)."""
+        if isinstance(schema, dict) and "$ref" in schema:
+            # draft-07: $ref replaces its siblings, so call the target directly
+            return self.function(schema["$ref"])
+        if pointer not in self.functions:
+            self.functions[pointer] = f"_v{len(self.functions)}"
+            self.pending.append((pointer, self.resolve(pointer) if schema is None else schema))
+        return self.functions[pointer]
+
+    def resolve(self, pointer: str) -> Any:
+        if not pointer.startswith("#"):
+            raise ValueError(f"Only local $ref is supported: {pointer}")
+        node = self.root
+        for part in filter(None, pointer[1:].split("/")):
+            part = part.replace("~1", "/").replace("~0", "~")
+            node = node[int(part)] if isinstance(node, list) else node[part]
+        return node
+
+    def constant(self, source: str) -> str:
+        """Module-level name for an expression evaluated once at load time."""
+        if source not in self.constants:
+            self.constants[source] = f"_c{len(self.constants)}"
+        return self.constants[source]
+
+    def regex(self, pattern: str) -> str:
+        re.compile(pattern)  # Fail at compile time on a bad pattern
+        return self.constant(f"re.compile({pattern!r})")
+
+    def source(self) -> str:
+        entry = self.function("#", self.root)
+        while self.pending:
+            pointer, schema = self.pending.pop(0)
+            body = self.body(pointer, schema) or ["pass"]
+            self.out.append("")
+            self.out.append(f"def {self.functions[pointer]}(data, path, errors):")
+            self.out.extend("    " + line for line in body)
+        constants = [f"{name} = {source}" for source, name in self.constants.items()]
+        return "\n".join([_PRELUDE, *constants, *self.out, "", f"validate = {entry}", ""])
+
+    def body(self, pointer: str, schema: Any) -> List[str]:
+        if schema is True or schema == {}:
+            return []
+        if schema is False:
+            return ["errors.append((path, 'false', 'no value is allowed here', None))"]
+        if not isinstance(schema, dict):
+            raise ValueError(f"{pointer}: a schema must be an object or a boolean")
+        unsupported = _UNSUPPORTED.intersection(schema)
+        if unsupported:
+            raise ValueError(f"{pointer}: unsupported keyword(s) {', '.join(sorted(unsupported))}")
+        if "$ref" in schema:
+            return [f"{self.function(schema['$ref'])}(data, path, errors)"]
+
+        lines: List[str] = []
+        types = schema.get("type")
+        types = [types] if isinstance(types, str) else list(types or [])
+        if types:
+            tests = " or ".join(_TYPE_TESTS[t] for t in types)
+            expected = " or ".join(types)
+            lines += [
+                f"if not ({tests}):",
+                f"    errors.append((path, 'type', 'expected {expected}, got ' + _typename(data), {expected!r}))",
+                "    return",
+            ]
+
+        if "const" in schema:
+            value = schema["const"]
+            const = self.constant(repr(value))
+            lines += [
+                f"if data != {const} or type(data) is not type({const}):",
+                f"    errors.append((path, 'const', {'must be ' + json.dumps(value)!r}, {value!r}))",
+            ]
+        if "enum" in schema:
+            values = schema["enum"]
+            allowed = ", ".join(json.dumps(v) for v in values)
+            if all(isinstance(v, str) for v in values):
+                allowed_set = self.constant(f"frozenset({sorted(values)!r})")
+                test = f"not isinstance(data, str) or data not in {allowed_set}"
+            else:
+                test = f"data not in {self.constant(repr(tuple(values)))}"
+            lines += [
+                f"if {test}:",
+                f"    errors.append((path, 'enum', {'must be one of: ' + allowed!r}, None))",
+            ]
+
+        lines += self.guarded("string", types, self.string_checks(schema))
+        lines += self.guarded("number", types, self.number_checks(schema))
+        lines += self.guarded("array", types, self.array_checks(pointer, schema))
+        lines += self.guarded("object", types, self.object_checks(pointer, schema))
+        lines += self.combinators(pointer, schema)
+        return lines
+
+    @staticmethod
+    def guarded(kind: str, types: List[str], checks: List[str]) -> List[str]:
+        """checks, run only for values of kind (unconditionally if the type check already ensured it)."""
+        if not checks:
+            return []
+        if types == [kind] or (kind == "number" and types == ["integer"]):
+            return checks
+        return [f"if {_TYPE_TESTS[kind]}:", *("    " + line for line in checks)]
+
+    def string_checks(self, schema: Dict[str, Any]) -> List[str]:
+        lines = []
+        if "minLength" in schema:
+            n = schema["minLength"]
+            lines += [f"if len(data) < {n}:",
+                      f"    errors.append((path, 'minLength', 'shorter than {n} characters', {n}))"]
+        if "maxLength" in schema:
+            n = schema["maxLength"]
+            lines += [f"if len(data) > {n}:",
+                      f"    errors.append((path, 'maxLength', 'longer than {n} characters (' + str(len(data)) + ')', {n}))"]
+        if "pattern" in schema:
+            pattern = schema["pattern"]
+            lines += [f"if not {self.regex(pattern)}.search(data):",
+                      f"    errors.append((path, 'pattern', {'does not match ' + pattern!r}, {pattern!r}))"]
+        return lines
+
+    @staticmethod
+    def number_checks(schema: Dict[str, Any]) -> List[str]:
+        lines = []
+        for keyword, op, text in (("minimum", "<", "less than"), ("maximum", ">", "greater than"),
+                                  ("exclusiveMinimum", "<=", "at most"), ("exclusiveMaximum", ">=", "at least")):
+            if keyword in schema:
+                n = schema[keyword]
+                lines += [f"if data {op} {n!r}:",
+                          f"    errors.append((path, '{keyword}', {f'{text} {n}'!r}, {n!r}))"]
+        return lines
+
+    def array_checks(self, pointer: str, schema: Dict[str, Any]) -> List[str]:
+        lines = []
+        if "minItems" in schema:
+            n = schema["minItems"]
+            lines += [f"if len(data) < {n}:",
+                      f"    errors.append((path, 'minItems', 'fewer than {n} items', {n}))"]
+        if "maxItems" in schema:
+            n = schema["maxItems"]
+            lines += [f"if len(data) > {n}:",
+                      f"    errors.append((path, 'maxItems', 'more than {n} items (' + str(len(data)) + ')', {n}))"]
+        if schema.get("uniqueItems"):
+            lines += ["if len({json.dumps(item, sort_keys=True) for item in data}) != len(data):",
+                      "    errors.append((path, 'uniqueItems', 'items are not unique', None))"]
+        items = schema.get("items")
+        if isinstance(items, list):
+            for i, item in enumerate(items):
+                fn = self.function(f"{pointer}/items/{i}", item)
+                lines += [f"if len(data) > {i}:", f"    {fn}(data[{i}], path + ({i},), errors)"]
+        elif items is not None and items is not True and items != {}:
+            fn = self.function(f"{pointer}/items", items)
+            lines += ["for i, item in enumerate(data):", f"    {fn}(item, path + (i,), errors)"]
+        return lines
+
+    def object_checks(self, pointer: str, schema: Dict[str, Any]) -> List[str]:
+        lines = []
+        if "minProperties" in schema:
+            n = schema["minProperties"]
+            lines += [f"if len(data) < {n}:",
+                      f"    errors.append((path, 'minProperties', 'fewer than {n} properties', {n}))"]
+        if "maxProperties" in schema:
+            n = schema["maxProperties"]
+            lines += [f"if len(data) > {n}:",
+                      f"    errors.append((path, 'maxProperties', 'more than {n} properties', {n}))"]
+        for key in schema.get("required", []):
+            lines += [f"if {key!r} not in data:",
+                      f"    errors.append((path, 'required', {f'missing required property {key!r}'!r}, {key!r}))"]
+
+        properties = schema.get("properties", {})
+        for key, subschema in properties.items():
+            if subschema is True or subschema == {}:
+                continue
+            fn = self.function(f"{pointer}/properties/{_escape(key)}", subschema)
+            lines += [f"if {key!r} in data:", f"    {fn}(data[{key!r}], path + ({key!r},), errors)"]
+
+        patterns = [(self.regex(p), self.function(f"{pointer}/patternProperties/{_escape(p)}", s))
+                    for p, s in schema.get("patternProperties", {}).items()]
+        additional = schema.get("additionalProperties", True)
+        closed = additional is not True and additional != {}
+        if not patterns and not closed:
+            return lines
+
+        lines.append("for key, value in data.items():")
+        if patterns:
+            lines.append("    matched = False")
+            for regex, fn in patterns:
+                lines += [f"    if {regex}.search(key):",
+                          f"        {fn}(value, path + (key,), errors)",
+                          "        matched = True"]
+        if closed:
+            known = self.constant(f"frozenset({sorted(properties)!r})")
+            test = f"key not in {known}" + (" and not matched" if patterns else "")
+            if additional is False:
+                action = "errors.append((path + (key,), 'additionalProperties', 'unexpected property ' + repr(key), key))"
+            else:
+                fn = self.function(f"{pointer}/additionalProperties", additional)
+                action = f"{fn}(value, path + (key,), errors)"
+            lines += [f"    if {test}:", f"        {action}"]
+        return lines
+
+    def combinators(self, pointer: str, schema: Dict[str, Any]) -> List[str]:
+        lines = []
+        for i, subschema in enumerate(schema.get("allOf", [])):
+            lines.append(f"{self.function(f'{pointer}/allOf/{i}', subschema)}(data, path, errors)")
+        if "anyOf" in schema:
+            fns = ", ".join(self.function(f"{pointer}/anyOf/{i}", s) for i, s in enumerate(schema["anyOf"]))
+            lines += [
+                "candidates = []",
+                f"for fn in ({fns},):",
+                "    sub = []",
+                "    fn(data, path, sub)",
+                "    if not sub:",
+                "        break",
+                "    candidates.append(sub)",
+                "else:",
+                "    errors.extend(_closest(candidates))",
+            ]
+        if "oneOf" in schema:
+            count = len(schema["oneOf"])
+            fns = ", ".join(self.function(f"{pointer}/oneOf/{i}", s) for i, s in enumerate(schema["oneOf"]))
+            lines += [
+                "candidates = []",
+                f"for fn in ({fns},):",
+                "    sub = []",
+                "    fn(data, path, sub)",
+                "    candidates.append(sub)",
+                "matched = sum(1 for sub in candidates if not sub)",
+                "if matched == 0:",
+                "    errors.extend(_closest(candidates))",
+                "elif matched > 1:",
+                f"    errors.append((path, 'oneOf', 'matches ' + str(matched) + ' of {count} alternatives, expected exactly one', None))",
+            ]
+        if "not" in schema:
+            fn = self.function(f"{pointer}/not", schema["not"])
+            lines += [
+                "sub = []",
+                f"{fn}(data, path, sub)",
+                "if not sub:",
+                "    errors.append((path, 'not', 'matches a disallowed schema', None))",
+            ]
+        return lines
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def compile_schema(schema: Any) -> str:
+    """Python source of a module whose `validate(data, path, errors)` checks data against schema."""
+    return _Compiler(schema).source()
+
+
+class SchemaValidator:
+    """A compiled schema: validate(data) -> errors."""
+
+    def __init__(self, name: str, validate: Callable, source: str):
+        self.name = name
+        self.source = source  # "memory", "disk" or "compiled"
+        self._validate = validate
+
+    def validate(self, data: Any) -> List[SchemaError]:
+        errors: List[tuple] = []
+        self._validate(data, (), errors)
+        return [SchemaError(*error) for error in errors]
+
+
+_VALIDATORS: Dict[Tuple[str, str], SchemaValidator] = {}
+LOAD_STATS = {"memory": 0, "disk": 0, "compiled": 0}
+
+
+def _compiled_file(name: str, schema_bytes: bytes, compiled_dir: Path) -> Path:
+    digest = hashlib.sha256(schema_bytes + compiler_version().encode()).hexdigest()[:16]
+    return compiled_dir / f"{name}-{digest}.{sys.implementation.cache_tag}.bin"
+
+
+def get_validator(name: str, schema_dir: Optional[Path] = None,
+                  compiled_dir: Optional[Path] = None) -> SchemaValidator:
+    """Validator for knowledge-base/schemas/<name>.json, compiled at most once per process.
+
+    The compiled code object is persisted to compiled_dir; later processes
+    load it with marshal instead of parsing and compiling the schema.
+    """
+    schema_dir = Path(schema_dir) if schema_dir else get_schema_dir()
+    key = (str(schema_dir), name)
+    validator = _VALIDATORS.get(key)
+    if validator is not None:
+        LOAD_STATS["memory"] += 1
+        return validator
+
+    schema_bytes = (schema_dir / f"{name}.json").read_bytes()
+    compiled_dir = Path(compiled_dir) if compiled_dir else get_compiled_dir()
+    compiled_file = _compiled_file(name, schema_bytes, compiled_dir)
+    source = "disk"
+    try:
+        code = marshal.loads(compiled_file.read_bytes())
+    except (OSError, ValueError, EOFError, TypeError):
+        source = "compiled"
+        code = compile(compile_schema(json.loads(schema_bytes)), f"<schema {name}>", "exec")
+        try:
+            for stale in compiled_dir.glob(f"{name}-*.{sys.implementation.cache_tag}.bin"):
+                stale.unlink()
+            atomic_write_bytes(compiled_file, marshal.dumps(code))
+        except OSError:
+            pass  # A read-only plugin root still validates, it just recompiles next time
+
+    namespace: Dict[str, Any] = {}
+    exec(code, namespace)
+    LOAD_STATS[source] += 1
+    validator = _VALIDATORS[key] = SchemaValidator(name, namespace["validate"], source)
+    return validator
+
+
+def schema_names(schema_dir: Optional[Path] = None) -> List[str]:
+    schema_dir = Path(schema_dir) if schema_dir else get_schema_dir()
+    return sorted(p.stem for p in schema_dir.glob("*.json"))
+
+
+class SourceMap:
+    """Line numbers of values in a YAML or JSON text, by path.
+
+    The text is composed into YAML nodes (JSON is YAML) on the first lookup
+    only, so valid documents never pay for it.
+    """
+
+    def __init__(self, text: str, first_line: int = 1):
+        self.text = text
+        self.first_line = first_line  # File line of the text's first line
+        self._root: Any = None
+        self._composed = False
+
+    def line(self, path: Tuple[PathPart, ...]) -> Optional[int]:
+        """Line of the value at path, or of its deepest existing ancestor (a key's line for mapping values)."""
+        if not self._composed:
+            self._composed = True
+            try:
+                self._root = yaml.compose(self.text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+            except yaml.YAMLError:
+                self._root = None
+        node = self._root
+        if node is None:
+            return None
+        line = node.start_mark.line
+        for part in path:
+            if isinstance(node, yaml.MappingNode):
+                for key, value in node.value:
+                    if key.value == str(part):
+                        line, node = key.start_mark.line, value
+                        break
+                else:
+                    break
+            elif isinstance(node, yaml.SequenceNode) and isinstance(part, int) and part < len(node.value):
+                node = node.value[part]
+                line = node.start_mark.line
+            else:
+                break
+        return line + self.first_line
+
+
+def validate_text(name: str, data: Any, text: str, first_line: int = 1) -> List[SchemaError]:
+    """Validate data parsed from text, with each error's line in the file."""
+    errors = get_validator(name).validate(data)
+    if errors:
+        source_map = SourceMap(text, first_line)
+        for error in errors:
+            error.line = source_map.line(error.path)
+    return errors
+
+
+def validate_file(name: str, path: Union[str, Path]) -> List[SchemaError]:
+    """Validate a JSON file, or the YAML frontmatter of a Markdown file."""
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix == ".md":
+        parts = text.split("---", 2)
+        if not text.startswith("---") or len(parts) < 3:
+            return [SchemaError((), "frontmatter", "no YAML frontmatter", line=1)]
+        try:
+            data = yaml.safe_load(parts[1])
+        except yaml.YAMLError as e:
+            return [SchemaError((), "frontmatter", f"invalid YAML: {e}", line=1)]
+        return validate_text(name, {} if data is None else data, parts[1])
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        return [SchemaError((), "json", f"invalid JSON: {e.msg}", line=e.lineno)]
+    return validate_text(name, data, text)
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == "--list":
+        compiled_dir = get_compiled_dir()
+        print(json.dumps([
+            {
+                "schema": name,
+                "compiled": _compiled_file(name, (get_schema_dir() / f"{name}.json").read_bytes(),
+                                           compiled_dir).exists()
+            }
+            for name in schema_names()
+        ], indent=2))
+        return
+
+    if args and args[0] == "--compile":
+        results = {}
+        for name in args[1:] or schema_names():
+            start = time.perf_counter()
+            validator = get_validator(name)
+            results[name] = {"source": validator.source, "ms": round((time.perf_counter() - start) * 1000, 2)}
+        print(json.dumps(results, indent=2))
+        return
+
+    if len(args) == 2 and args[0] == "--source":
+        schema = json.loads((get_schema_dir() / f"{args[1]}.json").read_text(encoding="utf-8"))
+        print(compile_schema(schema))
+        return
+
+    if len(args) != 2:
+        print(__doc__.split("Usage:")[1].rstrip())
+        sys.exit(1)
+
+    errors = validate_file(args[0], args[1])
+    print(json.dumps([
+        {"line": e.line, "path": e.location, "keyword": e.keyword, "message": e.message}
+        for e in errors
+    ], indent=2))
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
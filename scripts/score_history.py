@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Score History - Every quality analysis, queryable over time.
+
+analyze_quality.py appends each result to learned/quality-history.db
+(SQLite, WAL mode), keyed by component (resolved path), content hash,
+commit and time:
+
+  components        path, kind
+  runs              one row per analysis: time, commit, content hash, score
+  criterion_scores  per-criterion score of each run (WITHOUT ROWID)
+  latest            most recent run of each component, ordered by score
+
+Queries only touch indexed ranges: a component's runs by time, the runs of
+one commit, or the `latest` table, so they stay in the millisecond range
+over tens of thousands of runs.
+
+Usage:
+  python score_history.py trend <component> [--limit N]   - Score over time
+  python score_history.py regressions <commit_a> <commit_b> - Criteria that dropped from a to b
+  python score_history.py worst [N] [--kind K]            - Lowest latest scores
+  python score_history.py stats
+"""
+
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from storage import LOCK_TIMEOUT, file_lock
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS components (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    component_id INTEGER NOT NULL REFERENCES components(id),
+    ts REAL NOT NULL,
+    commit_sha TEXT,
+    content_hash TEXT,
+    score INTEGER NOT NULL,
+    max_score INTEGER NOT NULL,
+    percentage INTEGER NOT NULL,
+    recommendation TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_component_ts ON runs(component_id, ts);
+CREATE INDEX IF NOT EXISTS idx_runs_commit ON runs(commit_sha, component_id, id);
+CREATE TABLE IF NOT EXISTS criteria (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS criterion_scores (
+    run_id INTEGER NOT NULL,
+    criterion_id INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    max_score INTEGER NOT NULL,
+    PRIMARY KEY (run_id, criterion_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS latest (
+    component_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    percentage INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_latest_percentage ON latest(percentage);
+"""
+
+_COMMIT_PREFIX = re.compile(r"^[0-9a-f]{4,40}$")
+
+
+def get_history_file() -> Path:
+    """Default history database: learned/quality-history.db under the plugin root."""
+    return Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent)) / "learned" / "quality-history.db"
+
+
+def current_commit(path: Optional[str] = None) -> Optional[str]:
+    """HEAD commit of the git repository containing path (None outside git)."""
+    directory = Path(path or ".")
+    if not directory.is_dir():
+        directory = directory.parent
+    try:
+        out = subprocess.run(
+            ["git", "-C", str(directory), "rev-parse", "HEAD"],
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+
+
+class ScoreHistory:
+    """Append-only store of QualityAnalyzer results."""
+
+    def __init__(self, db_file: Optional[Path] = None, timeout: float = LOCK_TIMEOUT):
+        self.db_file = Path(db_file) if db_file else get_history_file()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_file), timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._criterion_ids: Dict[str, int] = {}
+
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Serialize schema creation with other first openers
+            with file_lock(self.db_file):
+                self.conn.executescript(_SCHEMA)
+                self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ScoreHistory":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            self._criterion_ids.clear()
+            raise
+        self.conn.execute("COMMIT")
+
+    def _component_id(self, path: str, kind: Optional[str]) -> int:
+        row = self.conn.execute("SELECT id, kind FROM components WHERE path = ?", (path,)).fetchone()
+        if row:
+            if kind and not row[1]:
+                self.conn.execute("UPDATE components SET kind = ? WHERE id = ?", (kind, row[0]))
+            return row[0]
+        return self.conn.execute("INSERT INTO components (path, kind) VALUES (?, ?)", (path, kind)).lastrowid
+
+    def _criterion_id(self, name: str) -> int:
+        if name not in self._criterion_ids:
+            self.conn.execute("INSERT OR IGNORE INTO criteria (name) VALUES (?)", (name,))
+            self._criterion_ids[name] = self.conn.execute(
+                "SELECT id FROM criteria WHERE name = ?", (name,)
+            ).fetchone()[0]
+        return self._criterion_ids[name]
+
+    def record(self, result: Dict[str, Any], content_hash: Optional[str] = None,
+               commit: Optional[str] = None, ts: Optional[float] = None) -> Optional[int]:
+        """Append one analysis result; returns the run id (None for failed analyses)."""
+        return self.record_many([result], [content_hash or result.get("content_hash")], commit, ts)[0]
+
+    def record_many(self, results: List[Dict[str, Any]], content_hashes: Optional[Iterable[Optional[str]]] = None,
+                    commit: Optional[str] = None, ts: Optional[float] = None) -> List[Optional[int]]:
+        """Append analysis results of one commit in a single transaction.
+
+        Content hashes default to each result's "content_hash".
+        """
+        ts = time.time() if ts is None else ts
+        hashes = list(content_hashes) if content_hashes is not None else [r.get("content_hash") for r in results]
+        run_ids: List[Optional[int]] = []
+        with self.transaction():
+            for result, content_hash in zip(results, hashes):
+                if not result.get("analysis_complete"):
+                    run_ids.append(None)
+                    continue
+                component_id = self._component_id(str(Path(result["component"]).resolve()), result.get("kind"))
+                run_id = self.conn.execute(
+                    "INSERT INTO runs (component_id, ts, commit_sha, content_hash, score, max_score, "
+                    "percentage, recommendation) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (component_id, ts, commit, content_hash, result["total_score"], result["max_possible"],
+                     result["percentage"], result.get("recommendation"))
+                ).lastrowid
+                self.conn.executemany(
+                    "INSERT INTO criterion_scores (run_id, criterion_id, score, max_score) VALUES (?, ?, ?, ?)",
+                    [
+                        (run_id, self._criterion_id(name), c["score"], c["max"])
+                        for name, c in result.get("criteria", {}).items()
+                    ]
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO latest (component_id, run_id, percentage) VALUES (?, ?, ?)",
+                    (component_id, run_id, result["percentage"])
+                )
+                run_ids.append(run_id)
+        return run_ids
+
+    def trend(self, component: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Runs of a component, oldest first (the last `limit` runs if given)."""
+        row = self.conn.execute(
+            "SELECT id FROM components WHERE path = ?", (str(Path(component).resolve()),)
+        ).fetchone()
+        if row is None:
+            return []
+        rows = self.conn.execute(
+            "SELECT ts, commit_sha, content_hash, score, max_score, percentage, recommendation FROM runs "
+            "WHERE component_id = ? ORDER BY ts DESC, id DESC LIMIT ?",
+            (row[0], -1 if limit is None else limit)
+        ).fetchall()
+        return [
+            {
+                "time": _iso(ts), "commit": commit, "content_hash": content_hash, "score": score,
+                "max": max_score, "percentage": percentage, "recommendation": recommendation
+            }
+            for ts, commit, content_hash, score, max_score, percentage, recommendation in reversed(rows)
+        ]
+
+    def resolve_commit(self, ref: str) -> str:
+        """Full recorded commit for a sha prefix, else whatever git resolves ref to."""
+        if _COMMIT_PREFIX.match(ref):
+            matches = [r[0] for r in self.conn.execute(
+                "SELECT DISTINCT commit_sha FROM runs WHERE commit_sha >= ? AND commit_sha < ? LIMIT 2",
+                (ref, ref + "g")
+            )]
+            if len(matches) > 1:
+                raise ValueError(f"Ambiguous commit prefix: {ref}")
+            if matches:
+                return matches[0]
+        out = subprocess.run(["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            raise ValueError(f"Unknown commit: {ref}")
+        return out.stdout.strip()
+
+    def regressions(self, commit_a: str, commit_b: str) -> List[Dict[str, Any]]:
+        """Criteria whose score dropped between the last runs of each component at two commits."""
+        commit_a, commit_b = self.resolve_commit(commit_a), self.resolve_commit(commit_b)
+        rows = self.conn.execute(
+            """
+            WITH a AS (SELECT component_id, MAX(id) AS run_id FROM runs WHERE commit_sha = ? GROUP BY component_id),
+                 b AS (SELECT component_id, MAX(id) AS run_id FROM runs WHERE commit_sha = ? GROUP BY component_id)
+            SELECT c.path, cr.name, sa.score, sb.score, sb.max_score
+            FROM a JOIN b USING (component_id)
+            JOIN components c ON c.id = a.component_id
+            JOIN criterion_scores sa ON sa.run_id = a.run_id
+            JOIN criterion_scores sb ON sb.run_id = b.run_id AND sb.criterion_id = sa.criterion_id
+            JOIN criteria cr ON cr.id = sa.criterion_id
+            WHERE sb.score < sa.score
+            ORDER BY sb.score - sa.score, c.path
+            """,
+            (commit_a, commit_b)
+        ).fetchall()
+        return [
+            {"component": path, "criterion": name, "before": before, "after": after, "max": max_score,
+             "delta": after - before}
+            for path, name, before, after, max_score in rows
+        ]
+
+    def worst(self, n: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Components with the lowest latest score."""
+        rows = self.conn.execute(
+            "SELECT c.path, c.kind, l.percentage, r.ts, r.commit_sha, r.recommendation "
+            "FROM latest l JOIN components c ON c.id = l.component_id JOIN runs r ON r.id = l.run_id "
+            "WHERE ? IS NULL OR c.kind = ? ORDER BY l.percentage, c.path LIMIT ?",
+            (kind, kind, n)
+        ).fetchall()
+        return [
+            {"component": path, "kind": k, "percentage": percentage, "time": _iso(ts), "commit": commit,
+             "recommendation": recommendation}
+            for path, k, percentage, ts, commit, recommendation in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        count = lambda table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        span = self.conn.execute("SELECT MIN(ts), MAX(ts) FROM runs").fetchone()
+        return {
+            "db_file": str(self.db_file),
+            "components": count("components"),
+            "runs": count("runs"),
+            "commits": self.conn.execute("SELECT COUNT(DISTINCT commit_sha) FROM runs").fetchone()[0],
+            "first_run": _iso(span[0]) if span[0] else None,
+            "last_run": _iso(span[1]) if span[1] else None,
+            "bytes": self.db_file.stat().st_size
+        }
+
+
+def _option(args: List[str], name: str) -> Optional[str]:
+    return args[args.index(name) + 1] if name in args[:-1] else None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python score_history.py <trend|regressions|worst|stats> [args]")
+        sys.exit(1)
+
+    action = sys.argv[1]
+    args = sys.argv[2:]
+    positional = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or not args[i - 1].startswith("--"))]
+
+    with ScoreHistory() as history:
+        try:
+            if action == "trend" and positional:
+                limit = _option(args, "--limit")
+                result = history.trend(positional[0], int(limit) if limit else None)
+            elif action == "regressions" and len(positional) >= 2:
+                result = history.regressions(positional[0], positional[1])
+            elif action == "worst":
+                result = history.worst(int(positional[0]) if positional else 10, _option(args, "--kind"))
+            elif action == "stats":
+                result = history.stats()
+            else:
+                print(f"Unknown or incomplete command: {' '.join(sys.argv[1:])}")
+                sys.exit(1)
+        except ValueError as e:
+            print(json.dumps({"error": str(e)}))
+            sys.exit(1)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
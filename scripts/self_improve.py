@@ -13,6 +13,11 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+sys.path.insert(0, str(Path(__file__).parent))
+from pattern_store import open_store, pattern_fingerprint, pattern_key
+from trigger_index import suggest
+from storage import atomic_write_json, locked_json, read_json
+
 
 class SelfImprover:
     """Self-improvement engine for Ultimate Constructor."""
@@ -28,21 +33,35 @@ class SelfImprover:
         self.learned_dir.mkdir(parents=True, exist_ok=True)
         self.improvements_dir.mkdir(parents=True, exist_ok=True)
 
+        self.store = open_store(self.learned_dir)
+
+    def __enter__(self) -> "SelfImprover":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pattern store."""
+        self.store.close()
+
     def load_patterns(self) -> Dict[str, Any]:
-        """Load existing patterns."""
-        if self.patterns_file.exists():
-            return json.loads(self.patterns_file.read_text())
-        return {"patterns": [], "last_updated": None}
+        """Load all patterns in patterns.json format."""
+        data = self.store.to_document()
+        data.setdefault("last_updated", None)
+        return data
 
     def save_patterns(self, data: Dict[str, Any]) -> None:
-        """Save patterns to file."""
+        """Replace the stored patterns with data."""
         data["last_updated"] = datetime.now().isoformat()
-        self.patterns_file.write_text(json.dumps(data, indent=2))
+        self.store.import_document(data, replace=True)
 
     def load_stats(self) -> Dict[str, Any]:
         """Load statistics."""
-        if self.stats_file.exists():
-            return json.loads(self.stats_file.read_text())
+        return read_json(self.stats_file, self._empty_stats)
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
         return {
             "total_components": 0,
             "by_type": {},
@@ -53,32 +72,59 @@ class SelfImprover:
         }
 
     def save_stats(self, data: Dict[str, Any]) -> None:
-        """Save statistics."""
+        """Save statistics (atomic replace)."""
         data["last_updated"] = datetime.now().isoformat()
-        self.stats_file.write_text(json.dumps(data, indent=2))
+        atomic_write_json(self.stats_file, data)
 
     def add_patterns(self, new_patterns: List[Dict]) -> int:
-        """Add new patterns, deduplicating."""
-        data = self.load_patterns()
-        existing_names = {p['name'] for p in data['patterns']}
+        """Add new patterns, merging duplicates by name or content fingerprint.
+
+        Matches for the whole batch are looked up once through the store's
+        name and fingerprint indexes, and every change is written in a single
+        upsert. A merge counts another occurrence, refreshes last_seen, keeps
+        the higher confidence and adds any new triggers.
+        """
+        now = datetime.now().isoformat()
+        fingerprints = [pattern_fingerprint(p) for p in new_patterns]
         added = 0
+        changed: Dict[int, Dict] = {}
+
+        with self.store.transaction():
+            by_name = self.store.find_by('name', [p['name'] for p in new_patterns])
+            by_fingerprint = self.store.find_by('fingerprint', fingerprints)
+
+            for pattern, fingerprint in zip(new_patterns, fingerprints):
+                existing = by_name.get(pattern['name']) or by_fingerprint.get(fingerprint)
+                if existing is None:
+                    # Add with timestamp
+                    pattern['added'] = now
+                    pattern['occurrences'] = pattern.get('occurrences', 1)
+                    pattern['last_seen'] = now
+                    existing = pattern
+                    added += 1
+                else:
+                    existing['occurrences'] = existing.get('occurrences', 1) + pattern.get('occurrences', 1)
+                    existing['last_seen'] = now
+
+                    # Update confidence if higher
+                    if pattern.get('confidence', 0) > existing.get('confidence', 0):
+                        existing['confidence'] = pattern['confidence']
+                        existing['updated'] = now
+
+                    known = existing.get('triggers', [])
+                    new_triggers = [t for t in pattern.get('triggers', []) if t not in known]
+                    if new_triggers:
+                        existing['triggers'] = known + new_triggers
+
+                # Later duplicates in the same batch merge into the same record
+                by_name.setdefault(pattern['name'], existing)
+                if fingerprint:
+                    by_fingerprint.setdefault(fingerprint, existing)
+                changed[id(existing)] = existing
+
+            self.store.upsert(changed.values())
+            self.store.set_meta("last_updated", now)
 
-        for pattern in new_patterns:
-            if pattern['name'] not in existing_names:
-                # Add with timestamp
-                pattern['added'] = datetime.now().isoformat()
-                data['patterns'].append(pattern)
-                existing_names.add(pattern['name'])
-                added += 1
-            else:
-                # Update confidence if higher
-                for existing in data['patterns']:
-                    if existing['name'] == pattern['name']:
-                        if pattern.get('confidence', 0) > existing.get('confidence', 0):
-                            existing['confidence'] = pattern['confidence']
-                            existing['updated'] = datetime.now().isoformat()
-
-        self.save_patterns(data)
         return added
 
     def update_component_stats(
@@ -88,7 +134,17 @@ class SelfImprover:
         first_pass: bool
     ) -> None:
         """Update statistics after component creation."""
-        stats = self.load_stats()
+        with locked_json(self.stats_file, self._empty_stats) as stats:
+            self._apply_component_stats(stats, component_type, score, first_pass)
+
+    def _apply_component_stats(
+        self,
+        stats: Dict[str, Any],
+        component_type: str,
+        score: int,
+        first_pass: bool
+    ) -> None:
+        """Fold one component result into stats in place."""
 
         # Update counts
         stats['total_components'] = stats.get('total_components', 0) + 1
@@ -110,8 +166,7 @@ class SelfImprover:
         stats['first_pass_rate'] = round(
             stats['first_pass_count'] / stats['total_components'] * 100
         ) / 100 if stats['total_components'] > 0 else 0
-
-        self.save_stats(stats)
+        stats["last_updated"] = datetime.now().isoformat()
 
     def log_improvement(
         self,
@@ -168,59 +223,46 @@ class SelfImprover:
 
         return learnings
 
-    def get_pattern_suggestions(self, context: str) -> List[Dict]:
-        """Get relevant patterns for a context."""
-        data = self.load_patterns()
-        relevant = []
+    def get_pattern_suggestions(self, context: str, top_k: Optional[int] = None) -> List[Dict]:
+        """Get relevant patterns for a context.
 
-        context_lower = context.lower()
-        for pattern in data['patterns']:
-            # Check if any triggers match
-            triggers = pattern.get('triggers', [])
-            if any(t.lower() in context_lower for t in triggers):
-                relevant.append(pattern)
-
-        # Sort by confidence
-        return sorted(relevant, key=lambda p: -p.get('confidence', 0))
+        A pattern is relevant if any of its triggers occurs in the context.
+        Uses the store's trigger index (one Aho-Corasick pass over the context)
+        and returns matches sorted by confidence, at most top_k of them.
+        Returned patterns are marked as matched, which protects them from eviction;
+        the stamp is refreshed at most once per decay interval, so lookups rarely write.
+        """
+        suggestions = suggest(self.store, context, top_k)
+        self.store.touch(pattern_key(p) for p in suggestions)
+        return suggestions
 
     def prune_low_confidence(self, threshold: int = 50) -> int:
         """Remove patterns below confidence threshold."""
-        data = self.load_patterns()
-        original_count = len(data['patterns'])
-
-        data['patterns'] = [
-            p for p in data['patterns']
-            if p.get('confidence', 0) >= threshold
-        ]
-
-        removed = original_count - len(data['patterns'])
-        if removed > 0:
-            self.save_patterns(data)
+        with self.store.transaction():
+            removed = self.store.delete_where(max_confidence=threshold)
+            if removed > 0:
+                self.store.set_meta("last_updated", datetime.now().isoformat())
 
         return removed
 
     def get_summary(self) -> Dict[str, Any]:
         """Get summary of learned knowledge."""
-        patterns = self.load_patterns()
         stats = self.load_stats()
 
         # Count patterns by type
         by_type = {}
-        for p in patterns['patterns']:
-            ptype = p.get('type', 'unknown')
-            by_type[ptype] = by_type.get(ptype, 0) + 1
+        for ptype, count in self.store.count_by('type').items():
+            ptype = ptype or 'unknown'
+            by_type[ptype] = by_type.get(ptype, 0) + count
 
         return {
-            "total_patterns": len(patterns['patterns']),
+            "total_patterns": self.store.count(),
             "patterns_by_type": by_type,
-            "high_confidence": len([
-                p for p in patterns['patterns']
-                if p.get('confidence', 0) >= 80
-            ]),
+            "high_confidence": self.store.count(min_confidence=80),
             "total_components": stats.get('total_components', 0),
             "average_score": stats.get('average_score', 0),
             "first_pass_rate": stats.get('first_pass_rate', 0),
-            "last_updated": patterns.get('last_updated')
+            "last_updated": self.store.get_meta('last_updated')
         }
 
 
@@ -230,35 +272,40 @@ def main():
         print("\nCommands:")
         print("  analyze <session_json>  - Analyze session for learnings")
         print("  summary                 - Show learning summary")
-        print("  suggest <context>       - Get pattern suggestions")
+        print("  suggest <context> [--top-k N | --limit N]  - Get pattern suggestions")
         print("  prune [threshold]       - Remove low-confidence patterns")
         sys.exit(1)
 
-    improver = SelfImprover()
     command = sys.argv[1]
 
-    if command == 'analyze':
-        session_data = json.loads(sys.stdin.read() if len(sys.argv) < 3 else sys.argv[2])
-        result = improver.analyze_session(session_data)
-        print(json.dumps(result, indent=2))
-
-    elif command == 'summary':
-        summary = improver.get_summary()
-        print(json.dumps(summary, indent=2))
-
-    elif command == 'suggest':
-        context = sys.argv[2] if len(sys.argv) > 2 else ""
-        suggestions = improver.get_pattern_suggestions(context)
-        print(json.dumps(suggestions, indent=2))
-
-    elif command == 'prune':
-        threshold = int(sys.argv[2]) if len(sys.argv) > 2 else 50
-        removed = improver.prune_low_confidence(threshold)
-        print(f"Removed {removed} patterns below {threshold}% confidence")
-
-    else:
-        print(f"Unknown command: {command}")
-        sys.exit(1)
+    with SelfImprover() as improver:
+        if command == 'analyze':
+            session_data = json.loads(sys.stdin.read() if len(sys.argv) < 3 else sys.argv[2])
+            result = improver.analyze_session(session_data)
+            print(json.dumps(result, indent=2))
+
+        elif command == 'summary':
+            summary = improver.get_summary()
+            print(json.dumps(summary, indent=2))
+
+        elif command == 'suggest':
+            args = sys.argv[2:]
+            context = args[0] if args and not args[0].startswith('--') else ""
+            top_k = None
+            for flag in ('--top-k', '--limit'):
+                if flag in args[:-1]:
+                    top_k = int(args[args.index(flag) + 1])
+            suggestions = improver.get_pattern_suggestions(context, top_k)
+            print(json.dumps(suggestions, indent=2))
+
+        elif command == 'prune':
+            threshold = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+            removed = improver.prune_low_confidence(threshold)
+            print(f"Removed {removed} patterns below {threshold}% confidence")
+
+        else:
+            print(f"Unknown command: {command}")
+            sys.exit(1)
 
 
 if __name__ == '__main__':
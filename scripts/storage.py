@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Storage - Cross-process locking and atomic writes for learned/ data.
+
+learned/patterns.json and the session journals are written by hooks, CLI
+scripts and parallel sub-agents at the same time. Every read-modify-write goes
+through an advisory fcntl lock on a sidecar `<file>.lock`, and every rewrite
+goes to a temp file in the same directory that is fsynced and renamed over the
+target, so readers see either the old or the new file, never a truncated one.
+
+Lock acquisition polls with exponential backoff up to LOCK_TIMEOUT seconds and
+raises LockTimeout after that. Contention is counted in LOCK_STATS.
+
+On platforms without fcntl the lock is a no-op; writes stay atomic.
+
+Usage:
+  python storage.py stats <file>    - Try the lock once and print contention stats
+"""
+
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+LOCK_TIMEOUT = 10.0
+RETRY_INITIAL = 0.001
+RETRY_MAX = 0.05
+
+# Per-process contention metrics
+LOCK_STATS: Dict[str, float] = {
+    "acquired": 0,
+    "contended": 0,
+    "retries": 0,
+    "timeouts": 0,
+    "wait_s_total": 0.0,
+    "wait_s_max": 0.0
+}
+
+PathLike = Union[str, Path]
+
+
+class LockTimeout(TimeoutError):
+    """Raised when a file lock is not acquired within the timeout."""
+
+
+def get_lock_file(path: PathLike) -> Path:
+    """Sidecar lock file for path (the target itself is replaced, so it can't hold the lock)."""
+    path = Path(path)
+    return path.with_name(path.name + ".lock")
+
+
+@contextmanager
+def file_lock(path: PathLike, timeout: float = LOCK_TIMEOUT, shared: bool = False) -> Iterator[None]:
+    """Hold an advisory lock on path for the duration of the block.
+
+    Retries with exponential backoff while another process holds it.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    lock_file = get_lock_file(path)
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+    mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+
+    try:
+        start = time.monotonic()
+        delay = RETRY_INITIAL
+        retries = 0
+        while True:
+            try:
+                fcntl.flock(fd, mode | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                waited = time.monotonic() - start
+                if waited >= timeout:
+                    LOCK_STATS["timeouts"] += 1
+                    raise LockTimeout(f"Timed out after {timeout}s waiting for lock on {path}")
+                retries += 1
+                time.sleep(min(delay, timeout - waited))
+                delay = min(delay * 2, RETRY_MAX)
+
+        waited = time.monotonic() - start
+        LOCK_STATS["acquired"] += 1
+        if retries:
+            LOCK_STATS["contended"] += 1
+            LOCK_STATS["retries"] += retries
+        LOCK_STATS["wait_s_total"] += waited
+        LOCK_STATS["wait_s_max"] = max(LOCK_STATS["wait_s_max"], waited)
+
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+_UMASK: Optional[int] = None
+
+
+def _umask() -> int:
+    """The process umask (read once; os.umask can only be read by setting it)."""
+    global _UMASK
+    if _UMASK is None:
+        _UMASK = os.umask(0)
+        os.umask(_UMASK)
+    return _UMASK
+
+
+def _atomic_replace(path: PathLike, mode: str, data: Any) -> None:
+    """Write data to path via a fsynced temp file and rename."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        # mkstemp creates 0600 files: keep the target's mode, or what open() would give a new file
+        try:
+            file_mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            file_mode = 0o666 & ~_umask()
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, file_mode)
+        else:
+            os.chmod(tmp_name, file_mode)
+        with os.fdopen(fd, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+    # Persist the rename itself
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_text(path: PathLike, text: str) -> None:
+    """Write text to path via a fsynced temp file and rename."""
+    _atomic_replace(path, "w", text)
+
+
+def atomic_write_bytes(path: PathLike, data: bytes) -> None:
+    """Write bytes to path via a fsynced temp file and rename."""
+    _atomic_replace(path, "wb", data)
+
+
+def atomic_write_json(path: PathLike, data: Any, indent: Optional[int] = 2) -> None:
+    """Serialize data and write it atomically."""
+    atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False))
+
+
+def read_json(path: PathLike, default: Optional[Callable[[], Any]] = None) -> Any:
+    """Load JSON from path, or return default() if the file does not exist."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        if default is None:
+            raise
+        return default()
+
+
+@contextmanager
+def locked_json(
+    path: PathLike,
+    default: Optional[Callable[[], Any]] = None,
+    timeout: float = LOCK_TIMEOUT,
+    indent: Optional[int] = 2
+) -> Iterator[Any]:
+    """Read-modify-write a JSON file under an exclusive lock.
+
+    The loaded data is yielded for in-place modification and written back
+    atomically when the block exits without an exception.
+    """
+    with file_lock(path, timeout):
+        data = read_json(path, default)
+        yield data
+        atomic_write_json(path, data, indent)
+
+
+def lock_stats() -> Dict[str, float]:
+    """Snapshot of this process's lock contention metrics."""
+    stats = dict(LOCK_STATS)
+    stats["wait_s_mean"] = stats["wait_s_total"] / stats["acquired"] if stats["acquired"] else 0.0
+    return {k: round(v, 6) if isinstance(v, float) else v for k, v in stats.items()}
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != "stats":
+        print("Usage: python storage.py stats <file>")
+        sys.exit(1)
+
+    try:
+        with file_lock(sys.argv[2], timeout=1.0):
+            pass
+        result = {"lockable": True, "lock_file": str(get_lock_file(sys.argv[2])), **lock_stats()}
+    except LockTimeout as e:
+        result = {"lockable": False, "error": str(e), **lock_stats()}
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tracker Client - Forward hook events to the context tracker daemon.
+
+Called by hooks instead of context_tracker.py so that each tool call only
+pays for a socket round-trip. If the daemon is not running (or Unix sockets
+are unavailable), the event is handled in-process by context_tracker.py.
+
+Kept deliberately small: the hot path imports only os, sys and socket
+(plus hook_input.py for `track --stdin`).
+Requests are NUL-separated fields (session id, then argv); the daemon
+replies with the already formatted JSON output.
+
+Usage:
+  python tracker_client.py track <tool> <result> <success> [context]
+  python tracker_client.py track --stdin [success]   # Hook event JSON on stdin
+  python tracker_client.py confirm <positive/negative/correction> [details]
+  python tracker_client.py goal <description>
+  python tracker_client.py start     # Start the daemon (SessionStart hook)
+  python tracker_client.py stop      # Stop the daemon (Stop hook)
+  python tracker_client.py status
+"""
+
+import os
+import socket
+import sys
+
+FORWARDED_ACTIONS = ("track", "confirm", "goal")
+CONNECT_TIMEOUT = 0.5
+START_WAIT = 2.0
+
+def get_plugin_root() -> str:
+    """Get plugin root directory."""
+    return os.environ.get("CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def get_socket_path() -> str:
+    """Get the daemon socket path for this plugin root.
+
+    Lives in the temp directory because AF_UNIX paths are limited to ~100 bytes.
+    """
+    if os.environ.get("UC_TRACKER_SOCKET"):
+        return os.environ["UC_TRACKER_SOCKET"]
+    import hashlib
+    import tempfile
+    root_hash = hashlib.md5(os.path.realpath(get_plugin_root()).encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"uc-tracker-{root_hash}.sock")
+
+def encode_request(args: list) -> bytes:
+    """Encode a request: session id followed by argv, NUL separated."""
+    fields = [os.environ.get("CLAUDE_SESSION_ID", "")] + list(args)
+    return "\0".join(f.replace("\0", "") for f in fields).encode("utf-8", "surrogateescape")
+
+def decode_request(data: bytes) -> tuple:
+    """Decode a request into (session_id, argv)."""
+    fields = data.decode("utf-8", "surrogateescape").split("\0")
+    return fields[0], fields[1:]
+
+def send_request(args: list, timeout: float = CONNECT_TIMEOUT):
+    """Send one request to the daemon. Returns the reply text, or None if unreachable."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    sock_path = get_socket_path()
+    if not os.path.exists(sock_path):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(sock_path)
+            sock.sendall(encode_request(args))
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+
+    if not chunks:
+        return None
+    return b"".join(chunks).decode("utf-8")
+
+def stdin_track_args(args: list) -> list:
+    """Turn `track --stdin [success]` into plain track args by streaming the hook event.
+
+    Only the bounded summary, context and the result hash are forwarded, so
+    large tool results never travel through argv or the socket.
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from hook_input import read_hook_event
+
+    event = read_hook_event(sys.stdin.buffer)
+    if event["session_id"] and "CLAUDE_SESSION_ID" not in os.environ:
+        os.environ["CLAUDE_SESSION_ID"] = event["session_id"]
+    success = args[2] if len(args) > 2 else ("true" if event["success"] else "false")
+    return [
+        "track", event["tool"], event["result_summary"], success, event["context"],
+        "--result-hash", event["result_hash"]
+    ]
+
+def forward(args: list) -> str:
+    """Forward a tracker command to the daemon, falling back to in-process tracking."""
+    if args[:2] == ["track", "--stdin"]:
+        args = stdin_track_args(args)
+
+    reply = send_request(args)
+    if reply is not None:
+        return reply
+
+    import json
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import context_tracker
+    return json.dumps(context_tracker.run_command(args), indent=2)
+
+def start_daemon() -> dict:
+    """Start the daemon in the background unless it is already running."""
+    import subprocess
+    import time
+
+    if not hasattr(socket, "AF_UNIX"):
+        return {"started": False, "reason": "Unix sockets not supported, using in-process tracking"}
+
+    if send_request(["__ping__"]) is not None:
+        return {"started": False, "running": True, "socket": get_socket_path()}
+
+    daemon_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tracker_daemon.py")
+    subprocess.Popen(
+        [sys.executable, daemon_script, "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+    deadline = time.monotonic() + START_WAIT
+    while time.monotonic() < deadline:
+        if send_request(["__ping__"]) is not None:
+            return {"started": True, "running": True, "socket": get_socket_path()}
+        time.sleep(0.02)
+
+    return {"started": True, "running": False, "socket": get_socket_path()}
+
+def stop_daemon() -> dict:
+    """Ask the daemon to shut down."""
+    return {"stopped": send_request(["__shutdown__"]) is not None}
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: tracker_client.py track <tool> <result> <success> [context] | track --stdin [success] | "
+              "confirm <type> [details] | goal <description> | start | stop | status")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    if action in FORWARDED_ACTIONS:
+        print(forward(sys.argv[1:]))
+        return
+
+    import json
+
+    if action == "start":
+        result = start_daemon()
+    elif action == "stop":
+        result = stop_daemon()
+    elif action == "status":
+        reply = send_request(["__ping__"])
+        result = {"running": reply is not None, "socket": get_socket_path()}
+        if reply:
+            result.update(json.loads(reply))
+    else:
+        result = {"error": f"Unknown action: {action}"}
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
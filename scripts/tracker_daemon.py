@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tracker Daemon - Long-lived context tracker service on a local Unix socket.
+
+Keeps context_tracker.py loaded so PostToolUse hooks don't pay interpreter
+startup and module imports for every tool call, and keeps each session's
+per-tool aggregates current in memory as events arrive (written out as
+snapshots on shutdown). Started by the SessionStart hook and stopped by the
+SessionEnd hook through tracker_client.py (Stop fires after every turn);
+exits on its own after IDLE_TIMEOUT seconds.
+
+Requests are NUL-separated fields (session id, then argv) terminated by EOF.
+Responses are the formatted JSON result of context_tracker.run_command(argv).
+
+Usage:
+  python tracker_daemon.py serve
+"""
+
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import context_tracker
+from tracker_client import FORWARDED_ACTIONS, decode_request, get_socket_path
+
+IDLE_TIMEOUT = 30 * 60
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+def handle_request(session_id: str, argv: List[str], stats: Dict) -> Dict:
+    """Dispatch a single request."""
+    if not argv:
+        return {"error": "Empty request"}
+
+    action = argv[0]
+    if action == "__ping__":
+        return {
+            "pong": True,
+            "pid": os.getpid(),
+            "uptime_s": round(time.monotonic() - stats["started"], 1),
+            "events_handled": stats["events"]
+        }
+    if action not in FORWARDED_ACTIONS:
+        return {"error": f"Action not served by daemon: {action}"}
+
+    # Hooks from different sessions share one daemon; scope each event to its session
+    if session_id:
+        os.environ["CLAUDE_SESSION_ID"] = session_id
+    else:
+        os.environ.pop("CLAUDE_SESSION_ID", None)
+
+    stats["events"] += 1
+    result = context_tracker.run_command(argv)
+    context_tracker.load_aggregates(persist=False)
+    return result
+
+def read_request(conn: socket.socket) -> bytes:
+    """Read one request terminated by EOF."""
+    chunks = []
+    size = 0
+    while size <= MAX_REQUEST_BYTES:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)
+
+def serve() -> None:
+    """Serve requests until shutdown or idle timeout."""
+    sock_path = Path(get_socket_path())
+
+    # Remove a stale socket left behind by a crashed daemon
+    if sock_path.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(sock_path))
+            probe.close()
+            print(json.dumps({"error": "Daemon already running", "socket": str(sock_path)}))
+            sys.exit(1)
+        except OSError:
+            probe.close()
+            sock_path.unlink()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # The socket is created owner-only, never briefly world-accessible
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(str(sock_path))
+    finally:
+        os.umask(old_umask)
+    os.chmod(sock_path, 0o600)
+    server.listen(64)
+    server.settimeout(IDLE_TIMEOUT)
+
+    stats = {"started": time.monotonic(), "events": 0}
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+
+            with conn:
+                conn.settimeout(5)
+                try:
+                    session_id, argv = decode_request(read_request(conn))
+                    if argv[:1] == ["__shutdown__"]:
+                        conn.sendall(json.dumps({"shutdown": True}).encode("utf-8"))
+                        break
+                    response = handle_request(session_id, argv, stats)
+                except Exception as e:
+                    response = {"error": str(e)}
+                try:
+                    conn.sendall(json.dumps(response, indent=2).encode("utf-8"))
+                except OSError:
+                    pass
+    finally:
+        server.close()
+        context_tracker.save_cached_aggregates()
+        try:
+            sock_path.unlink()
+        except FileNotFoundError:
+            pass
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != "serve":
+        print(json.dumps({"error": "Action required", "usage": "serve"}, indent=2))
+        sys.exit(1)
+
+    if not hasattr(socket, "AF_UNIX"):
+        print(json.dumps({"error": "Unix sockets not supported on this platform"}))
+        sys.exit(1)
+
+    serve()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Trigger Index - Match a context against every stored pattern trigger in one pass.
+
+The pattern store keeps an inverted index from normalized trigger strings to
+pattern keys (updated incrementally on every upsert/delete). This module
+compiles the distinct triggers into an Aho-Corasick automaton, so finding all
+triggers that occur in a context costs O(len(context) + matches) instead of
+one substring test per pattern per trigger.
+
+The compiled matcher is cached per store and rebuilt only when the store's
+trigger version changes.
+
+Usage:
+  python trigger_index.py match <context> [--top-k N]   - Ranked suggestions for a context
+  python trigger_index.py stats                         - Index size and build time
+"""
+
+import heapq
+import json
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from pattern_store import PatternStore, normalize_trigger, open_store
+
+# store location -> (trigger version, matcher)
+_MATCHER_CACHE: Dict[str, Tuple[str, "TriggerMatcher"]] = {}
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher (Aho-Corasick automaton over characters)."""
+
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = list(dict.fromkeys(w for w in words if w))
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+        # Nearest state on the fail chain that has output (0 = none)
+        self.output_link: List[int] = [0]
+
+        for index, word in enumerate(self.words):
+            state = 0
+            for char in word:
+                nxt = self.goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][char] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.output_link.append(0)
+                state = nxt
+            self.output[state].append(index)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.output_link[nxt] = target if self.output[target] else self.output_link[target]
+
+    def search(self, text: str) -> Set[int]:
+        """Indices of all words occurring in text."""
+        found: Set[int] = set()
+        visited: Set[int] = set()
+        goto, fail, output, output_link = self.goto, self.fail, self.output, self.output_link
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            # Each output chain only needs to be walked once per search
+            emit = state if output[state] else output_link[state]
+            while emit and emit not in visited:
+                visited.add(emit)
+                found.update(output[emit])
+                emit = output_link[emit]
+        return found
+
+
+class TriggerMatcher:
+    """Compiled trigger index: context -> matching pattern keys."""
+
+    def __init__(self, trigger_map: Dict[str, List[str]]):
+        self.triggers = list(trigger_map)
+        self.keys = [trigger_map[t] for t in self.triggers]
+        start = time.perf_counter()
+        self.automaton = AhoCorasick(self.triggers)
+        self.build_s = time.perf_counter() - start
+
+    def match(self, context: str) -> Set[str]:
+        keys: Set[str] = set()
+        for index in self.automaton.search(normalize_trigger(context)):
+            keys.update(self.keys[index])
+        return keys
+
+
+def get_matcher(store: PatternStore) -> TriggerMatcher:
+    """Cached matcher for a store, rebuilt when its triggers changed."""
+    version = store.trigger_version()
+    cached = _MATCHER_CACHE.get(store.location)
+    if cached and cached[0] == version:
+        return cached[1]
+    matcher = TriggerMatcher(store.trigger_map())
+    _MATCHER_CACHE[store.location] = (version, matcher)
+    return matcher
+
+
+def suggest(store: PatternStore, context: str, top_k: Optional[int] = None) -> List[Dict]:
+    """Patterns with a trigger occurring in context, highest confidence first.
+
+    Ties keep store order. With top_k, only the k best are selected (heap).
+    """
+    patterns = store.get_many(get_matcher(store).match(context))
+    ranked = ((-(p.get("confidence") or 0), order, p) for order, p in enumerate(patterns))
+    if top_k is not None:
+        return [p for _, _, p in heapq.nsmallest(top_k, ranked, key=lambda item: item[:2])]
+    return [p for _, _, p in sorted(ranked, key=lambda item: item[:2])]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python trigger_index.py <match <context> [--top-k N] | stats>")
+        sys.exit(1)
+
+    action = sys.argv[1]
+
+    with open_store() as store:
+        if action == "match":
+            args = sys.argv[2:]
+            top_k = int(args[args.index("--top-k") + 1]) if "--top-k" in args[:-1] else None
+            context = args[0] if args and not args[0].startswith("--") else ""
+            result = suggest(store, context, top_k)
+        elif action == "stats":
+            matcher = get_matcher(store)
+            result = {
+                "backend": store.backend,
+                "distinct_triggers": len(matcher.triggers),
+                "indexed_patterns": len({k for keys in matcher.keys for k in keys}),
+                "automaton_states": len(matcher.automaton.goto),
+                "build_ms": round(matcher.build_s * 1000, 2)
+            }
+        else:
+            result = {"error": f"Unknown action: {action}"}
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,9 @@ import os
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+from pattern_store import open_store
+
 def get_learned_dir(component_name: str) -> Path:
     """Get the learned directory for a component."""
     # Try to find component in NEW/skills/
@@ -30,24 +33,21 @@ def get_learned_dir(component_name: str) -> Path:
     return learned_dir
 
 def load_patterns(learned_dir: Path) -> dict:
-    """Load existing patterns."""
-    patterns_file = learned_dir / "patterns.json"
-    if patterns_file.exists():
-        with open(patterns_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"patterns": [], "last_updated": None}
+    """Load existing patterns (patterns.json format)."""
+    with open_store(learned_dir) as store:
+        data = store.to_document()
+    data.setdefault("last_updated", None)
+    return data
 
 def save_patterns(learned_dir: Path, data: dict):
-    """Save patterns to file."""
-    patterns_file = learned_dir / "patterns.json"
+    """Replace the stored patterns with data."""
     data["last_updated"] = datetime.now().isoformat()
-    with open(patterns_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    with open_store(learned_dir) as store:
+        store.import_document(data, replace=True)
 
 def record_edit(component_name: str, context: dict = None):
     """Record that an edit was made for learning purposes."""
     learned_dir = get_learned_dir(component_name)
-    data = load_patterns(learned_dir)
 
     # Add edit event
     edit_event = {
@@ -59,15 +59,14 @@ def record_edit(component_name: str, context: dict = None):
     if context:
         edit_event["context"] = context
 
-    if "edit_history" not in data:
-        data["edit_history"] = []
-
-    data["edit_history"].append(edit_event)
-
-    # Keep only last 100 edits
-    data["edit_history"] = data["edit_history"][-100:]
+    # Only the edit history is touched; patterns are not loaded
+    with open_store(learned_dir) as store, store.transaction():
+        edit_history = store.get_meta("edit_history", [])
+        edit_history.append(edit_event)
 
-    save_patterns(learned_dir, data)
+        # Keep only last 100 edits
+        store.set_meta("edit_history", edit_history[-100:])
+        store.set_meta("last_updated", datetime.now().isoformat())
 
     return {"status": "recorded", "component": component_name}
 
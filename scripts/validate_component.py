@@ -5,19 +5,29 @@ Component Validator - Validate Claude Code component structure and content.
 Validates:
 - Skills (SKILL.md)
 - Agents (.md files)
-- Plugins (plugin.json)
+- Commands (.md files in a commands/ directory)
+- Plugins (plugin.json, plus the hooks, MCP and LSP configs it uses)
 - Hooks (hooks.json)
+
+Frontmatter and JSON configs are checked against the compiled schemas in
+knowledge-base/schemas/ (see schema_validator.py), and every schema issue
+carries the line of the offending value. Checks the schemas cannot express
+(description detail, boundaries, examples, fields this plugin requires
+beyond the schema) are done here.
 """
 
 import json
 import re
 import sys
-import yaml
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Any, List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).parent))
+from component_document import ComponentDocument
+from schema_validator import SchemaError, SourceMap, validate_text
+
 
 class Severity(Enum):
     ERROR = "ERROR"
@@ -35,13 +45,41 @@ class Issue:
     suggestion: Optional[str] = None
 
 
+# Schema errors reported under the validator's established issue codes: (keyword, path) -> code
+_SCHEMA_CODES = {
+    ("pattern", ("name",)): "INVALID_NAME",
+    ("maxLength", ("name",)): "NAME_TOO_LONG",
+    ("maxLength", ("description",)): "DESC_TOO_LONG",
+    ("pattern", ("version",)): "INVALID_VERSION",
+}
+
+_SUGGESTIONS = {
+    "INVALID_NAME": "Use format: my-component-name",
+    "MISSING_HOOKS": "Plugin hooks.json requires {\"hooks\": {...}}",
+}
+
+# Configs a plugin may use: manifest key, schema, default location
+_PLUGIN_CONFIGS = [
+    ("hooks", "hooks-config", "hooks/hooks.json"),
+    ("mcpServers", "mcp-config", ".mcp.json"),
+    ("lspServers", "lsp-config", ".lsp.json"),
+]
+
+
+def _value_at(data: Any, path: Tuple) -> Any:
+    for part in path:
+        data = data[part]
+    return data
+
+
 class ComponentValidator:
     """Validate Claude Code components."""
 
-    def __init__(self, component_path: str):
+    def __init__(self, component_path: str, document: Optional[ComponentDocument] = None):
         self.path = Path(component_path)
         self.issues: List[Issue] = []
         self.component_type: Optional[str] = None
+        self.document = document
 
     def validate(self) -> Tuple[int, List[Issue]]:
         """Run all validations and return score with issues."""
@@ -51,6 +89,8 @@ class ComponentValidator:
             self._validate_skill()
         elif self.component_type == "agent":
             self._validate_agent()
+        elif self.component_type == "command":
+            self._validate_command()
         elif self.component_type == "plugin":
             self._validate_plugin()
         elif self.component_type == "hooks":
@@ -65,13 +105,19 @@ class ComponentValidator:
 
         return self._calculate_score(), self.issues
 
+    def _load_document(self, main_file: Path) -> ComponentDocument:
+        """The main file's document, unless a parsed one was given."""
+        if self.document is None:
+            self.document = ComponentDocument(main_file.read_text(encoding='utf-8'), main_file)
+        return self.document
+
     def _detect_type(self) -> None:
         """Detect component type from structure."""
         if self.path.is_file():
             if self.path.suffix == '.json':
                 self.component_type = "hooks"
             elif self.path.suffix == '.md':
-                self.component_type = "agent"
+                self.component_type = "command" if self.path.parent.name == "commands" else "agent"
         elif self.path.is_dir():
             if (self.path / "SKILL.md").exists():
                 self.component_type = "skill"
@@ -91,9 +137,9 @@ class ComponentValidator:
             ))
             return
 
-        content = skill_md.read_text(encoding='utf-8')
-        self._validate_frontmatter(content, str(skill_md))
-        self._validate_skill_content(content, str(skill_md))
+        document = self._load_document(skill_md)
+        self._validate_frontmatter(document, str(skill_md), "skill-frontmatter")
+        self._validate_skill_content(document, str(skill_md))
 
     def _validate_agent(self) -> None:
         """Validate agent file."""
@@ -104,9 +150,20 @@ class ComponentValidator:
             ))
             return
 
-        content = self.path.read_text(encoding='utf-8')
-        self._validate_frontmatter(content, str(self.path))
-        self._validate_agent_content(content, str(self.path))
+        document = self._load_document(self.path)
+        self._validate_frontmatter(document, str(self.path), "agent-frontmatter")
+        self._validate_agent_content(document, str(self.path))
+
+    def _validate_command(self) -> None:
+        """Validate slash command file."""
+        if not self.path.exists():
+            self.issues.append(Issue(
+                Severity.ERROR, "MISSING_FILE",
+                "Command file not found", str(self.path)
+            ))
+            return
+
+        self._validate_frontmatter(self._load_document(self.path), str(self.path), "command-frontmatter")
 
     def _validate_plugin(self) -> None:
         """Validate plugin structure."""
@@ -121,14 +178,15 @@ class ComponentValidator:
             ))
             return
 
-        try:
-            manifest = json.loads(plugin_json.read_text())
-            self._validate_plugin_manifest(manifest, str(plugin_json))
-        except json.JSONDecodeError as e:
-            self.issues.append(Issue(
-                Severity.ERROR, "INVALID_JSON",
-                f"Invalid JSON: {e}", str(plugin_json)
-            ))
+        manifest = self._validate_json(plugin_json, "plugin-manifest")
+        if not isinstance(manifest, dict):
+            return
+        self._validate_plugin_manifest(manifest, str(plugin_json))
+
+        for key, schema, default in _PLUGIN_CONFIGS:
+            location = manifest.get(key, default)
+            if isinstance(location, str) and (self.path / location).is_file():
+                self._validate_json(self.path / location, schema)
 
     def _validate_hooks(self) -> None:
         """Validate hooks configuration."""
@@ -139,165 +197,165 @@ class ComponentValidator:
             ))
             return
 
+        self._validate_json(self.path, "hooks-config")
+
+    def _validate_json(self, path: Path, schema: str) -> Any:
+        """Parse a JSON config and check it against a schema; the data, or None if it does not parse."""
+        text = path.read_text(encoding='utf-8')
         try:
-            config = json.loads(self.path.read_text())
-            self._validate_hooks_config(config, str(self.path))
+            data = json.loads(text)
         except json.JSONDecodeError as e:
             self.issues.append(Issue(
                 Severity.ERROR, "INVALID_JSON",
-                f"Invalid JSON: {e}", str(self.path)
+                f"Invalid JSON: {e}", str(path), line=e.lineno
             ))
-
-    def _validate_frontmatter(self, content: str, file: str) -> None:
-        """Validate YAML frontmatter."""
-        if not content.startswith('---'):
+            return None
+        self._add_schema_issues(validate_text(schema, data, text), data, str(path))
+        return data
+
+    def _add_schema_issues(self, errors: List[SchemaError], data: Any, file: str) -> None:
+        """Report schema errors, under the established issue codes where there is one."""
+        for error in errors:
+            severity = Severity.ERROR
+            code = _SCHEMA_CODES.get((error.keyword, error.path), f"SCHEMA_{error.keyword.upper()}")
+            message = f"{error.location}: {error.message}"
+            if error.keyword == "required":
+                field = error.param if not error.path else f"{error.location}.{error.param}"
+                code = f"MISSING_{error.param.upper().replace('-', '_')}" if not error.path else "MISSING_FIELD"
+                message = f"Missing required field: {field}"
+            elif error.keyword == "additionalProperties":
+                # Unknown keys are ignored by Claude Code, so they only warn
+                severity = Severity.WARNING
+                if error.path[:-1] == ("hooks",):
+                    code, message = "UNKNOWN_EVENT", f"Unknown hook event: {error.param}"
+                else:
+                    code, message = "UNKNOWN_FIELD", f"Unknown field: {error.location}"
+            elif code == "INVALID_NAME":
+                message = f"Name must be lowercase with hyphens: {_value_at(data, error.path)}"
+            elif code in ("NAME_TOO_LONG", "DESC_TOO_LONG"):
+                field = "Name" if code == "NAME_TOO_LONG" else "Description"
+                message = f"{field} exceeds {error.param} characters: {len(_value_at(data, error.path))}"
+            elif code == "INVALID_VERSION":
+                message = f"Version must be semantic (e.g., 1.0.0): {_value_at(data, error.path)}"
+            # Errors about an empty document have no node to point at: use its first line
+            self.issues.append(Issue(severity, code, message, file, error.line or 1, _SUGGESTIONS.get(code)))
+
+    def _reported(self, code: str, file: str) -> bool:
+        return any(i.code == code and i.file == file for i in self.issues)
+
+    def _validate_frontmatter(self, document: ComponentDocument, file: str, schema: str) -> None:
+        """Validate YAML frontmatter against the component type's schema."""
+        if not document.has_frontmatter:
             self.issues.append(Issue(
                 Severity.ERROR, "MISSING_FRONTMATTER",
-                "File must start with YAML frontmatter (---)", file
+                "File must start with YAML frontmatter (---)", file, line=1
             ))
             return
 
-        try:
-            parts = content.split('---', 2)
-            if len(parts) < 3:
-                raise ValueError("Incomplete frontmatter")
-            frontmatter = yaml.safe_load(parts[1])
-        except Exception as e:
+        error = ValueError("Incomplete frontmatter") if len(document.parts) < 3 else document.frontmatter_error
+        if error is not None:
+            mark = getattr(error, "problem_mark", None)
             self.issues.append(Issue(
                 Severity.ERROR, "INVALID_FRONTMATTER",
-                f"Invalid YAML: {e}", file
+                f"Invalid YAML: {error}", file, mark.line + 1 if mark else 1
             ))
             return
+        data = document.frontmatter_data
+        self._add_schema_issues(validate_text(schema, {} if data is None else data, document.parts[1]), data, file)
+        if not isinstance(data, dict) and data is not None:
+            return
+        frontmatter = document.frontmatter
+        source_map = SourceMap(document.parts[1])
 
-        # Required fields
-        if 'name' not in frontmatter:
+        # Beyond the schemas: every component is referred to by name, and
+        # descriptions are how Claude decides when to use it
+        name = frontmatter.get('name')
+        if 'name' not in frontmatter and not self._reported("MISSING_NAME", file):
             self.issues.append(Issue(
                 Severity.ERROR, "MISSING_NAME",
-                "Missing required field: name", file
+                "Missing required field: name", file, source_map.line(()) or 1
             ))
-        else:
-            name = frontmatter['name']
-            if not re.match(r'^[a-z0-9-]+$', name):
+        elif isinstance(name, str):
+            if not re.match(r'^[a-z0-9-]+$', name) and not self._reported("INVALID_NAME", file):
                 self.issues.append(Issue(
                     Severity.ERROR, "INVALID_NAME",
-                    f"Name must be lowercase with hyphens: {name}", file,
+                    f"Name must be lowercase with hyphens: {name}", file, source_map.line(("name",)),
                     suggestion="Use format: my-component-name"
                 ))
-            if len(name) > 64:
+            if len(name) > 64 and not self._reported("NAME_TOO_LONG", file):
                 self.issues.append(Issue(
                     Severity.ERROR, "NAME_TOO_LONG",
-                    f"Name exceeds 64 characters: {len(name)}", file
+                    f"Name exceeds 64 characters: {len(name)}", file, source_map.line(("name",))
                 ))
-
-        if 'description' not in frontmatter:
-            self.issues.append(Issue(
-                Severity.ERROR, "MISSING_DESCRIPTION",
-                "Missing required field: description", file
-            ))
-        else:
-            desc = frontmatter['description']
-            if len(desc) > 1024:
+        desc = frontmatter.get('description')
+        if isinstance(desc, str):
+            if len(desc) > 1024 and not self._reported("DESC_TOO_LONG", file):
                 self.issues.append(Issue(
                     Severity.ERROR, "DESC_TOO_LONG",
-                    f"Description exceeds 1024 characters: {len(desc)}", file
+                    f"Description exceeds 1024 characters: {len(desc)}", file, source_map.line(("description",))
                 ))
             if len(desc) < 20:
                 self.issues.append(Issue(
                     Severity.WARNING, "DESC_TOO_SHORT",
-                    "Description should be more detailed", file,
+                    "Description should be more detailed", file, source_map.line(("description",)),
                     suggestion="Include what, when to use, and boundaries"
                 ))
 
-    def _validate_skill_content(self, content: str, file: str) -> None:
+    def _validate_skill_content(self, document: ComponentDocument, file: str) -> None:
         """Validate skill-specific content."""
-        lines = content.split('\n')
+        lines = document.lines
 
         # Line count
         if len(lines) > 500:
             self.issues.append(Issue(
                 Severity.WARNING, "TOO_LONG",
-                f"SKILL.md is {len(lines)} lines (max 500)", file,
+                f"SKILL.md is {len(lines)} lines (max 500)", file, line=501,
                 suggestion="Move detailed content to references/"
             ))
 
         # Check for boundaries
-        content_lower = content.lower()
-        if 'not for' not in content_lower and "don't" not in content_lower:
+        if not document.find_phrases(('not for', "don't")):
             self.issues.append(Issue(
                 Severity.WARNING, "MISSING_BOUNDARIES",
-                "No boundaries section found", file,
+                "No boundaries section found", file, line=1,
                 suggestion="Add 'NOT for:' or 'When NOT to Use' section"
             ))
 
         # Check for examples
-        if '```' not in content or content.count('```') < 2:
+        if not document.code_blocks:
             self.issues.append(Issue(
                 Severity.INFO, "MISSING_EXAMPLES",
-                "No code examples found", file,
+                "No code examples found", file, line=1,
                 suggestion="Add working examples in code blocks"
             ))
 
-    def _validate_agent_content(self, content: str, file: str) -> None:
+    def _validate_agent_content(self, document: ComponentDocument, file: str) -> None:
         """Validate agent-specific content."""
-        try:
-            parts = content.split('---', 2)
-            frontmatter = yaml.safe_load(parts[1])
-        except:
+        if document.frontmatter_error is not None:
             return
+        frontmatter = document.frontmatter
 
         # Check for tools field
         if 'tools' not in frontmatter:
             self.issues.append(Issue(
                 Severity.INFO, "NO_TOOLS",
-                "No tools specified (will inherit all)", file
+                "No tools specified (will inherit all)", file, line=1
             ))
 
         # Check for model
         if 'model' not in frontmatter:
             self.issues.append(Issue(
                 Severity.INFO, "NO_MODEL",
-                "No model specified (will inherit)", file
+                "No model specified (will inherit)", file, line=1
             ))
 
     def _validate_plugin_manifest(self, manifest: Dict, file: str) -> None:
-        """Validate plugin manifest."""
-        required = ['name', 'version', 'description']
-        for field in required:
+        """Fields the manifest schema leaves optional but a published plugin needs."""
+        for field in ['version', 'description']:
             if field not in manifest:
                 self.issues.append(Issue(
                     Severity.ERROR, f"MISSING_{field.upper()}",
-                    f"Missing required field: {field}", file
-                ))
-
-        # Version format
-        if 'version' in manifest:
-            if not re.match(r'^\d+\.\d+\.\d+', manifest['version']):
-                self.issues.append(Issue(
-                    Severity.ERROR, "INVALID_VERSION",
-                    "Version must be semantic (e.g., 1.0.0)", file
-                ))
-
-    def _validate_hooks_config(self, config: Dict, file: str) -> None:
-        """Validate hooks configuration."""
-        if 'hooks' not in config:
-            self.issues.append(Issue(
-                Severity.ERROR, "MISSING_HOOKS",
-                "Missing 'hooks' wrapper object", file,
-                suggestion="Plugin hooks.json requires {\"hooks\": {...}}"
-            ))
-            return
-
-        valid_events = [
-            'PreToolUse', 'PostToolUse', 'Stop', 'SubagentStop',
-            'UserPromptSubmit', 'SessionStart', 'SessionEnd',
-            'PreCompact', 'Notification'
-        ]
-
-        for event in config['hooks']:
-            if event not in valid_events:
-                self.issues.append(Issue(
-                    Severity.WARNING, "UNKNOWN_EVENT",
-                    f"Unknown hook event: {event}", file
+                    f"Missing required field: {field}", file, line=1
                 ))
 
     def _calculate_score(self) -> int:
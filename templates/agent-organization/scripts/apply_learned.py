@@ -20,6 +20,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
+sys.path.insert(0, str(Path(__file__).parent))
+from pattern_store import open_store
+from storage import locked_json, read_json
+
 MIN_CONFIDENCE_AUTO = 0.9
 MIN_CONFIDENCE_MANUAL = 0.7
 SESSIONS_BETWEEN_REVIEWS = 5
@@ -29,27 +33,19 @@ def get_component_root() -> Path:
     return Path(os.environ.get("COMPONENT_ROOT", Path(__file__).parent.parent))
 
 def load_patterns() -> Dict:
-    """Load learned patterns."""
-    patterns_file = get_component_root() / "learned" / "patterns.json"
-    if patterns_file.exists():
-        with open(patterns_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"patterns": [], "learning_stats": {"total_sessions": 0}}
+    """Load learned patterns (patterns.json format)."""
+    with open_store(get_component_root() / "learned") as store:
+        data = store.to_document()
+    data.setdefault("learning_stats", {"total_sessions": 0})
+    return data
 
 def load_applied() -> Dict:
     """Load applied improvements log."""
-    applied_file = get_component_root() / "learned" / "applied-improvements.json"
-    if applied_file.exists():
-        with open(applied_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"applied": [], "last_review": None}
+    return read_json(get_component_root() / "learned" / "applied-improvements.json", empty_applied)
 
-def save_applied(data: Dict):
-    """Save applied improvements log."""
-    applied_file = get_component_root() / "learned" / "applied-improvements.json"
-    applied_file.parent.mkdir(exist_ok=True)
-    with open(applied_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def empty_applied() -> Dict:
+    """Empty applied-improvements.json contents."""
+    return {"applied": [], "last_review": None}
 
 def get_applicable_patterns(patterns: List[Dict], min_confidence: float) -> List[Dict]:
     """Filter patterns by confidence."""
@@ -124,39 +120,43 @@ def preview_improvements() -> Dict:
     }
 
 def apply_improvements(auto: bool = False) -> Dict:
-    """Apply improvements to component."""
-    data = load_patterns()
-    applied_log = load_applied()
-
-    min_conf = MIN_CONFIDENCE_AUTO if auto else MIN_CONFIDENCE_MANUAL
-    patterns = get_applicable_patterns(data.get("patterns", []), min_conf)
-
-    applied_count = 0
-    failed_count = 0
-
-    for pattern in patterns:
-        try:
-            applied_log["applied"].append({
-                "pattern_id": pattern.get("id", f"p-{len(applied_log['applied'])}"),
-                "type": pattern.get("type"),
-                "description": pattern.get("description"),
-                "applied_at": datetime.now().isoformat(),
-                "component": "{{agent_name}}",
-                "success": True
-            })
-
-            pattern["applied"] = True
-            applied_count += 1
-
-        except Exception:
-            failed_count += 1
-
-    applied_log["last_review"] = datetime.now().isoformat()
-    save_applied(applied_log)
-
-    patterns_file = get_component_root() / "learned" / "patterns.json"
-    with open(patterns_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    """Apply improvements to component.
+
+    The pattern query, the applied flags and the applied-improvements log
+    are updated under the store's write transaction and the log's lock, so a
+    concurrent learner's update cannot be overwritten in between.
+    """
+    learned_dir = get_component_root() / "learned"
+    learned_dir.mkdir(parents=True, exist_ok=True)
+    with open_store(learned_dir) as store, store.transaction(), \
+            locked_json(learned_dir / "applied-improvements.json", empty_applied) as applied_log:
+        min_conf = MIN_CONFIDENCE_AUTO if auto else MIN_CONFIDENCE_MANUAL
+        patterns = store.query(min_confidence=min_conf, applied=False)
+
+        applied_count = 0
+        failed_count = 0
+
+        for pattern in patterns:
+            try:
+                applied_log["applied"].append({
+                    "pattern_id": pattern.get("id", f"p-{len(applied_log['applied'])}"),
+                    "type": pattern.get("type"),
+                    "description": pattern.get("description"),
+                    "applied_at": datetime.now().isoformat(),
+                    "component": "{{agent_name}}",
+                    "success": True
+                })
+
+                pattern["applied"] = True
+                applied_count += 1
+
+            except Exception:
+                failed_count += 1
+
+        applied_log["last_review"] = datetime.now().isoformat()
+
+        # Only the patterns marked as applied are rewritten
+        store.upsert(p for p in patterns if p.get("applied"))
 
     return {
         "application_complete": True,
@@ -169,23 +169,23 @@ def apply_improvements(auto: bool = False) -> Dict:
 
 def check_should_review() -> Dict:
     """Check if automatic review is recommended."""
-    data = load_patterns()
-    stats = data.get("learning_stats", {})
+    with open_store(get_component_root() / "learned") as store:
+        stats = store.get_meta("learning_stats", {})
+        high_conf = store.count(min_confidence=MIN_CONFIDENCE_AUTO, applied=False)
 
     sessions = stats.get("total_sessions", 0)
-    high_conf = get_applicable_patterns(data.get("patterns", []), MIN_CONFIDENCE_AUTO)
 
     should_review = (
         sessions >= SESSIONS_BETWEEN_REVIEWS or
-        len(high_conf) >= 3
+        high_conf >= 3
     )
 
     return {
         "component": "{{agent_name}}",
         "should_review": should_review,
-        "reason": "High confidence patterns available" if len(high_conf) >= 3
+        "reason": "High confidence patterns available" if high_conf >= 3
                   else f"Sessions threshold ({sessions}/{SESSIONS_BETWEEN_REVIEWS})",
-        "high_confidence_patterns": len(high_conf)
+        "high_confidence_patterns": high_conf
     }
 
 def main():
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Pattern Dedup - Merge near-duplicate learned patterns.
+
+Extraction stores one context_learned pattern per learnable tool per session,
+so the same "Successful Read usage pattern" piles up across sessions. Each
+pattern gets a 64-bit SimHash over its tool, description words and approach
+contexts. Patterns of the same type and tool whose SimHashes differ in at most
+MAX_DISTANCE bits are merged into one canonical pattern (the oldest), which
+aggregates the evidence: occurrences, successes/failures, a bounded union of
+approach samples and the highest confidence.
+
+Extraction merges its new patterns as they are stored, comparing them only
+with the canonical patterns of the same type and tool. `compact` clusters a
+store that already holds duplicates and reports the size and lookup-time
+reduction.
+
+Usage:
+  python pattern_dedup.py compact [--dry-run] [--max-distance N]   - Merge near-duplicates in the store
+"""
+
+import hashlib
+import json
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+from pattern_store import PatternStore, SqlitePatternStore, open_store, pattern_key
+
+# Pattern types produced once per session, and therefore clustered
+CLUSTER_TYPES = ("context_learned",)
+
+SIMHASH_BITS = 64
+MAX_DISTANCE = 7
+
+# Feature weights. Approach contexts share a fixed total weight, so the same
+# description over different files stays within MAX_DISTANCE while a different
+# description or a different kind of context (paths vs commands) does not
+TOOL_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 1.0
+CONTEXT_WEIGHT_TOTAL = 2.0
+
+# Merged patterns keep at most this many approach samples per outcome
+MAX_APPROACH_SAMPLES = 10
+
+_TOKEN = re.compile(r"[a-z]{3,}")
+
+
+def _approach_text(approach) -> str:
+    return str(approach.get("context", "")) if isinstance(approach, dict) else str(approach)
+
+
+def pattern_features(pattern: Dict) -> Dict[str, float]:
+    """Weighted SimHash features of a pattern."""
+    features: Dict[str, float] = Counter()
+    if pattern.get("tool"):
+        features[f"tool:{pattern['tool']}"] += TOOL_WEIGHT
+    for word in _TOKEN.findall(str(pattern.get("description", "")).lower()):
+        features[f"desc:{word}"] += DESCRIPTION_WEIGHT
+
+    context_words = set()
+    for approach in (pattern.get("successful_approaches") or []) + (pattern.get("failed_approaches") or []):
+        context_words.update(_TOKEN.findall(_approach_text(approach).lower()))
+    for word in context_words:
+        features[f"ctx:{word}"] += CONTEXT_WEIGHT_TOTAL / len(context_words)
+    return features
+
+
+def simhash(features: Dict[str, float]) -> int:
+    """64-bit SimHash of weighted features."""
+    totals = [0.0] * SIMHASH_BITS
+    for feature, weight in features.items():
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            totals[bit] += weight if value >> bit & 1 else -weight
+    return sum(1 << bit for bit, total in enumerate(totals) if total > 0)
+
+
+def pattern_simhash(pattern: Dict) -> int:
+    """Stored SimHash of a pattern, computed (and stored on the dict) if missing."""
+    if "simhash" not in pattern:
+        pattern["simhash"] = f"{simhash(pattern_features(pattern)):016x}"
+    return int(pattern["simhash"], 16)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _evidence(pattern: Dict) -> Tuple[int, int]:
+    successes = pattern.get("successes")
+    failures = pattern.get("failures")
+    if successes is None:
+        successes = len(pattern.get("successful_approaches") or [])
+    if failures is None:
+        failures = len(pattern.get("failed_approaches") or [])
+    return successes, failures
+
+
+def _union_samples(kept: List, extra: List) -> List:
+    seen = {_approach_text(a) for a in kept}
+    merged = list(kept)
+    for approach in extra:
+        if len(merged) >= MAX_APPROACH_SAMPLES:
+            break
+        text = _approach_text(approach)
+        if text not in seen:
+            seen.add(text)
+            merged.append(approach)
+    return merged
+
+
+def merge_into(canonical: Dict, duplicate: Dict) -> None:
+    """Fold a near-duplicate's evidence into the canonical pattern (in place)."""
+    successes, failures = _evidence(canonical)
+    dup_successes, dup_failures = _evidence(duplicate)
+    canonical["successes"] = successes + dup_successes
+    canonical["failures"] = failures + dup_failures
+    canonical["occurrences"] = canonical.get("occurrences", 1) + duplicate.get("occurrences", 1)
+    canonical["successful_approaches"] = _union_samples(
+        canonical.get("successful_approaches") or [], duplicate.get("successful_approaches") or []
+    )
+    canonical["failed_approaches"] = _union_samples(
+        canonical.get("failed_approaches") or [], duplicate.get("failed_approaches") or []
+    )
+    canonical["confidence"] = max(canonical.get("confidence") or 0, duplicate.get("confidence") or 0)
+    canonical["last_seen"] = max(
+        canonical.get("last_seen") or canonical.get("learned_at") or "",
+        duplicate.get("last_seen") or duplicate.get("learned_at") or ""
+    )
+    for flag in ("applied", "reviewed"):
+        if duplicate.get(flag):
+            canonical[flag] = True
+    if duplicate.get("review_score") is not None:
+        canonical["review_score"] = max(canonical.get("review_score") or 0, duplicate["review_score"])
+
+
+class Clusters:
+    """Canonical patterns per (type, tool).
+
+    With load=True each group starts from the store's patterns of that type and
+    tool (loaded on first use); otherwise groups start empty.
+    """
+
+    def __init__(self, store: PatternStore, max_distance: int = MAX_DISTANCE, load: bool = True):
+        self.store = store
+        self.max_distance = max_distance
+        self.load = load
+        self.groups: Dict[Tuple[str, Optional[str]], List[Dict]] = {}
+
+    def _group(self, pattern: Dict) -> List[Dict]:
+        group_key = (pattern.get("type"), pattern.get("tool"))
+        if group_key not in self.groups:
+            self.groups[group_key] = self.store.query(type=group_key[0], tool=group_key[1]) if self.load else []
+        return self.groups[group_key]
+
+    def find(self, pattern: Dict) -> Optional[Dict]:
+        """Nearest canonical pattern within max_distance, if any."""
+        signature = pattern_simhash(pattern)
+        best, best_distance = None, self.max_distance + 1
+        for candidate in self._group(pattern):
+            distance = hamming(signature, pattern_simhash(candidate))
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
+
+    def add(self, pattern: Dict) -> Optional[Dict]:
+        """Merge pattern into its cluster; returns the canonical it merged into, or None if it is new."""
+        canonical = self.find(pattern)
+        if canonical is None:
+            self._group(pattern).append(pattern)
+            return None
+        merge_into(canonical, pattern)
+        return canonical
+
+
+def merge_new_patterns(store: PatternStore, patterns: Iterable[Dict], max_distance: int = MAX_DISTANCE) -> Dict:
+    """Store freshly extracted patterns, merging near-duplicates into existing ones.
+
+    Call inside the caller's store transaction.
+    """
+    clusters = Clusters(store, max_distance)
+    added, merged = [], {}
+    for pattern in patterns:
+        if pattern.get("type") not in CLUSTER_TYPES:
+            added.append(pattern)
+            continue
+        canonical = clusters.add(pattern)
+        if canonical is None:
+            added.append(pattern)
+        elif not any(canonical is p for p in added):
+            merged[pattern_key(canonical)] = canonical
+    store.upsert(added + list(merged.values()))
+    return {"added": added, "merged": list(merged.values())}
+
+
+def _lookup_ms(store: PatternStore, repeats: int = 20) -> float:
+    """Mean time of the hot read paths: per-tool lookup, apply_learned check, full load."""
+    tools = [tool for tool in store.count_by("tool") if tool]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for tool in tools:
+            store.query(type="context_learned", tool=tool)
+        store.query(min_confidence=0.9, applied=False, order_by="confidence", limit=5)
+        store.to_document()
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def compact(store: PatternStore, max_distance: int = MAX_DISTANCE, dry_run: bool = False) -> Dict:
+    """Merge every near-duplicate cluster in the store into its oldest pattern."""
+    before = {"patterns": store.count(), "bytes": store.size_bytes(), "lookup_ms": _lookup_ms(store)}
+
+    with store.transaction():
+        clusters = Clusters(store, max_distance, load=False)
+        canonicals, duplicates = {}, []
+        for pattern in store.query():
+            if pattern.get("type") not in CLUSTER_TYPES:
+                continue
+            canonical = clusters.add(pattern)
+            if canonical is None:
+                canonicals[pattern_key(pattern)] = pattern
+            else:
+                duplicates.append(pattern_key(pattern))
+
+        if not dry_run:
+            store.delete(duplicates)
+            store.upsert(canonicals.values())
+            store.set_meta("last_compaction", datetime.now().isoformat())
+
+    result = {
+        "dry_run": dry_run,
+        "backend": store.backend,
+        "max_distance": max_distance,
+        "clusters": len(canonicals),
+        "merged_patterns": len(duplicates),
+        "before": before
+    }
+    if dry_run:
+        before["lookup_ms"] = round(before["lookup_ms"], 2)
+        return result
+
+    store.vacuum()
+    after = {"patterns": store.count(), "bytes": store.size_bytes(), "lookup_ms": _lookup_ms(store)}
+    result["after"] = after
+    result["reduction"] = {
+        key: f"{(1 - after[key] / before[key]) * 100:.1f}%" if before[key] else "0.0%"
+        for key in ("patterns", "bytes", "lookup_ms")
+    }
+    for stats in (before, after):
+        stats["lookup_ms"] = round(stats["lookup_ms"], 2)
+    return result
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] != "compact":
+        print("Usage: python pattern_dedup.py compact [--dry-run] [--max-distance N]")
+        sys.exit(1)
+
+    args = sys.argv[2:]
+    max_distance = int(args[args.index("--max-distance") + 1]) if "--max-distance" in args[:-1] else MAX_DISTANCE
+
+    with open_store() as store:
+        result = compact(store, max_distance, dry_run="--dry-run" in args)
+        if not result["dry_run"] and isinstance(store, SqlitePatternStore) and store.json_file is not None:
+            # Keep the patterns.json mirror from re-importing the merged duplicates
+            store.export_json()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
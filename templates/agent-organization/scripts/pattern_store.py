@@ -0,0 +1,1104 @@
+#!/usr/bin/env python3
+"""
+Pattern Store - Learned-pattern storage with pluggable backends.
+
+Consumers (context_tracker, apply_learned, pattern_extractor) query and upsert
+individual patterns instead of loading and rewriting the whole of
+learned/patterns.json on every hook.
+
+Backends:
+  sqlite (default)  learned/patterns.db, WAL mode. Indexed columns: type, tool,
+                    name, fingerprint, confidence, applied, learned_at, last_used,
+                    evidence, decayed_at, retention; the full pattern is kept as JSON. Top-level document keys (learning_stats,
+                    edit_history, ...) are stored in a meta table, and an
+                    inverted index maps normalized triggers to pattern keys.
+  json              learned/patterns.json, locked read-modify-write (storage.py).
+
+Select with UC_PATTERN_STORE=sqlite|json.
+
+Compatibility with patterns.json:
+  - When the database is created, an existing patterns.json is imported.
+  - If patterns.json changes afterwards (e.g. edited by an agent), it is
+    merged in again on the next open (upsert by id; deletions are not mirrored).
+  - `export` writes the database back to patterns.json in the original format.
+
+Retention (both backends, bounded work on every upsert):
+  - Confidence decays with a half-life, counted from the last new evidence.
+  - Unapplied, low-evidence patterns expire after a TTL without use.
+  - Above max_patterns the lowest retention score is evicted: recency of use
+    (learned, seen again, or matched) plus a bonus per unit of evidence.
+  The policy is DEFAULT_RETENTION overridden by the "retention" meta key
+  (a top-level "retention" object in patterns.json).
+
+Usage:
+  python pattern_store.py import [file] [--replace]   - Import patterns.json into the store
+  python pattern_store.py export [file]               - Export the store to patterns.json
+  python pattern_store.py query [--type T] [--tool T] [--min-confidence X] [--applied true|false] [--limit N]
+  python pattern_store.py stats
+  python pattern_store.py retention [key=value ...]    - Show or change the retention policy
+  python pattern_store.py maintain [--all]             - Run a retention pass (--all: until nothing is left to do)
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import re
+import sqlite3
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+from storage import LOCK_TIMEOUT, atomic_write_json, file_lock, locked_json, read_json
+
+DEFAULT_BACKEND = "sqlite"
+SCHEMA_VERSION = 4
+
+# Columns extracted from each pattern for indexed queries
+INDEXED_COLUMNS = (
+    "type", "tool", "name", "fingerprint", "confidence", "applied", "learned_at",
+    "last_used", "evidence", "decayed_at", "retention"
+)
+
+# Retention policy; a null value disables the rules in OPTIONAL_RETENTION
+DEFAULT_RETENTION = {
+    "half_life_days": 90,       # confidence halves after this long without new evidence
+    "decay_interval_days": 1,   # minimum time between decay steps of a pattern
+    "ttl_days": 180,            # unapplied patterns unused for this long expire...
+    "ttl_max_evidence": 1,      # ...if they have at most this much evidence
+    "max_patterns": 5000,       # hard cap, enforced by eviction
+    "batch": 100                # max patterns decayed or expired per write
+}
+
+OPTIONAL_RETENTION = ("half_life_days", "ttl_days", "max_patterns")
+
+# Eviction score: one unit of evidence counts as this many days of recency (up to the cap)
+EVIDENCE_DAYS = 7
+EVIDENCE_CAP = 10
+
+# Max bound parameters per IN (...) lookup
+LOOKUP_CHUNK = 500
+
+# Meta keys starting with "_" are internal and never exported
+_MIRROR_KEY = "_json_mirror"
+_TRIGGER_VERSION_KEY = "_trigger_version"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patterns (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    type TEXT,
+    tool TEXT,
+    name TEXT,
+    fingerprint TEXT,
+    confidence REAL,
+    applied INTEGER NOT NULL DEFAULT 0,
+    learned_at TEXT,
+    last_used TEXT,
+    evidence INTEGER NOT NULL DEFAULT 1,
+    decayed_at TEXT,
+    retention REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_patterns_type ON patterns(type);
+CREATE INDEX IF NOT EXISTS idx_patterns_tool ON patterns(tool);
+CREATE INDEX IF NOT EXISTS idx_patterns_name ON patterns(name);
+CREATE INDEX IF NOT EXISTS idx_patterns_fingerprint ON patterns(fingerprint);
+CREATE INDEX IF NOT EXISTS idx_patterns_confidence ON patterns(confidence);
+CREATE INDEX IF NOT EXISTS idx_patterns_applied ON patterns(applied);
+CREATE INDEX IF NOT EXISTS idx_patterns_learned_at ON patterns(learned_at);
+CREATE INDEX IF NOT EXISTS idx_patterns_last_used ON patterns(applied, last_used);
+CREATE INDEX IF NOT EXISTS idx_patterns_decayed_at ON patterns(decayed_at);
+CREATE INDEX IF NOT EXISTS idx_patterns_retention ON patterns(applied, retention);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pattern_triggers (
+    trigger TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (trigger, key)
+);
+CREATE INDEX IF NOT EXISTS idx_pattern_triggers_key ON pattern_triggers(key);
+"""
+
+
+def get_component_root() -> Path:
+    """Get component root directory."""
+    return Path(os.environ.get("COMPONENT_ROOT", Path(__file__).parent.parent))
+
+
+def pattern_key(pattern: Dict) -> str:
+    """Stable storage key: the pattern id, else its name, else a content hash."""
+    if pattern.get("id"):
+        return str(pattern["id"])
+    if pattern.get("name"):
+        return f"name:{pattern['name']}"
+    digest = hashlib.sha1(json.dumps(pattern, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+    return f"sha1:{digest[:16]}"
+
+
+def new_pattern_id(prefix: str) -> str:
+    """Fresh id for a newly learned pattern: <prefix>-<timestamp>-<random>.
+
+    Not derived from the pattern count, which goes down when retention
+    deletes rows and would then reissue ids of surviving patterns.
+    """
+    return f"{prefix}-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def pattern_fingerprint(pattern: Dict) -> Optional[str]:
+    """Content fingerprint: type plus normalized description (None without a description).
+
+    Catches the same pattern reported under different names.
+    """
+    description = pattern.get("description")
+    if not isinstance(description, str) or not description.strip():
+        return None
+    normalized = " ".join(re.findall(r"\w+", description.lower()))
+    return hashlib.sha1(f"{pattern.get('type', '')}\0{normalized}".encode()).hexdigest()[:16]
+
+
+def normalize_trigger(text: str) -> str:
+    """Lowercase and collapse whitespace (applied to triggers and to matched contexts)."""
+    return " ".join(text.lower().split())
+
+
+def pattern_triggers(pattern: Dict) -> List[str]:
+    """Distinct normalized triggers of a pattern."""
+    triggers = pattern.get("triggers") or []
+    if isinstance(triggers, str):
+        triggers = [triggers]
+    return list(dict.fromkeys(
+        t for t in (normalize_trigger(x) for x in triggers if isinstance(x, str)) if t
+    ))
+
+
+def _learned_at(pattern: Dict) -> Optional[str]:
+    return pattern.get("learned_at") or pattern.get("added")
+
+
+def retention_error(name: str, value: Any) -> Optional[str]:
+    """Why value can't be used for retention setting name, or None if it can."""
+    if name not in DEFAULT_RETENTION:
+        return f"Unknown retention setting: {name}"
+    if value is None:
+        return None if name in OPTIONAL_RETENTION else f"{name} can't be null"
+    if name.endswith("_days"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+            return f"{name} must be a non-negative number"
+    elif isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        return f"{name} must be a non-negative integer"
+    return None
+
+
+def _latest(*stamps: Any) -> Optional[str]:
+    stamps = [s for s in stamps if isinstance(s, str) and s]
+    return max(stamps) if stamps else None
+
+
+def pattern_evidence(pattern: Dict) -> int:
+    """Times the pattern was observed (merges add up occurrences)."""
+    occurrences = pattern.get("occurrences")
+    return occurrences if isinstance(occurrences, int) and occurrences > 0 else 1
+
+
+def pattern_last_used(pattern: Dict) -> Optional[str]:
+    """Latest of learned, seen again and matched by a suggestion lookup."""
+    return _latest(_learned_at(pattern), pattern.get("last_seen"), pattern.get("last_matched"))
+
+
+def _decayed_at(pattern: Dict) -> Optional[str]:
+    """Start of the pending decay: the last decay step or the last new evidence."""
+    return _latest(pattern.get("decayed_at"), _learned_at(pattern), pattern.get("last_seen"))
+
+
+def _days_since(stamp: Optional[str], now: datetime) -> float:
+    try:
+        return (now - datetime.fromisoformat(stamp)).total_seconds() / 86400
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _decay(pattern: Dict, policy: Dict, now: datetime, started: Optional[str] = None) -> None:
+    """Apply the confidence decay accumulated since _decayed_at, or since started if later (in place)."""
+    confidence = pattern.get("confidence")
+    if isinstance(confidence, (int, float)) and not isinstance(confidence, bool):
+        days = _days_since(_latest(_decayed_at(pattern), started), now)
+        pattern["confidence"] = round(confidence * 0.5 ** (days / policy["half_life_days"]), 4)
+    pattern["decayed_at"] = now.isoformat()
+
+
+def retention_score(pattern: Dict) -> Optional[float]:
+    """Eviction order, lowest first: last use in days plus an evidence bonus.
+
+    Independent of the current time, so it can be stored and indexed. None
+    (no usable timestamp) sorts first.
+    """
+    try:
+        last_used = datetime.fromisoformat(pattern_last_used(pattern))
+    except (TypeError, ValueError):
+        return None
+    day_fraction = (last_used.hour * 3600 + last_used.minute * 60 + last_used.second) / 86400
+    return last_used.toordinal() + day_fraction + EVIDENCE_DAYS * min(pattern_evidence(pattern), EVIDENCE_CAP)
+
+
+def _matches(
+    pattern: Dict,
+    type: Optional[str] = None,
+    tool: Optional[str] = None,
+    name: Optional[str] = None,
+    fingerprint: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    max_confidence: Optional[float] = None,
+    applied: Optional[bool] = None,
+    since: Optional[str] = None
+) -> bool:
+    """In-memory equivalent of the SQL filters (used by the JSON backend)."""
+    if type is not None and pattern.get("type") != type:
+        return False
+    if tool is not None and pattern.get("tool") != tool:
+        return False
+    if name is not None and pattern.get("name") != name:
+        return False
+    if fingerprint is not None and pattern_fingerprint(pattern) != fingerprint:
+        return False
+    confidence = pattern.get("confidence") or 0
+    if min_confidence is not None and confidence < min_confidence:
+        return False
+    if max_confidence is not None and confidence >= max_confidence:
+        return False
+    if applied is not None and bool(pattern.get("applied", False)) != applied:
+        return False
+    if since is not None and (_learned_at(pattern) or "") < since:
+        return False
+    return True
+
+
+class PatternStore:
+    """Interface shared by the storage backends.
+
+    Filters accepted by query/count/delete_where: type, tool, name, fingerprint,
+    min_confidence (>=), max_confidence (<), applied, since (learned_at >=).
+    """
+
+    backend = "abstract"
+
+    def __enter__(self) -> "PatternStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        pass
+
+    @contextmanager
+    def transaction(self) -> Iterator["PatternStore"]:
+        """Group reads and writes into one atomic unit; nested calls join the outer one."""
+        raise NotImplementedError
+
+    def query(self, limit: Optional[int] = None, order_by: str = "seq", **filters) -> List[Dict]:
+        """Patterns matching filters, in insertion order or by descending confidence."""
+        raise NotImplementedError
+
+    def count(self, **filters) -> int:
+        raise NotImplementedError
+
+    def count_by(self, column: str) -> Dict[Any, int]:
+        """Number of patterns per value of an indexed column."""
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Pattern by storage key (see pattern_key)."""
+        raise NotImplementedError
+
+    def find_by(self, column: str, values: Iterable[Any]) -> Dict[Any, Dict]:
+        """Batch lookup on an indexed column: value -> first stored pattern with it."""
+        raise NotImplementedError
+
+    def get_many(self, keys: Iterable[str]) -> List[Dict]:
+        """Patterns for the given keys, in store order."""
+        raise NotImplementedError
+
+    def trigger_map(self) -> Dict[str, List[str]]:
+        """Inverted trigger index: normalized trigger -> pattern keys."""
+        raise NotImplementedError
+
+    def trigger_version(self) -> Any:
+        """Token that changes whenever the trigger index changes."""
+        raise NotImplementedError
+
+    def upsert(self, patterns: Iterable[Dict]) -> int:
+        """Insert or replace patterns by key; returns the number written."""
+        raise NotImplementedError
+
+    def delete(self, keys: Iterable[str]) -> int:
+        raise NotImplementedError
+
+    def delete_where(self, **filters) -> int:
+        return self.delete([pattern_key(p) for p in self.query(**filters)])
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """Top-level document value (learning_stats, edit_history, ...)."""
+        raise NotImplementedError
+
+    def set_meta(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def all_meta(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def to_document(self) -> Dict[str, Any]:
+        """The store in patterns.json format."""
+        doc = {k: v for k, v in self.all_meta().items() if not k.startswith("_")}
+        doc["patterns"] = self.query()
+        return doc
+
+    def import_document(self, doc: Dict[str, Any], replace: bool = False) -> int:
+        """Load a patterns.json document; merges by key unless replace is set."""
+        with self.transaction():
+            if replace:
+                self.clear()
+            seen = set()
+            patterns = []
+            for pattern in doc.get("patterns", []):
+                key = pattern_key(pattern)
+                if key in seen:
+                    # Duplicate ids in legacy files: keep both
+                    pattern = dict(pattern, id=f"{key}#{len(patterns)}")
+                seen.add(pattern_key(pattern))
+                patterns.append(pattern)
+            for key, value in doc.items():
+                if key != "patterns":
+                    self.set_meta(key, value)
+            return self.upsert(patterns)
+
+    def clear(self) -> None:
+        """Remove all patterns and document values (internal "_" keys are kept)."""
+        raise NotImplementedError
+
+    def size_bytes(self) -> int:
+        """On-disk size of the store."""
+        raise NotImplementedError
+
+    def vacuum(self) -> None:
+        """Reclaim space left by deleted patterns."""
+
+    def retention_policy(self) -> Dict[str, Any]:
+        """DEFAULT_RETENTION with the stored overrides; invalid overrides are ignored."""
+        overrides = self.get_meta("retention")
+        if not isinstance(overrides, dict):
+            overrides = {}
+        return {
+            **DEFAULT_RETENTION,
+            **{k: v for k, v in overrides.items() if retention_error(k, v) is None}
+        }
+
+    def maintain(self, protect: Iterable[str] = (), now: Optional[datetime] = None) -> Dict[str, int]:
+        """One bounded retention pass: decay, expire, then evict down to the cap.
+
+        Runs after every upsert; patterns in protect (the ones just written)
+        are never expired, and evicted only if the cap can't be met otherwise.
+        """
+        raise NotImplementedError
+
+    def _retention_started(self, now: datetime) -> str:
+        """When retention first ran on this store (set on first use).
+
+        Decay never reaches back before it, so patterns stored before decay
+        existed (or imported from such a document) start decaying now instead
+        of losing their whole age at once.
+        """
+        started = self.get_meta("retention_started")
+        if not isinstance(started, str):
+            started = now.isoformat()
+            self.set_meta("retention_started", started)
+        return started
+
+    def _record_retention(self, counts: Dict[str, int], now: datetime) -> None:
+        if any(counts.values()):
+            stats = self.get_meta("retention_stats", {})
+            for name, value in counts.items():
+                stats[name] = stats.get(name, 0) + value
+            stats["last_run"] = now.isoformat()
+            self.set_meta("retention_stats", stats)
+
+    def _write(self, patterns: List[Dict]) -> List[str]:
+        """Insert or update patterns without a retention pass; returns the written keys."""
+        raise NotImplementedError
+
+    def touch(self, keys: Iterable[str], now: Optional[datetime] = None) -> int:
+        """Record that patterns were matched (keeps them from eviction).
+
+        Called on the read path, so it writes only stamps older than the decay
+        interval and skips the retention pass; returns the number written.
+        """
+        now = now or datetime.now()
+        cutoff = (now - timedelta(days=self.retention_policy()["decay_interval_days"])).isoformat()
+        keys = list(keys)
+
+        def stale() -> List[Dict]:
+            return [p for p in self.get_many(keys) if (p.get("last_matched") or "") <= cutoff]
+
+        if not keys or not stale():
+            return 0
+        with self.transaction():
+            patterns = stale()
+            for pattern in patterns:
+                pattern["last_matched"] = now.isoformat()
+            return len(self._write(patterns)) if patterns else 0
+
+
+class JsonPatternStore(PatternStore):
+    """patterns.json backend (whole-file rewrite under a lock)."""
+
+    backend = "json"
+
+    def __init__(self, json_file: Path):
+        self.json_file = Path(json_file)
+        self.location = str(self.json_file)
+        self._doc: Optional[Dict] = None
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        return {"patterns": [], "learning_stats": {"total_sessions": 0}}
+
+    @contextmanager
+    def transaction(self) -> Iterator["JsonPatternStore"]:
+        if self._doc is not None:
+            yield self
+            return
+        with locked_json(self.json_file, self._empty) as doc:
+            doc.setdefault("patterns", [])
+            self._doc = doc
+            try:
+                yield self
+            finally:
+                self._doc = None
+
+    def _read(self) -> Dict:
+        if self._doc is not None:
+            return self._doc
+        doc = read_json(self.json_file, self._empty)
+        doc.setdefault("patterns", [])
+        return doc
+
+    def query(self, limit: Optional[int] = None, order_by: str = "seq", **filters) -> List[Dict]:
+        found = [p for p in self._read()["patterns"] if _matches(p, **filters)]
+        if order_by == "confidence":
+            found.sort(key=lambda p: -(p.get("confidence") or 0))
+        return found[:limit] if limit is not None else found
+
+    def count(self, **filters) -> int:
+        return len(self.query(**filters))
+
+    def count_by(self, column: str) -> Dict[Any, int]:
+        counts: Dict[Any, int] = {}
+        for p in self._read()["patterns"]:
+            value = _learned_at(p) if column == "learned_at" else p.get(column)
+            counts[value] = counts.get(value, 0) + 1
+        return counts
+
+    def get(self, key: str) -> Optional[Dict]:
+        for p in self._read()["patterns"]:
+            if pattern_key(p) == key:
+                return p
+        return None
+
+    def find_by(self, column: str, values: Iterable[Any]) -> Dict[Any, Dict]:
+        wanted = set(values)
+        found: Dict[Any, Dict] = {}
+        for p in self._read()["patterns"]:
+            if column == "fingerprint":
+                value = pattern_fingerprint(p)
+            elif column == "learned_at":
+                value = _learned_at(p)
+            else:
+                value = p.get(column)
+            if value in wanted and value not in found:
+                found[value] = p
+        return found
+
+    def get_many(self, keys: Iterable[str]) -> List[Dict]:
+        keys = set(keys)
+        return [p for p in self._read()["patterns"] if pattern_key(p) in keys]
+
+    def trigger_map(self) -> Dict[str, List[str]]:
+        index: Dict[str, List[str]] = {}
+        for p in self._read()["patterns"]:
+            for trigger in pattern_triggers(p):
+                index.setdefault(trigger, []).append(pattern_key(p))
+        return index
+
+    def trigger_version(self) -> Any:
+        # No persisted index: any change to the file invalidates it
+        try:
+            stat = self.json_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _write(self, patterns: List[Dict]) -> List[str]:
+        with self.transaction():
+            stored = self._doc["patterns"]
+            positions = {pattern_key(p): i for i, p in enumerate(stored)}
+            written = {}
+            for pattern in patterns:
+                key = pattern_key(pattern)
+                if key in positions:
+                    stored[positions[key]] = pattern
+                else:
+                    positions[key] = len(stored)
+                    stored.append(pattern)
+                written[key] = None
+            return list(written)
+
+    def upsert(self, patterns: Iterable[Dict]) -> int:
+        with self.transaction():
+            written = self._write(list(patterns))
+            if written:
+                self.maintain(protect=written)
+            return len(written)
+
+    def maintain(self, protect: Iterable[str] = (), now: Optional[datetime] = None) -> Dict[str, int]:
+        policy = self.retention_policy()
+        now = now or datetime.now()
+        protect = set(protect)
+        counts = {"decayed": 0, "expired": 0, "evicted": 0}
+        with self.transaction():
+            patterns = self._doc["patterns"]
+
+            # Timestamps compare as ISO strings, as in the SQLite backend
+            started = self._retention_started(now)
+            cutoff = (now - timedelta(days=policy["decay_interval_days"])).isoformat()
+            if policy["half_life_days"] and started <= cutoff:
+                due = [(stamp, i) for i, stamp in enumerate(map(_decayed_at, patterns)) if stamp and stamp <= cutoff]
+                for _, i in sorted(due)[:policy["batch"]]:
+                    _decay(patterns[i], policy, now, started)
+                    counts["decayed"] += 1
+
+            if policy["ttl_days"]:
+                cutoff = (now - timedelta(days=policy["ttl_days"])).isoformat()
+                expired = sorted(
+                    (pattern_last_used(p), pattern_key(p)) for p in patterns
+                    if not p.get("applied") and pattern_evidence(p) <= policy["ttl_max_evidence"]
+                    and (pattern_last_used(p) or cutoff) < cutoff and pattern_key(p) not in protect
+                )
+                counts["expired"] = self.delete(key for _, key in expired[:policy["batch"]])
+
+            excess = len(self._doc["patterns"]) - (policy["max_patterns"] or len(self._doc["patterns"]))
+            if excess > 0:
+                def order(pattern: Dict) -> tuple:
+                    score = retention_score(pattern)
+                    return (pattern_key(pattern) in protect, bool(pattern.get("applied")), score is not None, score or 0)
+
+                victims = heapq.nsmallest(excess, self._doc["patterns"], key=order)
+                counts["evicted"] = self.delete(pattern_key(p) for p in victims)
+
+            self._record_retention(counts, now)
+        return counts
+
+    def delete(self, keys: Iterable[str]) -> int:
+        keys = set(keys)
+        with self.transaction():
+            before = len(self._doc["patterns"])
+            self._doc["patterns"] = [p for p in self._doc["patterns"] if pattern_key(p) not in keys]
+            return before - len(self._doc["patterns"])
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        return self._read().get(key, default)
+
+    def set_meta(self, key: str, value: Any) -> None:
+        if key.startswith("_"):
+            return
+        with self.transaction():
+            self._doc[key] = value
+
+    def all_meta(self) -> Dict[str, Any]:
+        return {k: v for k, v in self._read().items() if k != "patterns"}
+
+    def clear(self) -> None:
+        with self.transaction():
+            self._doc.clear()
+            self._doc["patterns"] = []
+
+    def size_bytes(self) -> int:
+        try:
+            return self.json_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+
+class SqlitePatternStore(PatternStore):
+    """SQLite backend (WAL mode, indexed columns, per-pattern upserts)."""
+
+    backend = "sqlite"
+
+    def __init__(self, db_file: Path, json_file: Optional[Path] = None, timeout: float = LOCK_TIMEOUT):
+        self.db_file = Path(db_file)
+        self.location = str(self.db_file)
+        self.json_file = Path(json_file) if json_file else None
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_file), timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._depth = 0
+
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Serialize schema creation with other first openers
+            with file_lock(self.db_file):
+                self._migrate_schema()
+
+        if self.json_file is not None:
+            self.sync_from_json()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _migrate_schema(self) -> None:
+        """Create the schema or upgrade an older database in place."""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        if version == 1:
+            # v2: fingerprint column, backfilled from the stored patterns
+            with self.transaction():
+                self.conn.execute("ALTER TABLE patterns ADD COLUMN fingerprint TEXT")
+                rows = self.conn.execute("SELECT seq, data FROM patterns").fetchall()
+                self.conn.executemany(
+                    "UPDATE patterns SET fingerprint = ? WHERE seq = ?",
+                    [(pattern_fingerprint(json.loads(data)), seq) for seq, data in rows]
+                )
+        if 0 < version < 4:
+            # v4: retention columns, backfilled from the stored patterns
+            with self.transaction():
+                self.conn.execute("ALTER TABLE patterns ADD COLUMN last_used TEXT")
+                self.conn.execute("ALTER TABLE patterns ADD COLUMN evidence INTEGER NOT NULL DEFAULT 1")
+                self.conn.execute("ALTER TABLE patterns ADD COLUMN decayed_at TEXT")
+                self.conn.execute("ALTER TABLE patterns ADD COLUMN retention REAL")
+                rows = self.conn.execute("SELECT seq, data FROM patterns").fetchall()
+                self.conn.executemany(
+                    "UPDATE patterns SET last_used = ?, evidence = ?, decayed_at = ?, retention = ? WHERE seq = ?",
+                    [
+                        (pattern_last_used(p), pattern_evidence(p), _decayed_at(p), retention_score(p), seq)
+                        for seq, p in ((seq, json.loads(data)) for seq, data in rows)
+                    ]
+                )
+                # Stored patterns start decaying now, not from when they were learned
+                self.set_meta("retention_started", datetime.now().isoformat())
+        self.conn.executescript(_SCHEMA)
+        if 0 < version < 3:
+            # v3: trigger index, built from the stored patterns
+            with self.transaction():
+                rows = self.conn.execute("SELECT key, data FROM patterns").fetchall()
+                self._index_triggers([(key, json.loads(data)) for key, data in rows])
+        self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    @contextmanager
+    def transaction(self) -> Iterator["SqlitePatternStore"]:
+        if self._depth:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+
+        # IMMEDIATE takes the write lock up front, so read-modify-write can't interleave
+        self.conn.execute("BEGIN IMMEDIATE")
+        self._depth = 1
+        try:
+            yield self
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        else:
+            self.conn.execute("COMMIT")
+        finally:
+            self._depth = 0
+
+    def _where(
+        self,
+        type: Optional[str] = None,
+        tool: Optional[str] = None,
+        name: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        max_confidence: Optional[float] = None,
+        applied: Optional[bool] = None,
+        since: Optional[str] = None
+    ) -> tuple:
+        clauses = []
+        params: List[Any] = []
+        for column, value in (("type", type), ("tool", tool), ("name", name), ("fingerprint", fingerprint)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if min_confidence is not None:
+            clauses.append("COALESCE(confidence, 0) >= ?")
+            params.append(min_confidence)
+        if max_confidence is not None:
+            clauses.append("COALESCE(confidence, 0) < ?")
+            params.append(max_confidence)
+        if applied is not None:
+            clauses.append("applied = ?")
+            params.append(int(applied))
+        if since is not None:
+            clauses.append("learned_at >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit: Optional[int] = None, order_by: str = "seq", **filters) -> List[Dict]:
+        where, params = self._where(**filters)
+        order = "confidence DESC, seq" if order_by == "confidence" else "seq"
+        sql = f"SELECT data FROM patterns{where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def count(self, **filters) -> int:
+        where, params = self._where(**filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM patterns{where}", params).fetchone()[0]
+
+    def count_by(self, column: str) -> Dict[Any, int]:
+        if column not in INDEXED_COLUMNS:
+            raise ValueError(f"Not an indexed column: {column}")
+        rows = self.conn.execute(f"SELECT {column}, COUNT(*) FROM patterns GROUP BY {column}")
+        return {value: count for value, count in rows}
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT data FROM patterns WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_by(self, column: str, values: Iterable[Any]) -> Dict[Any, Dict]:
+        if column not in INDEXED_COLUMNS:
+            raise ValueError(f"Not an indexed column: {column}")
+        values = list(dict.fromkeys(v for v in values if v is not None))
+        found: Dict[Any, Dict] = {}
+        for start in range(0, len(values), LOOKUP_CHUNK):
+            chunk = values[start:start + LOOKUP_CHUNK]
+            rows = self.conn.execute(
+                f"SELECT {column}, data FROM patterns WHERE {column} IN ({', '.join('?' * len(chunk))}) ORDER BY seq",
+                chunk
+            )
+            for value, data in rows:
+                if value not in found:
+                    found[value] = json.loads(data)
+        return found
+
+    @staticmethod
+    def _row(pattern: Dict) -> tuple:
+        confidence = pattern.get("confidence")
+        return (
+            pattern_key(pattern),
+            pattern.get("type"),
+            pattern.get("tool"),
+            pattern.get("name"),
+            pattern_fingerprint(pattern),
+            confidence if isinstance(confidence, (int, float)) else None,
+            int(bool(pattern.get("applied", False))),
+            _learned_at(pattern),
+            pattern_last_used(pattern),
+            pattern_evidence(pattern),
+            _decayed_at(pattern),
+            retention_score(pattern),
+            json.dumps(pattern, ensure_ascii=False)
+        )
+
+    def get_many(self, keys: Iterable[str]) -> List[Dict]:
+        keys = list(dict.fromkeys(keys))
+        found = []
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            found.extend(self.conn.execute(
+                f"SELECT seq, data FROM patterns WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+            ))
+        return [json.loads(data) for _, data in sorted(found)]
+
+    def trigger_map(self) -> Dict[str, List[str]]:
+        index: Dict[str, List[str]] = {}
+        for trigger, key in self.conn.execute("SELECT trigger, key FROM pattern_triggers ORDER BY trigger"):
+            index.setdefault(trigger, []).append(key)
+        return index
+
+    def trigger_version(self) -> Any:
+        return self.get_meta(_TRIGGER_VERSION_KEY)
+
+    def _index_triggers(self, keyed: List[tuple]) -> None:
+        """Bring the trigger rows of (key, pattern) pairs up to date; bumps the version on change."""
+        changed = False
+        for start in range(0, len(keyed), LOOKUP_CHUNK):
+            chunk = keyed[start:start + LOOKUP_CHUNK]
+            keys = [key for key, _ in chunk]
+            current = set(self.conn.execute(
+                f"SELECT trigger, key FROM pattern_triggers WHERE key IN ({', '.join('?' * len(keys))})", keys
+            ))
+            wanted = {(trigger, key) for key, pattern in chunk for trigger in pattern_triggers(pattern)}
+            if current != wanted:
+                self.conn.executemany("DELETE FROM pattern_triggers WHERE trigger = ? AND key = ?", current - wanted)
+                self.conn.executemany("INSERT INTO pattern_triggers (trigger, key) VALUES (?, ?)", wanted - current)
+                changed = True
+        if changed:
+            self.set_meta(_TRIGGER_VERSION_KEY, uuid.uuid4().hex)
+
+    def _write(self, patterns: List[Dict]) -> List[str]:
+        """Insert or update rows and their triggers; returns the written keys."""
+        rows = [self._row(p) for p in patterns]
+        # ON CONFLICT keeps seq, so updated patterns stay in place
+        self.conn.executemany(
+            "INSERT INTO patterns (key, type, tool, name, fingerprint, confidence, applied, learned_at, "
+            "last_used, evidence, decayed_at, retention, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET type = excluded.type, tool = excluded.tool, "
+            "name = excluded.name, fingerprint = excluded.fingerprint, "
+            "confidence = excluded.confidence, applied = excluded.applied, "
+            "learned_at = excluded.learned_at, last_used = excluded.last_used, "
+            "evidence = excluded.evidence, decayed_at = excluded.decayed_at, "
+            "retention = excluded.retention, data = excluded.data",
+            rows
+        )
+        self._index_triggers([(row[0], p) for row, p in zip(rows, patterns)])
+        return [row[0] for row in rows]
+
+    def upsert(self, patterns: Iterable[Dict]) -> int:
+        patterns = list(patterns)
+        if not patterns:
+            return 0
+        with self.transaction():
+            keys = self._write(patterns)
+            self.maintain(protect=keys)
+        return len(keys)
+
+    def maintain(self, protect: Iterable[str] = (), now: Optional[datetime] = None) -> Dict[str, int]:
+        policy = self.retention_policy()
+        now = now or datetime.now()
+        protect = set(protect)
+        counts = {"decayed": 0, "expired": 0, "evicted": 0}
+        with self.transaction():
+            started = self._retention_started(now)
+            cutoff = (now - timedelta(days=policy["decay_interval_days"])).isoformat()
+            if policy["half_life_days"] and started <= cutoff:
+                due = [json.loads(data) for (data,) in self.conn.execute(
+                    "SELECT data FROM patterns WHERE decayed_at <= ? ORDER BY decayed_at LIMIT ?",
+                    (cutoff, policy["batch"])
+                )]
+                for pattern in due:
+                    _decay(pattern, policy, now, started)
+                counts["decayed"] = len(self._write(due)) if due else 0
+
+            if policy["ttl_days"]:
+                cutoff = (now - timedelta(days=policy["ttl_days"])).isoformat()
+                rows = self.conn.execute(
+                    "SELECT key FROM patterns WHERE applied = 0 AND evidence <= ? AND last_used < ? "
+                    "ORDER BY last_used LIMIT ?",
+                    (policy["ttl_max_evidence"], cutoff, policy["batch"] + len(protect))
+                )
+                counts["expired"] = self.delete([key for (key,) in rows if key not in protect][:policy["batch"]])
+
+            if policy["max_patterns"]:
+                excess = self.count() - policy["max_patterns"]
+                if excess > 0:
+                    rows = self.conn.execute(
+                        "SELECT key FROM patterns ORDER BY applied, retention LIMIT ?",
+                        (excess + len(protect),)
+                    )
+                    keys = [key for (key,) in rows]
+                    victims = [k for k in keys if k not in protect] + [k for k in keys if k in protect]
+                    counts["evicted"] = self.delete(victims[:excess])
+
+            self._record_retention(counts, now)
+        return counts
+
+    def delete(self, keys: Iterable[str]) -> int:
+        keys = [(k,) for k in keys]
+        if not keys:
+            return 0
+        with self.transaction():
+            before = self.conn.total_changes
+            self.conn.executemany("DELETE FROM patterns WHERE key = ?", keys)
+            deleted = self.conn.total_changes - before
+            self.conn.executemany("DELETE FROM pattern_triggers WHERE key = ?", keys)
+            if self.conn.total_changes - before > deleted:
+                self.set_meta(_TRIGGER_VERSION_KEY, uuid.uuid4().hex)
+            return deleted
+
+    def delete_where(self, **filters) -> int:
+        where, params = self._where(**filters)
+        with self.transaction():
+            return self.delete(key for (key,) in self.conn.execute(f"SELECT key FROM patterns{where}", params).fetchall())
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value: Any) -> None:
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+
+    def all_meta(self) -> Dict[str, Any]:
+        return {k: json.loads(v) for k, v in self.conn.execute("SELECT key, value FROM meta ORDER BY rowid")}
+
+    def clear(self) -> None:
+        with self.transaction():
+            self.conn.execute("DELETE FROM patterns")
+            self.conn.execute("DELETE FROM pattern_triggers")
+            # Internal keys survive: dropping the mirror signature would make the
+            # next open re-import patterns.json and undo a replace
+            self.conn.execute("DELETE FROM meta WHERE key NOT LIKE '\\_%' ESCAPE '\\'")
+            self.set_meta(_TRIGGER_VERSION_KEY, uuid.uuid4().hex)
+
+    def size_bytes(self) -> int:
+        size = 0
+        for path in (self.db_file, self.db_file.with_name(self.db_file.name + "-wal")):
+            try:
+                size += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def vacuum(self) -> None:
+        self.conn.execute("VACUUM")
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _json_signature(self) -> Optional[List[int]]:
+        try:
+            stat = self.json_file.stat()
+        except FileNotFoundError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def sync_from_json(self) -> int:
+        """Merge patterns.json into the database if it changed since the last sync."""
+        signature = self._json_signature()
+        if signature is None or signature == self.get_meta(_MIRROR_KEY):
+            return 0
+        with self.transaction():
+            # Re-check under the write lock: another process may have just imported it
+            signature = self._json_signature()
+            if signature is None or signature == self.get_meta(_MIRROR_KEY):
+                return 0
+            imported = self.import_document(read_json(self.json_file))
+            self.set_meta(_MIRROR_KEY, signature)
+            return imported
+
+    def export_json(self, json_file: Optional[Path] = None) -> int:
+        """Write the database to patterns.json; returns the number of patterns."""
+        target = Path(json_file) if json_file else self.json_file
+        with self.transaction():
+            doc = self.to_document()
+            atomic_write_json(target, doc)
+            if self.json_file is not None and target == self.json_file:
+                self.set_meta(_MIRROR_KEY, self._json_signature())
+        return len(doc["patterns"])
+
+
+def open_store(learned_dir: Optional[Path] = None, backend: Optional[str] = None) -> PatternStore:
+    """Open the pattern store for a learned/ directory (default: the component's)."""
+    learned_dir = Path(learned_dir) if learned_dir else get_component_root() / "learned"
+    backend = backend or os.environ.get("UC_PATTERN_STORE", DEFAULT_BACKEND)
+    json_file = learned_dir / "patterns.json"
+    if backend == "json":
+        return JsonPatternStore(json_file)
+    if backend == "sqlite":
+        return SqlitePatternStore(learned_dir / "patterns.db", json_file)
+    raise ValueError(f"Unknown pattern store backend: {backend}")
+
+
+def _option(args: List[str], name: str) -> Optional[str]:
+    return args[args.index(name) + 1] if name in args[:-1] else None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python pattern_store.py <import|export|query|stats|retention|maintain> [args]")
+        sys.exit(1)
+
+    action = sys.argv[1]
+    args = sys.argv[2:]
+    positional = args[0] if args and not args[0].startswith("--") else None
+
+    with open_store() as store:
+        if action == "import":
+            source = Path(positional) if positional else get_component_root() / "learned" / "patterns.json"
+            imported = store.import_document(read_json(source), replace="--replace" in args)
+            if isinstance(store, SqlitePatternStore) and source == store.json_file:
+                store.set_meta(_MIRROR_KEY, store._json_signature())
+            result = {"imported": imported, "source": str(source), "backend": store.backend, "total": store.count()}
+
+        elif action == "export":
+            if isinstance(store, SqlitePatternStore):
+                exported = store.export_json(Path(positional) if positional else None)
+                target = positional or store.json_file
+            else:
+                target = positional or store.json_file
+                doc = store.to_document()
+                atomic_write_json(target, doc)
+                exported = len(doc["patterns"])
+            result = {"exported": exported, "target": str(target), "backend": store.backend}
+
+        elif action == "query":
+            applied = _option(args, "--applied")
+            min_confidence = _option(args, "--min-confidence")
+            limit = _option(args, "--limit")
+            result = store.query(
+                type=_option(args, "--type"),
+                tool=_option(args, "--tool"),
+                min_confidence=float(min_confidence) if min_confidence else None,
+                applied=applied.lower() in ("true", "1", "yes") if applied else None,
+                limit=int(limit) if limit else None,
+                order_by="confidence"
+            )
+
+        elif action == "stats":
+            result = {
+                "backend": store.backend,
+                "total_patterns": store.count(),
+                "by_type": store.count_by("type"),
+                "applied": store.count(applied=True),
+                "meta_keys": sorted(k for k in store.all_meta() if not k.startswith("_"))
+            }
+
+        elif action == "retention":
+            overrides = dict(store.get_meta("retention") or {})
+            for arg in args:
+                name, _, value = arg.partition("=")
+                try:
+                    value = json.loads(value) if value else None
+                except json.JSONDecodeError:
+                    pass  # Left as the raw string, which retention_error rejects
+                error = retention_error(name, value)
+                if error:
+                    print(error)
+                    sys.exit(1)
+                overrides[name] = value
+            if args:
+                store.set_meta("retention", overrides)
+            result = {"policy": store.retention_policy(), "stats": store.get_meta("retention_stats", {})}
+
+        elif action == "maintain":
+            result = {"decayed": 0, "expired": 0, "evicted": 0}
+            while True:
+                counts = store.maintain()
+                for name, value in counts.items():
+                    result[name] += value
+                if "--all" not in args or not any(counts.values()):
+                    break
+            result["total_patterns"] = store.count()
+
+        else:
+            result = {"error": f"Unknown action: {action}"}
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
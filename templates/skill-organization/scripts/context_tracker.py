@@ -22,6 +22,10 @@ from pathlib import Path
 from typing import Dict, List
 import hashlib
 
+sys.path.insert(0, str(Path(__file__).parent))
+from pattern_dedup import merge_new_patterns
+from pattern_store import new_pattern_id, open_store
+
 def get_component_root() -> Path:
     """Get component root directory."""
     return Path(os.environ.get("COMPONENT_ROOT", Path(__file__).parent.parent))
@@ -206,21 +210,14 @@ def calculate_confidence(successes: List, failures: List) -> float:
     return min(0.99, base_confidence + confirmation_boost + repetition_boost)
 
 def extract_to_patterns() -> Dict:
-    """Extract learned patterns to main patterns.json."""
+    """Extract learned patterns to the pattern store."""
     analysis = analyze_session()
 
-    patterns_file = get_component_root() / "learned" / "patterns.json"
-    if patterns_file.exists():
-        with open(patterns_file, "r", encoding="utf-8") as f:
-            patterns_data = json.load(f)
-    else:
-        patterns_data = {"patterns": [], "learning_stats": {"total_sessions": 0}}
-
     new_patterns = []
     for p in analysis.get("patterns", []):
         if p.get("learnable") and p.get("confidence", 0) >= 0.7:
             new_pattern = {
-                "id": f"ctx-{datetime.now().strftime('%Y%m%d%H%M%S')}-{len(new_patterns)}",
+                "id": new_pattern_id("ctx"),
                 "type": "context_learned",
                 "source": "context_tracker",
                 "component": "{{skill_name}}",
@@ -235,19 +232,23 @@ def extract_to_patterns() -> Dict:
                 "applied": False
             }
             new_patterns.append(new_pattern)
-            patterns_data["patterns"].append(new_pattern)
 
-    patterns_data["learning_stats"]["total_sessions"] = patterns_data["learning_stats"].get("total_sessions", 0) + 1
-    patterns_data["learning_stats"]["last_extraction"] = datetime.now().isoformat()
+    with open_store(get_component_root() / "learned") as store, store.transaction():
+        # Near-duplicates of stored patterns only add evidence to them
+        stored_patterns = merge_new_patterns(store, new_patterns)
 
-    with open(patterns_file, "w", encoding="utf-8") as f:
-        json.dump(patterns_data, f, indent=2, ensure_ascii=False)
+        stats = store.get_meta("learning_stats", {"total_sessions": 0})
+        stats["total_sessions"] = stats.get("total_sessions", 0) + 1
+        stats["last_extraction"] = datetime.now().isoformat()
+        store.set_meta("learning_stats", stats)
+        total_patterns = store.count()
 
     return {
         "extraction_complete": True,
-        "new_patterns_added": len(new_patterns),
-        "total_patterns": len(patterns_data["patterns"]),
-        "patterns": new_patterns
+        "new_patterns_added": len(stored_patterns["added"]),
+        "patterns_merged": len(stored_patterns["merged"]),
+        "total_patterns": total_patterns,
+        "patterns": stored_patterns["added"] + stored_patterns["merged"]
     }
 
 def clear_session() -> Dict:
@@ -17,29 +17,15 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
+sys.path.insert(0, str(Path(__file__).parent))
+from pattern_store import new_pattern_id, open_store
+
 def get_component_root() -> Path:
     """Get component root directory."""
     return Path(os.environ.get("COMPONENT_ROOT", Path(__file__).parent.parent))
 
-def load_patterns() -> Dict:
-    """Load learned patterns."""
-    patterns_file = get_component_root() / "learned" / "patterns.json"
-    if patterns_file.exists():
-        with open(patterns_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"patterns": [], "learning_stats": {"total_sessions": 0}}
-
-def save_patterns(data: Dict):
-    """Save learned patterns."""
-    patterns_file = get_component_root() / "learned" / "patterns.json"
-    patterns_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(patterns_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
 def extract_from_change(skill_name: str, file_path: str = None, content: str = None) -> Dict:
     """Extract learnable patterns from a file change."""
-    patterns_data = load_patterns()
-
     # Look for domain-specific patterns in the change
     extracted = {
         "timestamp": datetime.now().isoformat(),
@@ -71,23 +57,27 @@ def extract_from_change(skill_name: str, file_path: str = None, content: str = N
                 "confidence": 0.7
             })
 
-    # Store if any patterns found with sufficient confidence
-    for pattern in extracted["patterns_found"]:
-        if pattern.get("confidence", 0) >= 0.6:
-            patterns_data["patterns"].append({
-                "id": f"learn-{datetime.now().strftime('%Y%m%d%H%M%S')}-{len(patterns_data['patterns'])}",
-                "type": "skill_learned",
-                "source": "learn.py",
-                "skill": skill_name,
-                "pattern_type": pattern["type"],
-                "description": pattern["description"],
-                "confidence": pattern["confidence"],
-                "learned_at": datetime.now().isoformat(),
-                "applied": False
-            })
-
-    patterns_data["learning_stats"]["last_learning"] = datetime.now().isoformat()
-    save_patterns(patterns_data)
+    # Store patterns with sufficient confidence (only the new rows are written)
+    with open_store(get_component_root() / "learned") as store, store.transaction():
+        new_patterns = []
+        for pattern in extracted["patterns_found"]:
+            if pattern.get("confidence", 0) >= 0.6:
+                new_patterns.append({
+                    "id": new_pattern_id("learn"),
+                    "type": "skill_learned",
+                    "source": "learn.py",
+                    "skill": skill_name,
+                    "pattern_type": pattern["type"],
+                    "description": pattern["description"],
+                    "confidence": pattern["confidence"],
+                    "learned_at": datetime.now().isoformat(),
+                    "applied": False
+                })
+        store.upsert(new_patterns)
+
+        stats = store.get_meta("learning_stats", {"total_sessions": 0})
+        stats["last_learning"] = datetime.now().isoformat()
+        store.set_meta("learning_stats", stats)
 
     return {
         "learning_complete": True,
@@ -98,8 +88,8 @@ def extract_from_change(skill_name: str, file_path: str = None, content: str = N
 
 def analyze_skill_domain(skill_name: str) -> Dict:
     """Analyze skill domain for knowledge gaps."""
-    patterns_data = load_patterns()
-    skill_patterns = [p for p in patterns_data["patterns"] if p.get("skill") == skill_name]
+    with open_store(get_component_root() / "learned") as store:
+        skill_patterns = [p for p in store.query(type="skill_learned") if p.get("skill") == skill_name]
 
     # Analyze pattern distribution
     by_type = {}